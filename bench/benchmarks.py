@@ -0,0 +1,204 @@
+"""
+Микробенчмарки (см. src/bench.py).
+
+Каждая запись — фабрика: готовит входные данные (не замеряется)
+и возвращает функцию без аргументов, которую гоняет замер.
+Данные синтетические и детерминированные, сеть не нужна.
+"""
+
+import random
+import uuid
+
+from faker import Faker
+
+from checks.patient_checks import assert_valid_patient_response, validate_patient
+from checks.visit_checks import assert_valid_visit_response, validate_visit
+from request_modules.create_random_valid_person import generate_person_payload, person_from_json
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
+    generate_openmrs_id,
+    luhn_mod30_check_char,
+)
+from src.json_views import PersonView
+from src.openmrs_patient import Address, Identifier, PatientPayload, Person, PersonName
+from user.get_user_with_add_patient import extract_privileges_set
+
+SEED = 42
+
+LARGE_USER_ROLES = 40
+LARGE_USER_PRIVILEGES_PER_ROLE = 60
+
+VALIDATION_BATCH = 1000
+PERSON_LISTING = 1000
+
+
+# -----------------------------
+# sample data
+# -----------------------------
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def sample_person_json(rng: random.Random) -> dict:
+    # как POST /person в default-представлении: preferredName + names
+    person_uuid = _uuid(rng)
+    return {
+        "uuid": person_uuid,
+        "display": "Иван Петров",
+        "gender": "M",
+        "birthdate": "1980-05-17T00:00:00.000+0000",
+        "preferredName": {"uuid": _uuid(rng), "display": "Иван Петров",
+                          "givenName": "Иван", "familyName": "Петров"},
+        "names": [
+            {"uuid": _uuid(rng), "display": "Иван Петров", "givenName": "Иван", "familyName": "Петров"},
+            {"uuid": _uuid(rng), "display": "Ivan Petrov", "givenName": "Ivan", "familyName": "Petrov"},
+        ],
+        "addresses": [],
+        "voided": False,
+    }
+
+
+def sample_patient_json(rng: random.Random) -> dict:
+    person = sample_person_json(rng)
+    return {
+        "uuid": person["uuid"],
+        "display": f"10001YJ - {person['display']}",
+        "voided": False,
+        "person": person,
+        "identifiers": [
+            {"uuid": _uuid(rng), "display": "OpenMRS ID = 10001YJ", "identifier": "10001YJ"},
+            {"uuid": _uuid(rng), "display": "Old Identification Number = 123", "identifier": "123"},
+        ],
+    }
+
+
+def sample_visit_json(rng: random.Random, patient_uuid: str, visit_type_uuid: str, location_uuid: str) -> dict:
+    return {
+        "uuid": _uuid(rng),
+        "voided": False,
+        "patient": {"uuid": patient_uuid},
+        "visitType": {"uuid": visit_type_uuid},
+        "location": {"uuid": location_uuid},
+        "startDatetime": "2024-01-01T10:00:00.000+0000",
+    }
+
+
+def sample_large_user(rng: random.Random) -> dict:
+    # v=full пользователя с множеством ролей; привилегии частично пересекаются между ролями
+    return {
+        "uuid": _uuid(rng),
+        "username": "bench",
+        "roles": [
+            {
+                "uuid": _uuid(rng),
+                "display": f"Role {r}",
+                "privileges": [
+                    {"uuid": _uuid(rng), "display": f"Privilege {rng.randrange(LARGE_USER_PRIVILEGES_PER_ROLE * 4)}"}
+                    for _ in range(LARGE_USER_PRIVILEGES_PER_ROLE)
+                ],
+            }
+            for r in range(LARGE_USER_ROLES)
+        ],
+    }
+
+
+# -----------------------------
+# benchmarks
+# -----------------------------
+
+def bench_generate_openmrs_id():
+    random.seed(SEED)
+    return lambda: generate_openmrs_id(payload_length=7)
+
+
+def bench_luhn_mod30_check_char():
+    return lambda: luhn_mod30_check_char("10001YJ")
+
+
+def bench_patient_payload_to_dict():
+    rng = random.Random(SEED)
+    payload = PatientPayload(
+        person=Person(
+            names=[PersonName(givenName="Иван", familyName="Петров")],
+            gender="M",
+            birthdate="1980-05-17",
+            addresses=[Address(address1="ул. Ленина, 1", cityVillage="Казань", country="Россия")],
+        ),
+        identifiers=[Identifier(identifier="10001YJ", identifierType=_uuid(rng), location=_uuid(rng))],
+    )
+    return payload.to_dict
+
+
+def bench_person_from_json():
+    data = sample_person_json(random.Random(SEED))
+    return lambda: person_from_json(data)
+
+
+def bench_person_from_json_listing():
+    rng = random.Random(SEED)
+    results = [sample_person_json(rng) for _ in range(PERSON_LISTING)]
+    return lambda: [person_from_json(p) for p in results]
+
+
+def bench_person_view_listing():
+    # листинг, из которого читается только display: остальные поля не разбираются
+    rng = random.Random(SEED)
+    results = [sample_person_json(rng) for _ in range(PERSON_LISTING)]
+    return lambda: [p.display for p in PersonView.list(results)]
+
+
+def bench_generate_person_payload():
+    random.seed(SEED)
+    Faker.seed(SEED)
+    return generate_person_payload
+
+
+def bench_extract_privileges_set():
+    user = sample_large_user(random.Random(SEED))
+    return lambda: extract_privileges_set(user)
+
+
+def bench_assert_valid_patient_response():
+    patient = sample_patient_json(random.Random(SEED))
+    return lambda: assert_valid_patient_response(patient)
+
+
+def bench_assert_valid_visit_response():
+    rng = random.Random(SEED)
+    patient_uuid, visit_type_uuid, location_uuid = _uuid(rng), _uuid(rng), _uuid(rng)
+    visit = sample_visit_json(rng, patient_uuid, visit_type_uuid, location_uuid)
+    return lambda: assert_valid_visit_response(visit, patient_uuid=patient_uuid,
+                                               visit_type_uuid=visit_type_uuid, location_uuid=location_uuid)
+
+
+def bench_validate_many_patients():
+    rng = random.Random(SEED)
+    patients = [sample_patient_json(rng) for _ in range(VALIDATION_BATCH)]
+    return lambda: validate_patient.validate_many(patients)
+
+
+def bench_validate_many_visits():
+    # как в выгрузке: у каждого визита свой пациент
+    rng = random.Random(SEED)
+    visit_type_uuid, location_uuid = _uuid(rng), _uuid(rng)
+    patient_uuids = [_uuid(rng) for _ in range(VALIDATION_BATCH)]
+    visits = [sample_visit_json(rng, p, visit_type_uuid, location_uuid) for p in patient_uuids]
+    per_item = [{"patient_uuid": p} for p in patient_uuids]
+    return lambda: validate_visit.validate_many(visits, per_item, visit_type_uuid=visit_type_uuid,
+                                                location_uuid=location_uuid)
+
+
+BENCHMARKS = {
+    "generate_openmrs_id": bench_generate_openmrs_id,
+    "luhn_mod30_check_char": bench_luhn_mod30_check_char,
+    "PatientPayload.to_dict": bench_patient_payload_to_dict,
+    "person_from_json": bench_person_from_json,
+    f"person_from_json[{PERSON_LISTING} persons]": bench_person_from_json_listing,
+    f"PersonView.list[{PERSON_LISTING} persons, display]": bench_person_view_listing,
+    "generate_person_payload": bench_generate_person_payload,
+    "extract_privileges_set[large user]": bench_extract_privileges_set,
+    "assert_valid_patient_response": bench_assert_valid_patient_response,
+    "assert_valid_visit_response": bench_assert_valid_visit_response,
+    f"validate_many[{VALIDATION_BATCH} patients]": bench_validate_many_patients,
+    f"validate_many[{VALIDATION_BATCH} visits]": bench_validate_many_visits,
+}
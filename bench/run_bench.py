@@ -0,0 +1,51 @@
+"""
+Прогон микробенчмарков bench/benchmarks.py.
+
+Результат дописывается в HISTORY_PATH и сравнивается с BASELINE_PATH;
+при регрессии больше THRESHOLD процесс завершается с кодом 1 (для CI).
+UPDATE_BASELINE = True — записать текущий прогон как новую базу.
+"""
+
+import sys
+
+from bench.benchmarks import BENCHMARKS
+from src.bench import (
+    COMPARE_HEADERS,
+    append_history,
+    compare,
+    compare_rows,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+from src.report_render import render_rows
+
+HISTORY_PATH = "bench/history.jsonl"
+BASELINE_PATH = "bench/baseline.json"
+THRESHOLD = 0.10  # 10% медленнее базы — регрессия
+
+ONLY = None  # например ["person_from_json"]
+MIN_TIME = 0.2  # секунд на серию
+REPEAT = 5
+
+UPDATE_BASELINE = False
+OUTPUT_FORMAT = "table"  # table | csv | jsonl
+
+
+if __name__ == "__main__":
+    # python -m bench.run_bench
+    results = run_benchmarks(BENCHMARKS, only=ONLY, min_time=MIN_TIME, repeat=REPEAT)
+    append_history(HISTORY_PATH, results)
+
+    baseline = load_baseline(BASELINE_PATH)
+    compared = compare(results, baseline, THRESHOLD)
+    render_rows(COMPARE_HEADERS, compare_rows(compared, baseline), fmt=OUTPUT_FORMAT)
+
+    if UPDATE_BASELINE:
+        save_baseline(BASELINE_PATH, results)
+        print(f"\nБаза обновлена: {BASELINE_PATH}")
+
+    regressions = [r.name for r, _, status in compared if status == "regression"]
+    if regressions and not UPDATE_BASELINE:
+        print(f"\nРегрессии (> {THRESHOLD:.0%}): {', '.join(regressions)}")
+        sys.exit(1)
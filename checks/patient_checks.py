@@ -1,38 +1,35 @@
-def assert_valid_patient_response(patient: dict) -> None:
-    # --- patient ---
-    assert isinstance(patient, dict)
-    assert "uuid" in patient and isinstance(patient["uuid"], str)
-    assert patient.get("voided") is False
+# checks/patient_checks.py
 
-    # --- person ---
-    person = patient.get("person")
-    assert isinstance(person, dict)
+from checks.schema import Contains, Is, ListOf, Obj, OneOf, SameAs, Str, compile_schema
 
-    assert "uuid" in person
-    assert person["uuid"] == patient["uuid"]
+PATIENT_SCHEMA = Obj({
+    "uuid": Str(),
+    "voided": Is(False),
+    "person": Obj({
+        "uuid": SameAs("uuid"),
+        "gender": OneOf("M", "F", "O", "U"),
+        "birthdate": Str(),
+        "preferredName": Obj({"display": Str(blank=False)}),
+    }),
+    # хотя бы один идентификатор "OpenMRS ID", у каждого такого — uuid и display
+    "identifiers": ListOf(
+        Obj({"uuid": Str(), "display": Str()}),
+        min_len=1,
+        where=Contains("display", "OpenMRS ID"),
+        min_matches=1,
+    ),
+})
 
-    assert person.get("gender") in {"M", "F", "O", "U"}
-    assert "birthdate" in person
-    assert isinstance(person["birthdate"], str)
+# ответ POST /patient в любом представлении: только каркас
+CREATED_PATIENT_SCHEMA = Obj({
+    "uuid": Str(),
+    "voided": Is(False),
+    "person": Obj(),
+})
 
-    preferred_name = person.get("preferredName")
-    assert isinstance(preferred_name, dict)
-    assert isinstance(preferred_name.get("display"), str)
-    assert preferred_name["display"].strip() != ""
+validate_patient = compile_schema(PATIENT_SCHEMA, "patient")
+validate_created_patient = compile_schema(CREATED_PATIENT_SCHEMA, "created patient")
 
-    # --- identifiers ---
-    identifiers = patient.get("identifiers")
-    assert isinstance(identifiers, list)
-    assert len(identifiers) > 0
-
-    openmrs_ids = [
-        i for i in identifiers
-        if "OpenMRS ID" in i.get("display", "")
-    ]
-    assert len(openmrs_ids) >= 1
-
-    for identifier in openmrs_ids:
-        assert "uuid" in identifier
-        assert isinstance(identifier["uuid"], str)
-        assert "display" in identifier
-        assert isinstance(identifier["display"], str)
\ No newline at end of file
+# сгенерированная функция: AssertionError со всеми ошибками ответа
+assert_valid_patient_response = validate_patient.assert_valid
+assert_created_patient_response = validate_created_patient.assert_valid
@@ -0,0 +1,18 @@
+# checks/person_checks.py
+
+from checks.schema import Is, Obj, OneOf, Opt, Str, compile_schema
+
+PERSON_SCHEMA = Obj({
+    "uuid": Str(nonempty=True),
+    "display": Str(blank=False),
+    "gender": OneOf("M", "F", "O", "U"),
+    # дата рождения может быть неизвестна
+    "birthdate": Opt(Str(nonempty=True)),
+    "preferredName": Obj({"display": Str(blank=False)}),
+    "voided": Opt(Is(False)),
+})
+
+validate_person = compile_schema(PERSON_SCHEMA, "person")
+
+# сгенерированная функция: AssertionError со всеми ошибками ответа
+assert_valid_person_response = validate_person.assert_valid
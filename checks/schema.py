@@ -0,0 +1,523 @@
+# checks/schema.py
+"""
+Декларативные схемы ответов OpenMRS и их компиляция в проверяющие функции.
+
+    PATIENT = Obj({
+        "uuid": Str(),
+        "voided": Is(False),
+        "person": Obj({"uuid": SameAs("uuid"), "gender": OneOf("M", "F", "O", "U")}),
+        "identifiers": ListOf(Obj({"uuid": Str()}), min_len=1),
+    })
+    validate_patient = compile_schema(PATIENT, "patient")
+
+    validate_patient(patient)                 # -> список ошибок ("$.person.gender: ...")
+    validate_patient.check(patient)           # то же без обёртки
+    validate_patient.assert_valid(patient)    # AssertionError со всеми ошибками сразу
+    validate_patient.validate_many(patients)  # BatchReport по тысячам ответов за вызов
+
+Схема один раз превращается в исходный код Python (exec): обход
+без интерпретации схемы на каждом ответе, батч — тот же код внутри
+одного цикла, без вызова функции на элемент.
+
+Параметры проверки (uuid пациента, которого ждём в визите) — Param /
+RefOrUuid по имени; значения передаются в вызов: validate_visit(v, patient_uuid=...).
+
+Схема же задаёт, какие поля ответа нужны: validate_patient.representation()
+-> "custom:(uuid,voided,person:(...),identifiers:(...))" — запрос с этим v=
+возвращает ровно то, что будет проверено, вместо v=full «на всякий случай».
+"""
+
+import itertools
+import re
+import textwrap
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+_NAME_RE = re.compile(r"^\w+$")
+_RESERVED = {"value", "values", "items", "item", "shared", "errors", "failures", "index", "factory",
+             "MISSING", "itertools", "isinstance", "len", "enumerate", "zip"}
+
+
+# -----------------------------
+# schema nodes
+# -----------------------------
+
+# Поля, которые читает проверка, — дерево в форме custom-представления
+# OpenMRS: {"uuid": None, "person": {"uuid": None}}, None — значение целиком.
+Fields = Dict[str, Optional[dict]]
+
+
+class Node(ABC):
+    @abstractmethod
+    def compile(self, c: "_Compiler", v: str, path: str, depth: int) -> None:
+        ...
+
+    def reads(self, root: Fields) -> Optional[Fields]:
+        """
+        Поля значения, которые читает проверка; None — значение целиком.
+        root — поля корневого объекта (для SameAs).
+        """
+        return None
+
+
+@dataclass(frozen=True)
+class Present(Node):
+    """
+    Поле есть, значение любое.
+    """
+
+    def compile(self, c, v, path, depth):
+        pass
+
+
+@dataclass(frozen=True)
+class Str(Node):
+    nonempty: bool = False  # не ""
+    blank: bool = True      # False — не пустая и не из одних пробелов
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if not isinstance({v}, str):")
+        c.fail(depth + 1, path, "expected string", v)
+        if not self.blank:
+            c.line(depth, f"elif not {v}.strip():")
+            c.fail(depth + 1, path, "blank string", v)
+        elif self.nonempty:
+            c.line(depth, f"elif not {v}:")
+            c.fail(depth + 1, path, "empty string", v)
+
+
+@dataclass(frozen=True)
+class Bool(Node):
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if not isinstance({v}, bool):")
+        c.fail(depth + 1, path, "expected boolean", v)
+
+
+@dataclass(frozen=True)
+class Is(Node):
+    """
+    Тождество: Is(False), Is(None).
+    """
+    value: object
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if {v} is not {c.const(self.value)}:")
+        c.fail(depth + 1, path, f"expected {self.value!r}", v)
+
+
+@dataclass(frozen=True)
+class OneOf(Node):
+    values: Tuple = ()
+
+    def __init__(self, *values: object) -> None:
+        object.__setattr__(self, "values", tuple(values))
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if {v} not in {c.const(self.values)}:")
+        c.fail(depth + 1, path, f"expected one of {', '.join(map(repr, self.values))}", v)
+
+
+@dataclass(frozen=True)
+class Param(Node):
+    """
+    Значение равно параметру вызова name.
+    """
+    name: str
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if {v} != {c.param(self.name)}:")
+        c.fail(depth + 1, path, f"expected {self.name}", v)
+
+
+@dataclass(frozen=True)
+class RefOrUuid(Node):
+    """
+    Ссылка на объект: {"uuid": ...} или строка uuid (зависит от v=...),
+    uuid равен параметру вызова name.
+    """
+    name: str
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if ({v}.get('uuid') if isinstance({v}, dict) else {v}) != {c.param(self.name)}:")
+        c.fail(depth + 1, path, f"expected reference to {self.name}", v)
+
+    def reads(self, root):
+        return {"uuid": None}
+
+
+@dataclass(frozen=True)
+class SameAs(Node):
+    """
+    Равно полю key корневого объекта (person.uuid == patient.uuid).
+    """
+    key: str
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if {v} != value.get({self.key!r}):")
+        c.fail(depth + 1, path, f"expected same value as $.{self.key}", v)
+
+    def reads(self, root):
+        merge_fields(root, {self.key: None})
+        return None
+
+
+@dataclass(frozen=True)
+class Opt(Node):
+    """
+    Поле может отсутствовать или быть null; иначе — проверка node.
+    """
+    node: Node
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if {v} is not None:")
+        c.body(self.node, v, path, depth + 1)
+
+    def reads(self, root):
+        return self.node.reads(root)
+
+
+@dataclass(frozen=True)
+class Obj(Node):
+    fields: Mapping[str, Node] = field(default_factory=dict)
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if not isinstance({v}, dict):")
+        c.fail(depth + 1, path, "expected object", v)
+        c.line(depth, "else:")
+        if not self.fields:
+            c.line(depth + 1, "pass")
+        for name, node in self.fields.items():
+            if not _NAME_RE.match(name):
+                raise ValueError(f"Unsupported field name {name!r}")
+            child, child_path = c.var(), f"{path}.{name}"
+            if isinstance(node, Opt):
+                # нет поля и null — одно и то же
+                c.line(depth + 1, f"{child} = {v}.get({name!r})")
+                node.compile(c, child, child_path, depth + 1)
+                continue
+            c.line(depth + 1, f"{child} = {v}.get({name!r}, MISSING)")
+            if isinstance(node, Present):
+                c.line(depth + 1, f"if {child} is MISSING:")
+                c.fail(depth + 2, child_path, "missing")
+                continue
+            # MISSING не проходит ни одну проверку значения: отдельное сравнение
+            # не нужно, «missing» различается только в ветке ошибки
+            node.compile(c, child, child_path, depth + 1)
+
+    def reads(self, root):
+        # Obj() без полей — только «объект»: берём поле целиком
+        return {name: node.reads(root) for name, node in self.fields.items()} or None
+
+
+@dataclass(frozen=True)
+class Contains:
+    """
+    Отбор элементов списка: подстрока text в строковом поле key.
+    """
+    key: str
+    text: str
+
+
+@dataclass(frozen=True)
+class ListOf(Node):
+    """
+    Список; item проверяется у каждого элемента (или только у отобранных where),
+    отобранных должно быть не меньше min_matches.
+    """
+    item: Node = Present()
+    min_len: int = 0
+    where: Optional[Contains] = None
+    min_matches: int = 0
+
+    def compile(self, c, v, path, depth):
+        c.line(depth, f"if not isinstance({v}, list):")
+        c.fail(depth + 1, path, "expected array", v)
+        c.line(depth, "else:")
+        if self.min_len:
+            c.line(depth + 1, f"if len({v}) < {self.min_len}:")
+            c.fail(depth + 2, path, f"expected at least {self.min_len} item(s)", v)
+        matches, index, item = c.var(), c.var(), c.var()
+        if self.where is not None:
+            c.line(depth + 1, f"{matches} = 0")
+        c.line(depth + 1, f"for {index}, {item} in enumerate({v}):")
+        if self.where is not None:
+            key, text = c.const(self.where.key), c.const(self.where.text)
+            c.line(depth + 2, f"if not isinstance({item}, dict) or {text} not in ({item}.get({key}) or ''):")
+            c.line(depth + 3, "continue")
+            c.line(depth + 2, f"{matches} += 1")
+        c.body(self.item, item, f"{path}[{{{index}}}]", depth + 2)
+        if self.where is not None and self.min_matches:
+            c.line(depth + 1, f"if {matches} < {self.min_matches}:")
+            c.fail(depth + 2, path,
+                   f"expected at least {self.min_matches} item(s) with {self.where.text!r} in {self.where.key}")
+
+    def reads(self, root):
+        fields = self.item.reads(root)
+        if self.where is not None and fields is not None:
+            fields = merge_fields(dict(fields), {self.where.key: None})
+        return fields
+
+
+# -----------------------------
+# representation
+# -----------------------------
+
+def merge_fields(into: Fields, other: Fields) -> Fields:
+    """
+    Объединение деревьев полей (в into); «целиком» поглощает набор подполей.
+    """
+    for name, sub in other.items():
+        if name not in into:
+            into[name] = sub
+        elif into[name] is None or sub is None:
+            into[name] = None
+        else:
+            into[name] = merge_fields(dict(into[name]), sub)
+    return into
+
+
+def fields_from_paths(paths: Iterable[str]) -> Fields:
+    """
+    "indication", "attributes.attributeType.uuid" -> дерево полей.
+    """
+    fields: Fields = {}
+    for path in paths:
+        *parents, leaf = path.split(".")
+        tree: Fields = {leaf: None}
+        for name in reversed(parents):
+            tree = {name: tree}
+        merge_fields(fields, tree)
+    return fields
+
+
+def custom_representation(fields: Fields) -> str:
+    """
+    {"uuid": None, "person": {"uuid": None}} -> "custom:(uuid,person:(uuid))".
+    """
+    return f"custom:{_group(fields)}"
+
+
+def _group(fields: Fields) -> str:
+    return "(" + ",".join(name if sub is None else f"{name}:{_group(sub)}" for name, sub in fields.items()) + ")"
+
+
+def representation(*validators: "Validator", extra: Iterable[str] = ()) -> str:
+    """
+    Минимальный v=custom:(...) под несколько проверок одного ответа
+    и поля, которые тест читает сам (extra — пути через точку).
+    """
+    fields: Fields = {}
+    for validator in validators:
+        merge_fields(fields, validator.fields)
+    return custom_representation(merge_fields(fields, fields_from_paths(extra)))
+
+
+# -----------------------------
+# compiler
+# -----------------------------
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.lines: List[Tuple[int, str]] = []
+        self.consts: Dict[str, object] = {}
+        self.params: set = set()
+        self._n = 0
+
+    def var(self) -> str:
+        self._n += 1
+        return f"v{self._n}"
+
+    def const(self, value: object) -> str:
+        name = f"c{len(self.consts)}"
+        self.consts[name] = value
+        return name
+
+    def param(self, name: str) -> str:
+        # параметр — локальная переменная сгенерированной функции
+        if not _NAME_RE.match(name) or name in _RESERVED or re.match(r"^[vc]\d+$", name):
+            raise ValueError(f"Unsupported param name {name!r}")
+        self.params.add(name)
+        return name
+
+    def line(self, depth: int, text: str) -> None:
+        self.lines.append((depth, text))
+
+    def body(self, node: Node, v: str, path: str, depth: int) -> None:
+        # блок if / else / for не может быть пустым (Present ничего не проверяет)
+        count = len(self.lines)
+        node.compile(self, v, path, depth)
+        if len(self.lines) == count:
+            self.line(depth, "pass")
+
+    def fail(self, depth: int, path: str, message: str, got: Optional[str] = None) -> None:
+        # path — тело f-строки: индексы списков подставляются при проверке
+        message = message.replace("\\", "\\\\").replace("{", "{{").replace("}", "}}")
+        text = f"{path}: {message}".replace("'", "\\'")
+        if got is None:
+            self.line(depth, f"errors.append(f'{text}')")
+        else:
+            missing = f"{path}: missing".replace("'", "\\'")
+            self.line(depth, f"errors.append(f'{missing}' if {got} is MISSING else f'{text}, got {{{got}!r:.80}}')")
+
+    def source(self, base_depth: int) -> str:
+        # тело проверки с отступом base_depth: одно и то же для check и validate_many
+        return "\n".join("    " * (base_depth + d) + text for d, text in self.lines)
+
+
+@dataclass
+class BatchReport:
+    total: int
+    failures: List[Tuple[int, List[str]]]  # (индекс ответа, ошибки)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def summary(self, limit: Optional[int] = None) -> str:
+        shown = self.failures if limit is None else self.failures[:limit]
+        lines = [f"{len(self.failures)} of {self.total} responses invalid"]
+        lines += [f"  #{index}: {error}" for index, errors in shown for error in errors]
+        if len(shown) < len(self.failures):
+            lines.append(f"  ... and {len(self.failures) - len(shown)} more")
+        return "\n".join(lines)
+
+    def assert_ok(self) -> None:
+        assert self.ok, self.summary()
+
+
+class Validator:
+    """
+    Скомпилированная схема: check / __call__ -> список ошибок, assert_valid
+    (AssertionError со всеми ошибками), validate_many.
+    check и assert_valid — сами сгенерированные функции (параметры только
+    именованные), без лишнего вызова — для горячих мест.
+    """
+
+    def __init__(self, schema: Node, name: str, compiler: "_Compiler") -> None:
+        self.schema = schema
+        self.name = name
+        self.params = frozenset(compiler.params)
+        self.fields = self._reads()
+        self._compiler = compiler
+        self._batches: Dict[frozenset, Callable] = {}
+        self.source = self._source_single()
+        self.check = self._exec(self.source, "check")
+        self.assert_valid = self._exec(self._source_assert(), "assert_valid")
+
+    def __call__(self, value: object, **params: object) -> List[str]:
+        return self.check(value, **params)
+
+    def representation(self, *extra: str) -> str:
+        """
+        v=custom:(...) ровно с теми полями, которые читает проверка,
+        плюс extra — поля, нужные самому тесту ("indication", "encounters.uuid").
+        """
+        return representation(self, extra=extra)
+
+    def report(self, errors: List[str]) -> str:
+        return f"Invalid {self.name} response:\n" + "\n".join(errors)
+
+    def validate_many(self, values: Iterable[object], per_item: Optional[Iterable[Mapping]] = None,
+                      **params: object) -> BatchReport:
+        """
+        Все ответы за один вызов; per_item — параметры на каждый ответ
+        (по порядку, у всех один набор ключей), params — общие для всех.
+        """
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        per_item = None if per_item is None else list(per_item)
+        item_keys = frozenset(per_item[0]) & self.params if per_item else frozenset()
+        if per_item is not None:
+            if len(per_item) != len(values):
+                raise TypeError(f"{self.name} validator: {len(per_item)} per_item entries for {len(values)} values")
+            for index, item in enumerate(per_item):
+                keys = frozenset(item) & self.params
+                if keys != item_keys:
+                    raise TypeError(f"{self.name} validator: per_item[{index}] has params "
+                                    f"{', '.join(sorted(keys)) or '-'}, expected {', '.join(sorted(item_keys))}")
+        missing = self.params - item_keys - params.keys()
+        if missing:
+            raise TypeError(f"{self.name} validator needs params: {', '.join(sorted(missing))}")
+
+        batch = self._batches.get(item_keys)
+        if batch is None:
+            batch = self._batches[item_keys] = self._exec(self._source_batch(item_keys), "validate_many")
+        return BatchReport(len(values), batch(values, per_item or itertools.repeat(None), params))
+
+    def _reads(self) -> Fields:
+        root: Fields = {}
+        fields = self.schema.reads(root)
+        if fields is None:
+            raise ValueError(f"{self.name} schema must be an Obj with fields to derive a representation")
+        # root-поля, на которые ссылается SameAs, — в конец, после объявленных
+        return merge_fields(fields, root)
+
+    # -----------------------------
+    # codegen
+    # -----------------------------
+
+    def _signature(self) -> str:
+        return f", *, {', '.join(sorted(self.params))}" if self.params else ""
+
+    def _source_single(self) -> str:
+        return (
+            f"def check(value{self._signature()}):\n"
+            "    errors = []\n"
+            f"{self._compiler.source(1)}\n"
+            "    return errors\n"
+        )
+
+    def _source_assert(self) -> str:
+        # отдельная функция, а не обёртка над check: на горячем пути ни одного лишнего вызова
+        return (
+            f"def assert_valid(value{self._signature()}):\n"
+            "    errors = []\n"
+            f"{self._compiler.source(1)}\n"
+            "    if errors:\n"
+            f"        raise AssertionError({self.report([])!r} + '\\n'.join(errors))\n"
+        )
+
+    def _source_batch(self, item_keys: frozenset) -> str:
+        """
+        Общие параметры — локальные переменные до цикла, параметры
+        элемента — из его словаря внутри цикла.
+        """
+        shared = "".join(f"    {p} = shared[{p!r}]\n" for p in sorted(self.params - item_keys))
+        per_item = "".join(f"        {p} = item[{p!r}]\n" for p in sorted(item_keys))
+        return (
+            "def validate_many(values, items, shared):\n"
+            "    failures = []\n"
+            f"{shared}"
+            "    for index, value, item in zip(itertools.count(), values, items):\n"
+            f"{per_item}"
+            "        errors = []\n"
+            f"{self._compiler.source(2)}\n"
+            "        if errors:\n"
+            "            failures.append((index, errors))\n"
+            "    return failures\n"
+        )
+
+    def _exec(self, source: str, function: str) -> Callable:
+        # константы и встроенные функции — замыкание фабрики: быстрый доступ
+        # как к локальным, без именованных аргументов по умолчанию (их
+        # связывание на каждом вызове дороже самой проверки)
+        bound = {"MISSING": MISSING, "itertools": itertools, "isinstance": isinstance, "len": len,
+                 "enumerate": enumerate, "zip": zip, **self._compiler.consts}
+        factory = f"def factory({', '.join(bound)}):\n{textwrap.indent(source, '    ')}    return {function}\n"
+        namespace: Dict[str, object] = {}
+        exec(compile(factory, f"<schema {self.name}>", "exec"), namespace)
+        return namespace["factory"](**bound)
+
+
+def compile_schema(schema: Node, name: str) -> Validator:
+    c = _Compiler()
+    schema.compile(c, "value", "$", 0)
+    return Validator(schema, name, c)
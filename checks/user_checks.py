@@ -0,0 +1,17 @@
+# checks/user_checks.py
+
+from checks.schema import Bool, ListOf, Obj, Str, compile_schema
+
+USER_SCHEMA = Obj({
+    "uuid": Str(nonempty=True),
+    "display": Str(nonempty=True),
+    "systemId": Str(nonempty=True),
+    "retired": Bool(),
+    "person": Obj({"uuid": Str(nonempty=True)}),
+    "roles": ListOf(Obj({"uuid": Str(nonempty=True), "display": Str(nonempty=True)})),
+})
+
+validate_user = compile_schema(USER_SCHEMA, "user")
+
+# сгенерированная функция: AssertionError со всеми ошибками ответа
+assert_valid_user_response = validate_user.assert_valid
@@ -1,35 +1,21 @@
 # checks/visit_checks.py
 
-def assert_valid_visit_response(visit: dict, *, patient_uuid: str, visit_type_uuid: str, location_uuid: str) -> None:
-    assert isinstance(visit, dict)
-    assert isinstance(visit.get("uuid"), str) and visit["uuid"]
+from checks.schema import Is, Obj, Opt, RefOrUuid, Str, compile_schema
 
-    # common flags
-    assert visit.get("voided") in (False, None)  # обычно False, но зависит от representation
+VISIT_SCHEMA = Obj({
+    "uuid": Str(nonempty=True),
+    # обычно False, но зависит от representation
+    "voided": Opt(Is(False)),
+    # patient / visitType / location — объект или строка uuid в зависимости от v=...
+    "patient": RefOrUuid("patient_uuid"),
+    "visitType": RefOrUuid("visit_type_uuid"),
+    "startDatetime": Str(blank=False),
+    # в примере payload присутствует; чаще всего ожидается в ответе
+    "location": Opt(RefOrUuid("location_uuid")),
+})
 
-    # patient
-    patient = visit.get("patient")
-    if isinstance(patient, dict):
-        assert patient.get("uuid") == patient_uuid
-    else:
-        # иногда API возвращает строкой UUID в зависимости от v=...
-        assert patient == patient_uuid
+validate_visit = compile_schema(VISIT_SCHEMA, "visit")
 
-    # visitType
-    vt = visit.get("visitType")
-    if isinstance(vt, dict):
-        assert vt.get("uuid") == visit_type_uuid
-    else:
-        assert vt == visit_type_uuid
-
-    # startDatetime
-    assert isinstance(visit.get("startDatetime"), str)
-    assert visit["startDatetime"].strip() != ""
-
-    # location (в примере payload присутствует; чаще всего ожидается в ответе)
-    loc = visit.get("location")
-    if loc is not None:
-        if isinstance(loc, dict):
-            assert loc.get("uuid") == location_uuid
-        else:
-            assert loc == location_uuid
+# сгенерированная функция: visit позиционно, patient_uuid / visit_type_uuid /
+# location_uuid — только именованные; AssertionError со всеми ошибками ответа
+assert_valid_visit_response = validate_visit.assert_valid
@@ -0,0 +1,127 @@
+"""
+conftest.py
+
+Выбор цели прогона:
+    pytest --openmrs=live      # настоящий OpenMRS на localhost (по умолчанию)
+    pytest --openmrs=standin   # in-process стенд src/openmrs_standin.py, без сети
+    pytest --openmrs=record    # live + запись обмена в requests.jsonl (src/recorder.py)
+    pytest --openmrs=replay    # ответы из requests.jsonl, без сервера
+
+Значение по умолчанию берётся из переменной окружения OPENMRS_TARGET.
+Файл записи: --openmrs-recording (по умолчанию requests.jsonl).
+
+Каждый HTTP-вызов прогона проходит через src/instrumentation.py:
+    --http-events=calls.jsonl     # событие на вызов
+    --http-prometheus=openmrs.prom  # метрики в формате Prometheus по итогам прогона
+
+Учёт вызовов по тестам и @pytest.mark.http_budget(n) — src/pytest_http.py
+(--http-calls, --http-fail-on-duplicates).
+Временная шкала тестов с критическим путём — src/pytest_timeline.py
+(--http-timeline=timeline.json, рядом timeline.html).
+SLO по задержке: @pytest.mark.latency_slo и --latency-slo — src/latency_slo.py.
+Общие данные только для чтения с защитой от изменения — src/readonly_context.py.
+Какие поля ответов тесты читают на самом деле — src/field_usage.py
+(--field-usage=field_usage.json).
+"""
+
+import os
+import random
+import zlib
+
+import pytest
+
+from src import field_usage, latency_slo, pytest_http, pytest_timeline, readonly_context
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--openmrs",
+        choices=("live", "standin", "record", "replay"),
+        default=os.environ.get("OPENMRS_TARGET", "live"),
+        help="live — реальный сервер, standin — in-process эмулятор OpenMRS REST, "
+             "record / replay — запись и воспроизведение обмена",
+    )
+    parser.addoption(
+        "--openmrs-recording",
+        default=os.environ.get("OPENMRS_RECORDING", "requests.jsonl"),
+        help="JSONL-файл для --openmrs=record / replay",
+    )
+    parser.addoption("--http-events", default=None, help="JSONL с событием на каждый HTTP-вызов")
+    parser.addoption("--http-prometheus", default=None, help="файл метрик HTTP-вызовов (Prometheus text format)")
+    pytest_http.addoption(parser)
+    pytest_timeline.addoption(parser)
+    latency_slo.addoption(parser)
+    field_usage.addoption(parser)
+
+
+def pytest_configure(config):
+    pytest_http.configure(config)
+    pytest_timeline.configure(config)
+    latency_slo.configure(config)
+    readonly_context.configure(config)
+    field_usage.configure(config)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def openmrs_target(request):
+    """
+    "live", "standin", "record" или "replay". Для всех, кроме live,
+    на BASE_URL на весь прогон ставится свой транспортный адаптер.
+    """
+    target = request.config.getoption("--openmrs")
+    recording = request.config.getoption("--openmrs-recording")
+
+    if target == "standin":
+        from src.openmrs_standin import OpenMRSStandIn
+        adapter = OpenMRSStandIn()
+    elif target == "record":
+        from src.recorder import Recorder
+        adapter = Recorder(recording)
+    elif target == "replay":
+        from src.recorder import ReplayAdapter
+        adapter = ReplayAdapter(recording)
+    else:
+        yield target
+        return
+
+    with adapter:
+        yield target
+
+
+@pytest.fixture(scope="session", autouse=True)
+def http_metrics(request, openmrs_target):
+    """
+    MetricsAggregator по всем HTTP-вызовам прогона (поверх выбранной цели).
+    """
+    from src.instrumentation import Instrumentation, JsonlSink, MetricsAggregator, PrometheusTextSink
+
+    metrics = MetricsAggregator()
+    plugins = request.config.pluginmanager
+    sinks = [metrics, plugins.get_plugin(pytest_http.PLUGIN_NAME), plugins.get_plugin(latency_slo.PLUGIN_NAME),
+             readonly_context.guard(request.config)]
+    if request.config.getoption("--http-events"):
+        sinks.append(JsonlSink(request.config.getoption("--http-events")))
+    if request.config.getoption("--http-prometheus"):
+        sinks.append(PrometheusTextSink(request.config.getoption("--http-prometheus")))
+    timeline = plugins.get_plugin(pytest_timeline.PLUGIN_NAME)
+    if timeline is not None:
+        sinks.append(timeline)
+
+    with Instrumentation(sinks):
+        yield metrics
+
+
+@pytest.fixture(autouse=True)
+def _deterministic_payloads(request, openmrs_target):
+    """
+    Для record / replay случайные данные (Faker, random) сидируются по имени теста,
+    чтобы тела запросов при воспроизведении совпадали с записанными.
+    """
+    if openmrs_target not in ("record", "replay"):
+        return
+
+    from faker import Faker
+
+    seed = zlib.crc32(request.node.nodeid.encode("utf-8"))
+    random.seed(seed)
+    Faker.seed(seed)
@@ -0,0 +1,30 @@
+from load.scenarios import SCENARIOS
+from src.load import LoadStats, iter_scenarios, run_load
+from src.report_render import render_rows
+
+SCENARIOS_PATH = "load/scenarios.jsonl"
+
+CONCURRENCY = 8
+RATE = None  # сценариев в секунду; None — closed loop на CONCURRENCY потоках
+
+OUTPUT_FORMAT = "table"  # table | csv | jsonl
+HISTOGRAM_PATH = None     # например "load_histograms.json" — для слияния прогонов (HistogramSet.load / merge)
+
+
+def print_report(stats: LoadStats, fmt: str = OUTPUT_FORMAT) -> None:
+    render_rows(LoadStats.headers(), stats.rows(), fmt=fmt)
+
+    print(f"\nДлительность: {stats.duration:.1f} c")
+    for name, counts in sorted(stats.scenarios.items()):
+        print(f"{name}: ok={counts['ok']} failed={counts['failed']}")
+        for kind, count in sorted(stats.scenario_errors.get(name, {}).items(), key=lambda item: -item[1]):
+            print(f"    {kind}: {count}  ({stats.error_samples[(name, kind)]})")
+
+
+if __name__ == "__main__":
+    # python -m load.run_load
+    stats = run_load(iter_scenarios(SCENARIOS_PATH), SCENARIOS, concurrency=CONCURRENCY, rate=RATE)
+    print_report(stats)
+
+    if HISTOGRAM_PATH:
+        stats.histograms.dump(HISTOGRAM_PATH)
@@ -0,0 +1,109 @@
+"""
+Open-loop прогон POST /patient и POST /visit с постоянной частотой запросов.
+
+Для /visit пациенты создаются заранее (это не замеряется): у одного
+пациента не может быть двух пересекающихся визитов.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Tuple
+
+from request_modules.create_random_valid_person import generate_person_payload
+from request_modules.locations.get_random_valid_location import get_random_valid_location
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
+    generate_openmrs_id,
+    get_openmrs_id_identifier,
+)
+from request_modules.visittype.get_random_valid_visit_type import get_random_valid_visit_type
+from src.concurrency import run_bounded, thread_client
+from src.load import LoadStats, OpenLoopResult, run_open_loop
+from src.openmrs_patient import OpenMRSError
+from src.report_render import render_rows
+
+TARGET = "patient"  # patient | visit
+RATE = 20           # запросов в секунду
+DURATION_S = 60
+WORKERS = 64
+
+PERCENTILES = (50, 90, 99, 99.9)
+OUTPUT_FORMAT = "table"  # table | csv | jsonl
+HISTOGRAM_PATH = None     # сюда пишутся гистограммы с поправкой (JSON)
+
+
+def patient_body(identifier_type_uuid: str, location_uuid: str) -> dict:
+    # person передаётся целиком: один POST на пациента
+    return {
+        "person": generate_person_payload(),
+        "identifiers": [{
+            "identifier": generate_openmrs_id(payload_length=7),
+            "identifierType": identifier_type_uuid,
+            "location": location_uuid,
+            "preferred": True,
+        }],
+    }
+
+
+def patient_calls(count: int) -> Iterator[Tuple[str, str, dict]]:
+    identifier_type_uuid, _ = get_openmrs_id_identifier()
+    location_uuid = get_random_valid_location()["uuid"]
+    for _ in range(count):
+        yield "POST", "/patient", patient_body(identifier_type_uuid, location_uuid)
+
+
+def prepare_patients(count: int, concurrency: int = 8) -> List[str]:
+    identifier_type_uuid, _ = get_openmrs_id_identifier()
+    location_uuid = get_random_valid_location()["uuid"]
+
+    def create(_):
+        resp = thread_client().session.post(
+            f"{thread_client().BASE_URL}/patient",
+            json=patient_body(identifier_type_uuid, location_uuid),
+            timeout=30,
+        )
+        if resp.status_code != 201:
+            raise OpenMRSError(resp.status_code, resp.text)
+        return resp.json()["uuid"]
+
+    uuids = []
+    for _, result in run_bounded(range(count), create, concurrency):
+        if isinstance(result, Exception):
+            raise result
+        uuids.append(result)
+    return uuids
+
+
+def visit_calls(patient_uuids: List[str]) -> Iterator[Tuple[str, str, dict]]:
+    visit_type_uuid = get_random_valid_visit_type()["uuid"]
+    location_uuid = get_random_valid_location()["uuid"]
+    for patient_uuid in patient_uuids:
+        start = datetime.now(timezone.utc) - timedelta(minutes=1)
+        yield "POST", "/visit", {
+            "patient": patient_uuid,
+            "visitType": visit_type_uuid,
+            "startDatetime": start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "location": location_uuid,
+        }
+
+
+def print_report(result: OpenLoopResult, fmt: str = OUTPUT_FORMAT) -> None:
+    for title, stats in (("С поправкой (от запланированной отправки)", result.corrected),
+                         ("Без поправки (время обслуживания)", result.service)):
+        print(f"\n{title}:")
+        render_rows(LoadStats.headers(PERCENTILES), stats.rows(PERCENTILES), fmt=fmt)
+
+    print(f"\nЗапланировано: {result.scheduled}, макс. отставание отправки: {result.max_lag_ms:.1f} мс")
+
+
+if __name__ == "__main__":
+    # python -m load.run_open_loop
+    count = int(RATE * DURATION_S)
+    if TARGET == "visit":
+        calls = visit_calls(prepare_patients(count))
+    else:
+        calls = patient_calls(count)
+
+    result = run_open_loop(calls, rate=RATE, workers=WORKERS)
+    print_report(result)
+
+    if HISTOGRAM_PATH:
+        result.corrected.histograms.dump(HISTOGRAM_PATH)
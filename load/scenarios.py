@@ -0,0 +1,123 @@
+"""
+Сценарии нагрузочного прогона (см. src/load.py).
+
+Каждый сценарий повторяет цепочку вызовов из request_modules/:
+create_person -> create_patient -> patient_visit, list_users, search_patient,
+плюс произвольный запрос "request".
+
+Многошаговые сценарии без кода — в load/workflows.json (src/scenario_engine.py),
+они же прогоняются как функциональные тесты tests/scenarios/.
+"""
+
+import os
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from request_modules.create_random_valid_person import generate_person_payload
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import generate_openmrs_id
+from src.load import ScenarioContext
+from src.scenario_engine import load_scenarios
+
+WORKFLOWS_PATH = os.path.join(os.path.dirname(__file__), "workflows.json")
+
+
+# -----------------------------
+# metadata (один раз на прогон)
+# -----------------------------
+
+def _location_uuids(ctx: ScenarioContext) -> list:
+    return ctx.shared.get(
+        "locations",
+        lambda: [item["uuid"] for item in ctx.call("GET", "/location", params={"v": "ref"})["results"]],
+    )
+
+
+def _openmrs_id_type_uuid(ctx: ScenarioContext) -> str:
+    def load() -> str:
+        for item in ctx.call("GET", "/patientidentifiertype", params={"v": "default"})["results"]:
+            if item.get("name") == "OpenMRS ID":
+                return item["uuid"]
+        raise RuntimeError("PatientIdentifierType 'OpenMRS ID' not found")
+
+    return ctx.shared.get("openmrs_id_type", load)
+
+
+def _visit_type_uuids(ctx: ScenarioContext) -> list:
+    return ctx.shared.get(
+        "visit_types",
+        lambda: [item["uuid"] for item in ctx.call("GET", "/visittype", params={"v": "ref"})["results"]],
+    )
+
+
+def _iso_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+# -----------------------------
+# scenarios
+# -----------------------------
+
+def create_person(ctx: ScenarioContext) -> dict:
+    return ctx.call("POST", "/person", json_body=generate_person_payload())
+
+
+def create_patient(ctx: ScenarioContext) -> dict:
+    person = create_person(ctx)
+    location = random.choice(_location_uuids(ctx))
+    identifier = generate_openmrs_id(payload_length=7)
+
+    patient = ctx.call("POST", "/patient", json_body={
+        "person": person["uuid"],
+        "identifiers": [{
+            "identifier": identifier,
+            "identifierType": _openmrs_id_type_uuid(ctx),
+            "location": location,
+            "preferred": True,
+        }],
+    })
+    # для search_patient без явного q
+    ctx.shared.set("last_identifier", identifier)
+    return {"uuid": patient["uuid"], "location": location}
+
+
+def patient_visit(ctx: ScenarioContext) -> dict:
+    patient = create_patient(ctx)
+    return ctx.call("POST", "/visit", json_body={
+        "patient": patient["uuid"],
+        "visitType": random.choice(_visit_type_uuids(ctx)),
+        "startDatetime": _iso_utc(datetime.now(timezone.utc) - timedelta(minutes=1)),
+        "location": patient["location"],
+    })
+
+
+def list_users(ctx: ScenarioContext) -> None:
+    ctx.call("GET", "/user", params={"v": ctx.spec.get("v", "full"), "limit": ctx.spec.get("limit", 100)})
+
+
+def search_patient(ctx: ScenarioContext) -> None:
+    # пока ни один пациент не создан — "a", но не кэшируем: дальше ищем последнего созданного
+    q = ctx.spec.get("q") or ctx.shared.peek("last_identifier", "a")
+    ctx.call("GET", "/patient", params={"q": q, "v": ctx.spec.get("v", "default")})
+
+
+def request(ctx: ScenarioContext) -> None:
+    spec = ctx.spec
+    ctx.call(
+        spec.get("method", "GET"),
+        spec["path"],
+        params=spec.get("params"),
+        json_body=spec.get("body"),
+        expect=spec.get("expect", (200, 201, 204)),
+    )
+
+
+SCENARIOS = {
+    "create_person": create_person,
+    "create_patient": create_patient,
+    "patient_visit": patient_visit,
+    "list_users": list_users,
+    "search_patient": search_patient,
+    "request": request,
+}
+SCENARIOS.update(load_scenarios(WORKFLOWS_PATH))
@@ -0,0 +1,36 @@
+from request_modules.create_random_valid_person import get_required_identifier_type_uuid
+from request_modules.locations.get_random_valid_location import get_random_valid_location
+from src.patient_import import ImportDefaults, import_patients
+
+SOURCE_PATH = "patients.csv"  # .csv с заголовком или JSONL, колонки — в src/patient_import.py
+ERROR_PATH = "patients.errors.jsonl"
+JOURNAL_PATH = "patients.journal.jsonl"
+
+CONCURRENCY = 8
+PROGRESS_EVERY = 1000
+
+# uuid для строк без identifier_type / location; None — OpenMRS ID и случайная локация
+IDENTIFIER_TYPE_UUID = None
+LOCATION_UUID = None
+
+
+if __name__ == "__main__":
+    # python -m patient.import_patients
+    defaults = ImportDefaults(
+        identifier_type=IDENTIFIER_TYPE_UUID or get_required_identifier_type_uuid(),
+        location=LOCATION_UUID or get_random_valid_location()["uuid"],
+    )
+
+    report = import_patients(
+        SOURCE_PATH,
+        defaults,
+        error_path=ERROR_PATH,
+        journal_path=JOURNAL_PATH,
+        concurrency=CONCURRENCY,
+        progress=lambda r: print(f"... {r.summary()}"),
+        progress_every=PROGRESS_EVERY,
+    )
+
+    print(report.summary())
+    if report.rejected or report.failed:
+        print(f"Ошибки: {ERROR_PATH}")
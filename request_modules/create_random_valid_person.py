@@ -4,7 +4,8 @@ import requests
 from requests.auth import HTTPBasicAuth
 from faker import Faker
 
-from src.openmrs_patient import Person, Address, PersonName
+from src.json_views import PersonView
+from src.openmrs_patient import Person, PersonName
 
 fake = Faker("ru_RU")
 
@@ -26,49 +27,28 @@ def _fetch_person_full(person_uuid: str) -> dict:
     return r.json()
 
 
-def person_from_json(data: dict) -> Person:
-    def parse_names(obj: dict) -> list[PersonName]:
-        names_local: list[PersonName] = []
-
-        preferred = obj.get("preferredName")
-        if isinstance(preferred, dict) and preferred.get("givenName") and preferred.get("familyName"):
-            names_local.append(PersonName(givenName=preferred["givenName"], familyName=preferred["familyName"]))
-
-        for n in obj.get("names", []) or []:
-            if isinstance(n, dict) and n.get("givenName") and n.get("familyName"):
-                if not any(x.givenName == n["givenName"] and x.familyName == n["familyName"] for x in names_local):
-                    names_local.append(PersonName(givenName=n["givenName"], familyName=n["familyName"]))
-
-        return names_local
+def person_from_json(data: dict, strict: bool = False) -> Person:
+    """
+    Person из ответа /person. Поля читаются через PersonView (без копий,
+    имена без повторов — по множеству, а не вложенным any).
 
-    names = parse_names(data)
+    Нет имён в ответе (v=ref) — догружаем GET /person/{uuid}?v=full;
+    strict=True — без скрытых запросов: ValueError сразу.
+    """
+    view = PersonView(data)
+    person = view.to_person()
 
-    if not names:
-        person_uuid = data.get("uuid")
-        if person_uuid:
-            full_data = _fetch_person_full(person_uuid)
-            names = parse_names(full_data)
-            data = full_data
+    if not person.names and view.uuid and not strict:
+        data = _fetch_person_full(view.uuid)
+        person = PersonView(data).to_person()
 
-    if not names:
+    if not person.names:
         raise ValueError(
             "OpenMRS returned Person without parseable names. "
             f"uuid={data.get('uuid')}, keys={list(data.keys())}"
         )
 
-    raw_addresses = data.get("addresses") or []
-    addresses: list[Address] = [
-        Address(address1=a.get("address1", ""), cityVillage=a.get("cityVillage", ""))
-        for a in raw_addresses
-        if isinstance(a, dict)
-    ]
-
-    return Person(
-        names=names,
-        gender=data.get("gender", ""),
-        birthdate=data.get("birthdate", ""),
-        addresses=addresses,
-    )
+    return person
 
 
 def generate_person_payload() -> dict:
@@ -86,6 +66,17 @@ def generate_person_payload() -> dict:
     }
 
 
+def build_valid_person() -> Person:
+    # без POST /person: для вложенного создания в POST /patient сервер person не нужен
+    payload = generate_person_payload()
+    return Person(
+        names=[PersonName(givenName=n["givenName"], familyName=n["familyName"]) for n in payload["names"]],
+        gender=payload["gender"],
+        birthdate=payload["birthdate"],
+        addresses=[],
+    )
+
+
 def create_valid_person() -> Person:
     url = f"{BASE_URL}/person"
     payload = generate_person_payload()
@@ -2,7 +2,8 @@
 import requests
 from requests.auth import HTTPBasicAuth
 
-from src.openmrs_patient import PatientPayload, Person, PersonName, Address, Identifier
+from src.openmrs_patient import CreatedPatient, OpenMRSClient, PatientPayload, Person, PersonName, Address, Identifier
+from src.patient_index import PATIENT_INDEX
 
 
 
@@ -46,8 +47,11 @@ def create_valid_patient_with_person(username:str, password: str, person: Person
 
     assert resp.status_code == 201
 
+    # identifier -> uuid запоминаем, чтобы не искать пациента через /patient?q=
+    patient = resp.json()
+    PATIENT_INDEX.add(patient, payload=payload.to_dict())
 
-    return resp.json()
+    return patient
 
 
 def create_in_valid_patient_with_person(username:str, password: str, person: Person, location: str, identifier_type: str, patient_identifier: str):
@@ -92,3 +96,21 @@ def create_in_valid_patient_with_person(username:str, password: str, person: Per
 
     return resp
 
+
+def create_patient_one_request(username: str, password: str, person: Person, location: str,
+                               identifier_type: str, patient_identifier: str) -> CreatedPatient:
+    """
+    Пациент с вложенным person одним POST /patient; ответ сразу в нужном
+    представлении (OpenMRSClient.create_patient_with_person).
+    """
+    payload = PatientPayload(
+        person=person,
+        identifiers=[
+            Identifier(
+                identifier=patient_identifier,
+                identifierType=identifier_type,
+                location=location,
+            )
+        ],
+    )
+    return OpenMRSClient(username, password).create_patient_with_person(payload)
@@ -2,16 +2,27 @@ import requests
 from requests.auth import HTTPBasicAuth
 from typing import Optional
 
+from src.patient_index import PATIENT_INDEX
+
 BASE_URL = "http://localhost/openmrs/ws/rest/v1"
 USERNAME = "admin"
 PASSWORD = "Admin123"
 
 
-def find_patient_by_identifier(identifier: str) -> Optional[dict]:
+def find_patient_by_identifier(identifier: str, search_server: bool = False) -> Optional[dict]:
     """
     Ищет пациента по identifier.
     Возвращает patient object (dict) или None.
+
+    Пациенты, созданные в этом процессе, берутся из локального индекса;
+    search_server=True — всегда идти в поиск OpenMRS (GET /patient?q=...),
+    для тестов, которые проверяют сам поиск.
     """
+    if not search_server:
+        indexed = PATIENT_INDEX.get(identifier)
+        if indexed is not None:
+            return indexed.response
+
     url = f"{BASE_URL}/patient"
 
     response = requests.get(
@@ -34,3 +45,11 @@ def find_patient_by_identifier(identifier: str) -> Optional[dict]:
 
     # обычно identifier уникален → берём первого
     return results[0]
+
+
+def verify_patient_index(concurrency: int = 8) -> list[dict]:
+    """
+    Массовая сверка локального индекса с поиском на сервере.
+    Возвращает список расхождений (пустой — всё сходится).
+    """
+    return PATIENT_INDEX.verify(concurrency=concurrency)
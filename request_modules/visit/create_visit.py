@@ -9,13 +9,13 @@ import pytest
 import requests
 from requests.auth import HTTPBasicAuth
 
-from request_modules.create_random_valid_person import create_valid_person
-from request_modules.create_valid_patient_with_person import create_valid_patient_with_person
-from request_modules.locations.get_random_valid_location import get_random_valid_location
-from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
-    get_openmrs_id_identifier,
+from checks.visit_checks import validate_visit
+from request_modules.visit.visit_setup import (  # noqa: F401
+    get_random_valid_visit_attribute_type,
+    shared_patient,
+    shared_patient_context,
+    visit_setup,
 )
-from request_modules.visittype.get_random_valid_visit_type import get_random_valid_visit_type
 
 
 # =========================================================
@@ -104,8 +104,58 @@ def create_visit_raw(
     return post_visit_raw(payload)
 
 
-def get_visit_full(visit_uuid: str) -> dict:
-    resp = get_json(f"/visit/{visit_uuid}", params={"v": "full"})
+def get_visit(visit_uuid: str, *extra: str) -> dict:
+    """
+    Визит в представлении из полей validate_visit + extra — полей,
+    которые тест читает сам ("indication", "encounters.uuid").
+    """
+    resp = get_json(f"/visit/{visit_uuid}", params={"v": validate_visit.representation(*extra)})
+    resp.raise_for_status()
+    return resp.json()
+
+
+def create_visit(
+    *,
+    username: str,
+    password: str,
+    patient_uuid: str,
+    visit_type_uuid: str,
+    start_datetime_iso: str,
+    location_uuid: str,
+    stop_datetime_iso: str | None = None,
+) -> requests.Response:
+    """
+    POST /visit от имени пользователя. Возвращает сырой ответ (статус проверяет тест).
+    """
+    payload: dict = {
+        "patient": patient_uuid,
+        "visitType": visit_type_uuid,
+        "startDatetime": start_datetime_iso,
+        "location": location_uuid,
+    }
+    if stop_datetime_iso is not None:
+        payload["stopDatetime"] = stop_datetime_iso
+
+    return requests.post(
+        f"{BASE_URL}/visit",
+        json=payload,
+        auth=HTTPBasicAuth(username, password),
+        headers={"Accept": "application/json", "Content-Type": "application/json"},
+        timeout=30,
+    )
+
+
+def fetch_visit(*, username: str, password: str, visit_uuid: str) -> dict:
+    """
+    GET /visit/{uuid} ровно с теми полями, которые проверяет assert_valid_visit_response.
+    """
+    resp = requests.get(
+        f"{BASE_URL}/visit/{visit_uuid}",
+        params={"v": validate_visit.representation()},
+        auth=HTTPBasicAuth(username, password),
+        headers={"Accept": "application/json"},
+        timeout=30,
+    )
     resp.raise_for_status()
     return resp.json()
 
@@ -122,17 +172,6 @@ def get_random_valid_encounter_type_uuid() -> str:
     return results[0]["uuid"]
 
 
-def get_random_valid_visit_attribute_type() -> dict:
-    resp = get_json("/visitattributetype", params={"v": "full"})
-    if resp.status_code == 404:
-        pytest.skip("/visitattributetype endpoint not available")
-    resp.raise_for_status()
-    results = resp.json().get("results") or []
-    if not results:
-        pytest.skip("No visit attribute types available")
-    return results[0]
-
-
 def create_encounter_minimal(patient_uuid: str, location_uuid: str) -> requests.Response:
     payload = {
         "patient": patient_uuid,
@@ -151,47 +190,26 @@ def post_visit_attribute(visit_uuid: str, attribute_type_uuid: str, value: objec
 # =========================================================
 # fixtures
 # =========================================================
+# шаги и зависимости — request_modules/visit/visit_setup.py: независимые
+# (location, identifier type, visit type) выполняются параллельно
 @pytest.fixture()
-def patient_context() -> dict:
-    person = create_valid_person()
-    location_uuid = get_random_valid_location()["uuid"]
-    id_type_uuid, id_value = get_openmrs_id_identifier()
-
-    patient = create_valid_patient_with_person(
-        username=ADMIN_USERNAME,
-        password=ADMIN_PASSWORD,
-        person=person,
-        location=location_uuid,
-        identifier_type=id_type_uuid,
-        patient_identifier=id_value,
-    )
-
-    return {
-        "patient_uuid": patient["uuid"],
-        "location_uuid": location_uuid,
-    }
+def patient_context(visit_setup) -> dict:
+    return visit_setup.get("patient_context")
 
 
 @pytest.fixture()
-def visit_type_uuid() -> str:
-    return get_random_valid_visit_type()["uuid"]
+def visit_type_uuid(visit_setup) -> str:
+    return visit_setup.get("visit_type_uuid")
 
 
 @pytest.fixture()
-def created_visit_uuid(patient_context: dict, visit_type_uuid: str) -> str:
-    resp = create_visit_raw(
-        patient_uuid=patient_context["patient_uuid"],
-        visit_type_uuid=visit_type_uuid,
-        location_uuid=patient_context["location_uuid"],
-    )
-    assert_500_is_xfail(resp)
-    assert resp.status_code in (200, 201), resp.text
-    return resp.json()["uuid"]
+def created_visit_uuid(visit_setup) -> str:
+    return visit_setup.get("created_visit_uuid")
 
 
 @pytest.fixture()
-def visit_attribute_type() -> dict:
-    return get_random_valid_visit_attribute_type()
+def visit_attribute_type(visit_setup) -> dict:
+    return visit_setup.get("visit_attribute_type")
 
 
 
@@ -199,12 +217,12 @@ def visit_attribute_type() -> dict:
     "bad_patient",
     [None, "", "not-a-uuid", str(uuid.uuid4())],
 )
-def test_create_visit_invalid_patient_field(patient_context, visit_type_uuid, bad_patient):
+def test_create_visit_invalid_patient_field(shared_patient_context, visit_type_uuid, bad_patient):
     payload = {
         "patient": bad_patient,
         "visitType": visit_type_uuid,
         "startDatetime": iso_utc(datetime.now(timezone.utc)),
-        "location": patient_context["location_uuid"],
+        "location": shared_patient_context["location_uuid"],
     }
 
     resp = post_visit_raw(payload)
@@ -220,12 +238,12 @@ def test_create_visit_invalid_patient_field(patient_context, visit_type_uuid, ba
     "bad_visit_type",
     [None, "", "not-a-uuid", str(uuid.uuid4())],
 )
-def test_create_visit_invalid_visit_type_field(patient_context, bad_visit_type):
+def test_create_visit_invalid_visit_type_field(shared_patient_context, bad_visit_type):
     payload = {
-        "patient": patient_context["patient_uuid"],
+        "patient": shared_patient_context["patient_uuid"],
         "visitType": bad_visit_type,
         "startDatetime": iso_utc(datetime.now(timezone.utc)),
-        "location": patient_context["location_uuid"],
+        "location": shared_patient_context["location_uuid"],
     }
 
     resp = post_visit_raw(payload)
@@ -235,9 +253,9 @@ def test_create_visit_invalid_visit_type_field(patient_context, bad_visit_type):
 
 @pytest.mark.xfail(reason="OpenMRS sometimes ignores invalid location on create visit")
 @pytest.mark.parametrize("bad_location", [None, "", "abc", str(uuid.uuid4())])
-def test_create_visit_invalid_location(patient_context, visit_type_uuid, bad_location):
+def test_create_visit_invalid_location(shared_patient_context, visit_type_uuid, bad_location):
     payload = {
-        "patient": patient_context["patient_uuid"],
+        "patient": shared_patient_context["patient_uuid"],
         "visitType": visit_type_uuid,
         "startDatetime": iso_utc(datetime.now(timezone.utc)),
         "location": bad_location,
@@ -260,16 +278,16 @@ def test_create_visit_with_indication_success(patient_context, visit_type_uuid):
     )
     assert resp.status_code in (200, 201), resp.text
 
-    full = get_visit_full(resp.json()["uuid"])
+    full = get_visit(resp.json()["uuid"], "indication")
     assert full.get("indication") in ("Follow-up visit", None)
 
 
 @pytest.mark.parametrize("bad_indication", [123, {"a": 1}, ["x"], True])
-def test_create_visit_invalid_indication_type(patient_context, visit_type_uuid, bad_indication):
+def test_create_visit_invalid_indication_type(shared_patient_context, visit_type_uuid, bad_indication):
     resp = create_visit_raw(
-        patient_uuid=patient_context["patient_uuid"],
+        patient_uuid=shared_patient_context["patient_uuid"],
         visit_type_uuid=visit_type_uuid,
-        location_uuid=patient_context["location_uuid"],
+        location_uuid=shared_patient_context["location_uuid"],
         indication=bad_indication,
     )
     assert_500_is_xfail(resp)
@@ -288,7 +306,7 @@ def test_create_visit_without_encounters_success(patient_context, visit_type_uui
     )
     assert resp.status_code in (200, 201)
 
-    full = get_visit_full(resp.json()["uuid"])
+    full = get_visit(resp.json()["uuid"], "encounters.uuid")
     assert "encounters" not in full or isinstance(full["encounters"], list)
 
 
@@ -302,11 +320,11 @@ def test_create_visit_without_encounters_success(patient_context, visit_type_uui
      [str(uuid.uuid4())]
     ],
 )
-def test_create_visit_invalid_encounters_field(patient_context, visit_type_uuid, bad_encounters):
+def test_create_visit_invalid_encounters_field(shared_patient_context, visit_type_uuid, bad_encounters):
     resp = create_visit_raw(
-        patient_uuid=patient_context["patient_uuid"],
+        patient_uuid=shared_patient_context["patient_uuid"],
         visit_type_uuid=visit_type_uuid,
-        location_uuid=patient_context["location_uuid"],
+        location_uuid=shared_patient_context["location_uuid"],
         encounters=bad_encounters,
     )
     #TODO: понять на что опираться при падении
@@ -350,7 +368,7 @@ def test_create_visit_with_real_encounter_success(patient_context, visit_type_uu
     assert visit_resp.status_code in (200, 201), visit_resp.text
     visit_uuid = visit_resp.json()["uuid"]
 
-    full_visit = get_visit_full(visit_uuid)
+    full_visit = get_visit(visit_uuid, "encounters.uuid")
     visit_enc_uuids = set(_extract_uuids(full_visit.get("encounters")))
     if enc_uuid in visit_enc_uuids:
         return  # ✅ сервер сам привязал encounter к visit
@@ -367,7 +385,7 @@ def test_add_visit_attribute_success(created_visit_uuid, visit_attribute_type):
     )
     assert resp.status_code in (200, 201)
 
-    full = get_visit_full(created_visit_uuid)
+    full = get_visit(created_visit_uuid, "attributes.attributeType.uuid")
     assert any(
         (
             (a.get("attributeType", {}).get("uuid") if isinstance(a.get("attributeType"), dict) else a.get("attributeType"))
@@ -0,0 +1,155 @@
+# request_modules/visit/visit_setup.py
+"""
+Граф подготовки данных для тестов /visit (src/setup_graph.py).
+
+    location_uuid ────────┐
+    openmrs_id_type_uuid ─┼─> patient ─> patient_context ─┐
+    person ───────────────┘                               ├─> created_visit_uuid
+    visit_type_uuid ──────────────────────────────────────┘
+    visit_attribute_type
+
+Имена шагов совпадают с именами фикстур: фикстура visit_setup сразу
+запускает все шаги, которые нужны тесту, и они идут параллельно.
+
+shared_patient_context — тот же patient_context, но один на модуль и
+только для чтения (src/readonly_context.py): для негативных матриц,
+где сервер должен отклонить запрос и пациент не меняется.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from request_modules.create_random_valid_person import build_valid_person
+from request_modules.create_valid_patient_with_person import create_patient_one_request
+from request_modules.locations.get_random_valid_location import get_random_valid_location
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
+    generate_openmrs_id,
+    get_openmrs_id_identifier,
+)
+from request_modules.visittype.get_random_valid_visit_type import get_random_valid_visit_type
+from src import readonly_context
+from src.readonly_context import ReadOnlyContext
+from src.setup_graph import SetupGraph
+
+BASE_URL = "http://localhost/openmrs/ws/rest/v1"
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "Admin123"
+
+VISIT_SETUP = SetupGraph()
+
+
+# =========================================================
+# metadata
+# =========================================================
+@VISIT_SETUP.step()
+def location_uuid() -> str:
+    return get_random_valid_location()["uuid"]
+
+
+@VISIT_SETUP.step(scope="session")
+def openmrs_id_type_uuid() -> str:
+    # тип "OpenMRS ID" один на сервер
+    return get_openmrs_id_identifier()[0]
+
+
+@VISIT_SETUP.step()
+def visit_type_uuid() -> str:
+    return get_random_valid_visit_type()["uuid"]
+
+
+def get_random_valid_visit_attribute_type() -> dict:
+    resp = requests.get(
+        f"{BASE_URL}/visitattributetype",
+        params={"v": "full"},
+        auth=HTTPBasicAuth(ADMIN_USERNAME, ADMIN_PASSWORD),
+        headers={"Accept": "application/json"},
+        timeout=30,
+    )
+    if resp.status_code == 404:
+        pytest.skip("/visitattributetype endpoint not available")
+    resp.raise_for_status()
+    results = resp.json().get("results") or []
+    if not results:
+        pytest.skip("No visit attribute types available")
+    return results[0]
+
+
+@VISIT_SETUP.step(scope="session")
+def visit_attribute_type() -> dict:
+    return get_random_valid_visit_attribute_type()
+
+
+# =========================================================
+# patient / visit
+# =========================================================
+@VISIT_SETUP.step()
+def person():
+    return build_valid_person()
+
+
+@VISIT_SETUP.step()
+def patient(person, location_uuid, openmrs_id_type_uuid):
+    return create_patient_one_request(
+        username=ADMIN_USERNAME,
+        password=ADMIN_PASSWORD,
+        person=person,
+        location=location_uuid,
+        identifier_type=openmrs_id_type_uuid,
+        patient_identifier=generate_openmrs_id(payload_length=7),
+    )
+
+
+@VISIT_SETUP.step()
+def patient_context(patient, location_uuid) -> dict:
+    return {
+        "patient_uuid": patient.uuid,
+        "location_uuid": location_uuid,
+    }
+
+
+@VISIT_SETUP.step()
+def created_visit_uuid(patient_context, visit_type_uuid) -> str:
+    resp = requests.post(
+        f"{BASE_URL}/visit",
+        json={
+            "patient": patient_context["patient_uuid"],
+            "visitType": visit_type_uuid,
+            "startDatetime": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "location": patient_context["location_uuid"],
+        },
+        auth=HTTPBasicAuth(ADMIN_USERNAME, ADMIN_PASSWORD),
+        headers={"Accept": "application/json", "Content-Type": "application/json"},
+        timeout=30,
+    )
+    if resp.status_code == 500:
+        pytest.xfail(f"Server returned 500 (likely OpenMRS bug/unstable validation): {resp.text[:250]}")
+    assert resp.status_code in (200, 201), resp.text
+    return resp.json()["uuid"]
+
+
+# =========================================================
+# fixtures
+# =========================================================
+@pytest.fixture()
+def visit_setup(request):
+    scope = VISIT_SETUP.scope()
+    scope.start(*[name for name in request.fixturenames if name in VISIT_SETUP])
+    return scope
+
+
+@pytest.fixture(scope="module")
+def shared_patient(request) -> ReadOnlyContext:
+    return ReadOnlyContext(
+        lambda: VISIT_SETUP.scope().get("patient_context"),
+        guard=readonly_context.guard(request.config),
+        watch=("patient_uuid",),
+    )
+
+
+@pytest.fixture()
+def shared_patient_context(request, shared_patient):
+    with shared_patient.use(request.node) as context:
+        yield context
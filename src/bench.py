@@ -0,0 +1,171 @@
+"""
+bench.py
+
+Микробенчмарки локального (без сети) кода: генерация идентификаторов,
+сборка payload'ов, разбор ответов, проверки из checks/.
+
+Замер в духе timeit: число повторов в серии подбирается так, чтобы серия
+шла не меньше min_time, серий — repeat, в результат идёт медиана и
+минимум времени на одну операцию (нс). Сборщик мусора на время серии
+выключается.
+
+Результаты дописываются в JSONL-историю (прогон на строку) и
+сравниваются с базовой линией: регрессия — медиана медленнее базы больше
+чем на threshold (0.10 = 10%).
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+
+@dataclass
+class BenchResult:
+    name: str
+    median_ns: float
+    min_ns: float
+    loops: int
+    repeat: int
+
+
+def measure(name: str, func: Callable[[], object], *, min_time: float = 0.2, repeat: int = 5) -> BenchResult:
+    loops = _calibrate(func, min_time)
+    per_op = [_run(func, loops) / loops * 1e9 for _ in range(repeat)]
+    return BenchResult(name, statistics.median(per_op), min(per_op), loops, repeat)
+
+
+def _calibrate(func: Callable[[], object], min_time: float) -> int:
+    loops = 1
+    while True:
+        elapsed = _run(func, loops)
+        if elapsed >= min_time:
+            return loops
+        # сразу к нужному порядку, но не больше чем в 10 раз за шаг
+        loops *= max(2, min(10, int(min_time / max(elapsed, 1e-9)) + 1))
+
+
+def _run(func: Callable[[], object], loops: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def run_benchmarks(benchmarks: Mapping[str, Callable[[], Callable[[], object]]], *,
+                   only: Optional[List[str]] = None, min_time: float = 0.2, repeat: int = 5) -> List[BenchResult]:
+    """
+    benchmarks: имя -> фабрика, которая готовит данные (не замеряется)
+    и возвращает замеряемую функцию без аргументов.
+    """
+    results = []
+    for name, factory in benchmarks.items():
+        if only and name not in only:
+            continue
+        results.append(measure(name, factory(), min_time=min_time, repeat=repeat))
+    return results
+
+
+# -----------------------------
+# history / baseline
+# -----------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_record(results: List[BenchResult]) -> Dict:
+    return {
+        "timestamp": time.time(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def append_history(path: str, results: List[BenchResult]) -> Dict:
+    record = run_record(results)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+def iter_history(path: str) -> Iterator[Dict]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def save_baseline(path: str, results: List[BenchResult]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run_record(results), f, ensure_ascii=False, indent=1)
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    """
+    имя -> медиана (нс). Файла нет — пустая база (всё будет "new").
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {r["name"]: r["median_ns"] for r in json.load(f)["results"]}
+
+
+COMPARE_HEADERS = ("benchmark", "median", "min", "baseline", "change", "status")
+
+
+def compare(results: List[BenchResult], baseline: Mapping[str, float],
+            threshold: float = 0.10) -> List[Tuple[BenchResult, Optional[float], str]]:
+    """
+    (результат, относительное изменение к базе, статус):
+    regression / faster — изменение за пределами ±threshold, иначе ok; new — нет в базе.
+    """
+    compared = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base:
+            compared.append((r, None, "new"))
+            continue
+        change = r.median_ns / base - 1
+        status = "regression" if change > threshold else "faster" if change < -threshold else "ok"
+        compared.append((r, change, status))
+    return compared
+
+
+def compare_rows(compared: List[Tuple[BenchResult, Optional[float], str]],
+                 baseline: Mapping[str, float]) -> Iterator[Tuple]:
+    for r, change, status in compared:
+        yield (
+            r.name,
+            format_ns(r.median_ns),
+            format_ns(r.min_ns),
+            format_ns(baseline[r.name]) if r.name in baseline else "-",
+            f"{change:+.1%}" if change is not None else "-",
+            status,
+        )
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
@@ -0,0 +1,62 @@
+"""
+concurrency.py
+
+Общие помощники для параллельных запросов к OpenMRS:
+ограниченный пул задач и отдельный клиент на каждый поток.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Tuple
+
+from src.openmrs_patient import OpenMRSClient
+
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "Admin123"
+
+
+def run_bounded(items: Iterable, fn: Callable, concurrency: int) -> Iterator[Tuple[object, object]]:
+    """
+    Выполняет fn(item) в пуле потоков, держа в работе не более 2 * concurrency задач.
+    Отдаёт (item, result) по мере завершения; исключение fn возвращается как result.
+    """
+    items = iter(items)
+    end = object()
+    window = max(1, concurrency) * 2
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+
+        def fill() -> None:
+            while len(pending) < window:
+                item = next(items, end)
+                if item is end:
+                    return
+                pending[pool.submit(fn, item)] = item
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, error if error is not None else future.result()
+            fill()
+
+
+_local = threading.local()
+
+
+def thread_client(username: str = ADMIN_USERNAME, password: str = ADMIN_PASSWORD) -> OpenMRSClient:
+    """
+    Отдельный OpenMRSClient (и requests.Session) на каждый рабочий поток и набор кредов.
+    """
+    clients = getattr(_local, "clients", None)
+    if clients is None:
+        clients = _local.clients = {}
+
+    client = clients.get((username, password))
+    if client is None:
+        client = clients[(username, password)] = OpenMRSClient(username, password)
+    return client
@@ -0,0 +1,353 @@
+"""
+field_usage.py
+
+Профилировщик использования полей ответов: какие поля JSON, пришедшего
+от OpenMRS, код действительно читает. Данные для подбора v= (например,
+нужен ли get_active_users v=full) — до правки представлений, а не после.
+
+    pytest --field-usage=field_usage.json     # + сводка в конце прогона
+
+    with FieldUsageProfiler() as profiler:     # вне pytest (скрипты user/, load/)
+        list(iter_active_users())
+    print(profiler.render())
+
+Пока профилировщик включён, Response.json() ответов OpenMRS возвращает
+TrackedDict — подкласс dict с учётом чтения полей (isinstance, ==,
+json.dumps работают как раньше). Учёт — по (метод + эндпоинт, v=):
+сколько раз поле пришло, сколько раз его прочитали, сколько байт оно
+заняло в ответах и какие места вызова его читали. Место вызова — первый
+кадр вне src/ и библиотек, вызвавший .json() (для OpenMRSClient — тот,
+кто вызвал метод клиента).
+
+Чтением считаются [], get, in, items()/values(), ==, pop/setdefault.
+Не видны перебор одних ключей (for k in d) и копии (dict(d), {**d},
+copy.deepcopy, dataclasses.asdict): поля, прочитанные уже из копии,
+останутся «неиспользованными».
+Поле-объект считается использованным, если прочитано оно само; в отчёт
+попадает верхнее неиспользованное поле, без его вложенных.
+"""
+
+import copy
+import json
+import os
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from src.instrumentation import endpoint_template
+from src.openmrs_patient import OpenMRSClient
+
+
+PLUGIN_NAME = "field_usage"
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_LIB_DIRS = tuple({sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"],
+                   sysconfig.get_paths()["platlib"]})
+_ROOT_DIR = os.path.dirname(_SRC_DIR)
+
+_patch_lock = threading.Lock()
+
+
+@dataclass
+class FieldStats:
+    fetched: int = 0
+    used: int = 0
+    bytes: int = 0
+    sites: Counter = field(default_factory=Counter)  # место вызова -> сколько раз прочитало
+
+
+@dataclass
+class EndpointUsage:
+    endpoint: str  # "GET /user"
+    representation: str
+    responses: int = 0
+    bytes: int = 0
+    sites: Counter = field(default_factory=Counter)  # место вызова -> ответов
+    fields: Dict[str, FieldStats] = field(default_factory=dict)
+
+    def unused(self) -> List[Tuple[str, FieldStats]]:
+        """
+        Пришедшие, но ни разу не прочитанные поля, по убыванию байт;
+        вложенные поля неиспользованного объекта не повторяются.
+        """
+        out = []
+        for path, stats in self.fields.items():
+            if stats.used or _parent_unused(self.fields, path):
+                continue
+            out.append((path, stats))
+        return sorted(out, key=lambda item: -item[1].bytes)
+
+    def to_dict(self) -> Dict:
+        unused = self.unused()
+        return {
+            "endpoint": self.endpoint,
+            "representation": self.representation,
+            "responses": self.responses,
+            "bytes": self.bytes,
+            "unused_bytes": sum(s.bytes for _, s in unused),
+            "sites": dict(self.sites.most_common()),
+            "unused": [{"path": p, "fetched": s.fetched, "bytes": s.bytes} for p, s in unused],
+            "used": [
+                {"path": p, "fetched": s.fetched, "used": s.used, "bytes": s.bytes, "sites": dict(s.sites)}
+                for p, s in sorted(self.fields.items()) if s.used
+            ],
+        }
+
+
+def _parent_unused(fields: Dict[str, FieldStats], path: str) -> bool:
+    parent = path.rsplit(".", 1)[0] if "." in path else ""
+    parent = parent[:-2] if parent.endswith("[]") else parent
+    return bool(parent) and parent in fields and not fields[parent].used
+
+
+class TrackedDict(dict):
+    """
+    dict ответа, который отмечает прочитанные ключи в FieldStats.
+    """
+
+    # type(d)(...) без профилировщика (dataclasses.asdict и т.п.) — копия, без учёта
+    _profiler: Optional["FieldUsageProfiler"] = None
+
+    def _mark(self, key) -> None:
+        if self._profiler is None or key in self._read or not dict.__contains__(self, key):
+            return
+        self._read.add(key)
+        self._profiler.mark(self._usage, f"{self._prefix}{key}", self._site)
+
+    def _mark_all(self) -> None:
+        for key in dict.keys(self):
+            self._mark(key)
+
+    def __getitem__(self, key):
+        self._mark(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._mark(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key) -> bool:
+        self._mark(key)
+        return dict.__contains__(self, key)
+
+    def items(self):
+        self._mark_all()
+        return dict.items(self)
+
+    def values(self):
+        self._mark_all()
+        return dict.values(self)
+
+    def pop(self, key, *default):
+        self._mark(key)
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key, default=None):
+        self._mark(key)
+        return dict.setdefault(self, key, default)
+
+    def __eq__(self, other) -> bool:
+        self._mark_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        self._mark_all()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    # копия — обычный dict: чтения из неё не учитываются
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class FieldUsageProfiler:
+    """
+    Подменяет requests.Response.json на время install() / with.
+    Учитываются ответы с URL под prefix (BASE_URL OpenMRS).
+    """
+
+    def __init__(self, prefix: str = OpenMRSClient.BASE_URL) -> None:
+        self.prefix = prefix
+        self.usage: Dict[Tuple[str, str], EndpointUsage] = {}
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self) -> "FieldUsageProfiler":
+        with _patch_lock:
+            if self._original is not None:
+                return self
+            original = requests.Response.json
+            if getattr(original, "_field_usage", False):
+                raise RuntimeError("another FieldUsageProfiler is already installed")
+            profiler = self
+
+            def json(resp, **kwargs):
+                tracked = getattr(resp, "_field_usage_data", None)
+                if tracked is None:
+                    tracked = profiler.track(resp, original(resp, **kwargs))
+                    resp._field_usage_data = tracked
+                return tracked
+
+            json._field_usage = True
+            self._original = original
+            requests.Response.json = json
+        return self
+
+    def uninstall(self) -> None:
+        with _patch_lock:
+            if self._original is not None:
+                requests.Response.json = self._original
+                self._original = None
+
+    def __enter__(self) -> "FieldUsageProfiler":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
+
+    # -----------------------------
+    # tracking
+    # -----------------------------
+
+    def track(self, resp: requests.Response, data: object) -> object:
+        url = resp.url or ""
+        if not url.startswith(self.prefix) or not isinstance(data, (dict, list)):
+            return data
+
+        method = resp.request.method if resp.request is not None else "GET"
+        representation = parse_qs(urlsplit(url).query).get("v", ["default"])[0]
+        key = (f"{method} {endpoint_template(url)}", representation)
+        site = _call_site()
+
+        with self._lock:
+            usage = self.usage.get(key)
+            if usage is None:
+                usage = self.usage[key] = EndpointUsage(*key)
+            usage.responses += 1
+            usage.bytes += len(resp.content or b"")
+            usage.sites[site] += 1
+            wrapped, _ = self._wrap(data, "", usage, site)
+        return wrapped
+
+    def mark(self, usage: EndpointUsage, path: str, site: str) -> None:
+        with self._lock:
+            stats = usage.fields[path]
+            stats.used += 1
+            stats.sites[site] += 1
+
+    def _wrap(self, value: object, path: str, usage: EndpointUsage, site: str) -> Tuple[object, int]:
+        """
+        (обёрнутое значение, размер в байтах компактного JSON).
+        """
+        if isinstance(value, dict):
+            prefix = f"{path}." if path else ""
+            tracked = TrackedDict()
+            size = 1 + max(len(value), 1)  # скобки и запятые
+            for key, item in value.items():
+                child, child_size = self._wrap(item, f"{prefix}{key}", usage, site)
+                dict.__setitem__(tracked, key, child)
+                field_size = len(key) + 3 + child_size  # "key":
+                stats = usage.fields.get(f"{prefix}{key}")
+                if stats is None:
+                    stats = usage.fields[f"{prefix}{key}"] = FieldStats()
+                stats.fetched += 1
+                stats.bytes += field_size
+                size += field_size
+            tracked._profiler, tracked._usage, tracked._prefix = self, usage, prefix
+            tracked._site, tracked._read = site, set()
+            return tracked, size
+        if isinstance(value, list):
+            items = [self._wrap(item, f"{path}[]", usage, site) for item in value]
+            return [item for item, _ in items], 1 + max(len(items), 1) + sum(s for _, s in items)
+        return value, len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    # -----------------------------
+    # report
+    # -----------------------------
+
+    def report(self) -> List[Dict]:
+        with self._lock:
+            rows = [u.to_dict() for u in self.usage.values()]
+        return sorted(rows, key=lambda r: -r["unused_bytes"])
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=1)
+
+    def render(self, limit: int = 20, fields_limit: int = 8) -> str:
+        lines = []
+        for row in self.report()[:limit]:
+            share = row["unused_bytes"] / row["bytes"] * 100 if row["bytes"] else 0.0
+            lines.append(f"{row['endpoint']}  v={row['representation']}  responses: {row['responses']}, "
+                         f"{format_bytes(row['bytes'])}, unused: {format_bytes(row['unused_bytes'])} ({share:.0f}%)")
+            lines.append("    sites: " + ", ".join(row["sites"]))
+            if row["unused"]:
+                unused = row["unused"][:fields_limit]
+                more = len(row["unused"]) - len(unused)
+                lines.append("    unused: " + ", ".join(f"{u['path']} ({format_bytes(u['bytes'])})" for u in unused)
+                             + (f", +{more}" if more > 0 else ""))
+        return "\n".join(lines)
+
+    # -----------------------------
+    # pytest
+    # -----------------------------
+
+    def pytest_sessionstart(self, session):
+        self.install()
+
+    def pytest_sessionfinish(self, session):
+        self.uninstall()
+        path = session.config.getoption("--field-usage")
+        if path:
+            self.write(path)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.usage:
+            return
+        terminalreporter.section("Field usage")
+        for line in self.render().splitlines():
+            terminalreporter.write_line(line)
+
+
+def _call_site() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith((_SRC_DIR, *_LIB_DIRS)) and not filename.startswith("<"):
+            return f"{os.path.relpath(filename, _ROOT_DIR)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "?"
+
+
+def format_bytes(n: float) -> str:
+    if n < 1024:
+        return f"{n:.0f} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n / 1024 / 1024:.1f} MB"
+
+
+def addoption(parser) -> None:
+    parser.addoption("--field-usage", default=None,
+                     help="JSON с учётом прочитанных полей ответов по эндпоинтам и v= (+ сводка)")
+
+
+def configure(config) -> Optional[FieldUsageProfiler]:
+    if not config.getoption("--field-usage"):
+        return None
+    profiler = FieldUsageProfiler()
+    config.pluginmanager.register(profiler, PLUGIN_NAME)
+    return profiler
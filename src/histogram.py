@@ -0,0 +1,260 @@
+"""
+histogram.py
+
+Гистограммы задержек постоянного размера в духе HdrHistogram.
+
+Значения хранятся в микросекундах в логарифмических корзинах:
+внутри каждой степени двойки — 128 линейных подкорзин, поэтому
+относительная погрешность не больше 1% (2 значащие цифры) на всём
+диапазоне от 1 мкс до highest. Память не зависит от числа замеров.
+
+Гистограммы складываются (merge) между потоками и процессами
+и сериализуются в JSON (только ненулевые корзины).
+"""
+
+import json
+import math
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+SUB_BUCKET_HALF_MAGNITUDE = 7
+SUB_BUCKET_HALF_COUNT = 1 << SUB_BUCKET_HALF_MAGNITUDE  # 128
+SUB_BUCKET_COUNT = SUB_BUCKET_HALF_COUNT * 2            # 256
+
+DEFAULT_HIGHEST_MS = 60 * 60 * 1000  # 1 час
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек в миллисекундах. Потокобезопасна.
+    """
+
+    def __init__(self, highest_ms: float = DEFAULT_HIGHEST_MS) -> None:
+        self.highest_ms = highest_ms
+        self._highest_us = max(SUB_BUCKET_COUNT, int(highest_ms * 1000))
+
+        bucket_count = 1
+        while (SUB_BUCKET_COUNT << (bucket_count - 1)) <= self._highest_us:
+            bucket_count += 1
+        self._counts: List[int] = [0] * ((bucket_count + 1) * SUB_BUCKET_HALF_COUNT)
+
+        self._lock = threading.Lock()
+        self.count = 0
+        self._total_us = 0
+        self._min_us: Optional[int] = None
+        self._max_us = 0
+
+    # -----------------------------
+    # index math
+    # -----------------------------
+
+    @staticmethod
+    def _index(value_us: int) -> int:
+        bucket = max(0, value_us.bit_length() - (SUB_BUCKET_HALF_MAGNITUDE + 1))
+        sub = value_us >> bucket
+        return ((bucket + 1) << SUB_BUCKET_HALF_MAGNITUDE) + sub - SUB_BUCKET_HALF_COUNT
+
+    @staticmethod
+    def _bucket_range(index: int) -> Tuple[int, int]:
+        """
+        (наименьшее, наибольшее) значение в мкс, попадающее в корзину index.
+        """
+        bucket = (index >> SUB_BUCKET_HALF_MAGNITUDE) - 1
+        sub = (index & (SUB_BUCKET_HALF_COUNT - 1)) + SUB_BUCKET_HALF_COUNT
+        if bucket < 0:
+            bucket = 0
+            sub -= SUB_BUCKET_HALF_COUNT
+        low = sub << bucket
+        return low, low + (1 << bucket) - 1
+
+    # -----------------------------
+    # recording
+    # -----------------------------
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        # больше highest — в последнюю корзину (max всё равно точный)
+        value_us = max(0, int(round(value_ms * 1000)))
+        index = self._index(min(value_us, self._highest_us))
+
+        with self._lock:
+            self._counts[index] += count
+            self.count += count
+            self._total_us += value_us * count
+            self._max_us = max(self._max_us, value_us)
+            self._min_us = value_us if self._min_us is None else min(self._min_us, value_us)
+
+    def record_corrected(self, value_ms: float, expected_interval_ms: float) -> None:
+        """
+        Поправка на coordinated omission для closed loop: если замер дольше
+        ожидаемого интервала между запросами, досчитываются запросы, которые
+        не были отправлены, пока клиент ждал (value - k * interval).
+        """
+        self.record(value_ms)
+        if expected_interval_ms <= 0:
+            return
+        missing = value_ms - expected_interval_ms
+        while missing >= expected_interval_ms:
+            self.record(missing)
+            missing -= expected_interval_ms
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if len(other._counts) > len(self._counts):
+            raise ValueError("Cannot merge a histogram with a larger range into a smaller one")
+
+        with other._lock:
+            counts = list(other._counts)
+            count, total, low, high = other.count, other._total_us, other._min_us, other._max_us
+
+        with self._lock:
+            for index, n in enumerate(counts):
+                if n:
+                    self._counts[index] += n
+            self.count += count
+            self._total_us += total
+            self._max_us = max(self._max_us, high)
+            if low is not None:
+                self._min_us = low if self._min_us is None else min(self._min_us, low)
+        return self
+
+    __iadd__ = merge
+
+    # -----------------------------
+    # queries
+    # -----------------------------
+
+    @property
+    def min(self) -> float:
+        return (self._min_us or 0) / 1000
+
+    @property
+    def max(self) -> float:
+        return self._max_us / 1000
+
+    @property
+    def mean(self) -> float:
+        return self._total_us / self.count / 1000 if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+        Значение (мс), не меньше которого p% замеров: верхняя граница корзины,
+        но не больше точного max.
+        """
+        return self.percentiles((p,))[0]
+
+    def percentiles(self, ps: Iterable[float]) -> List[float]:
+        ps = list(ps)
+        with self._lock:
+            total = self.count
+            if not total:
+                return [0.0] * len(ps)
+
+            targets = sorted((max(1, math.ceil(p / 100 * total)), i) for i, p in enumerate(ps))
+            result = [0.0] * len(ps)
+            seen = 0
+            t = 0
+            for index, n in enumerate(self._counts):
+                if not n:
+                    continue
+                seen += n
+                while t < len(targets) and seen >= targets[t][0]:
+                    high = self._bucket_range(index)[1]
+                    result[targets[t][1]] = min(high, self._max_us) / 1000
+                    t += 1
+                if t == len(targets):
+                    break
+            return result
+
+    # -----------------------------
+    # serialization
+    # -----------------------------
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "highest_ms": self.highest_ms,
+                "count": self.count,
+                "total_us": self._total_us,
+                "min_us": self._min_us,
+                "max_us": self._max_us,
+                "counts": {str(i): n for i, n in enumerate(self._counts) if n},
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        hist = cls(highest_ms=data["highest_ms"])
+        for index, n in data["counts"].items():
+            hist._counts[int(index)] = n
+        hist.count = data["count"]
+        hist._total_us = data["total_us"]
+        hist._min_us = data["min_us"]
+        hist._max_us = data["max_us"]
+        return hist
+
+
+class HistogramSet:
+    """
+    Гистограммы по (эндпоинт, статус). Потокобезопасен, сливается и пишется в JSON.
+    """
+
+    def __init__(self, highest_ms: float = DEFAULT_HIGHEST_MS) -> None:
+        self.highest_ms = highest_ms
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, int], LatencyHistogram] = {}
+
+    def __len__(self) -> int:
+        return len(self._histograms)
+
+    def get(self, endpoint: str, status: int) -> LatencyHistogram:
+        key = (endpoint, status)
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, LatencyHistogram(self.highest_ms))
+        return hist
+
+    def record(self, endpoint: str, status: int, value_ms: float) -> None:
+        self.get(endpoint, status).record(value_ms)
+
+    def items(self) -> List[Tuple[Tuple[str, int], LatencyHistogram]]:
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def by_endpoint(self) -> Iterator[Tuple[str, LatencyHistogram]]:
+        """
+        (endpoint, гистограмма по всем статусам), по алфавиту.
+        """
+        merged: Dict[str, LatencyHistogram] = {}
+        for (endpoint, _), hist in self.items():
+            merged.setdefault(endpoint, LatencyHistogram(self.highest_ms)).merge(hist)
+        return iter(sorted(merged.items()))
+
+    def merge(self, other: "HistogramSet") -> "HistogramSet":
+        for (endpoint, status), hist in other.items():
+            self.get(endpoint, status).merge(hist)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            "highest_ms": self.highest_ms,
+            "histograms": [
+                {"endpoint": endpoint, "status": status, **hist.to_dict()}
+                for (endpoint, status), hist in self.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HistogramSet":
+        result = cls(highest_ms=data["highest_ms"])
+        for item in data["histograms"]:
+            result._histograms[(item["endpoint"], item["status"])] = LatencyHistogram.from_dict(item)
+        return result
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "HistogramSet":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,441 @@
+"""
+instrumentation.py
+
+Событие на каждый HTTP-вызов к OpenMRS: шаблон эндпоинта (/visit/{uuid}),
+метод, статус, байты туда/обратно и разбивка времени:
+
+    queue   — ожидание свободного соединения в пуле urllib3;
+    connect — установка TCP-соединения (0, если соединение переиспользовано);
+    ttfb    — от начала отправки до получения заголовков ответа;
+    total   — от начала отправки до прочитанного тела.
+
+Тело ответа читается сразу, кроме stream=True: тогда байты считаются
+по мере чтения вызывающим кодом, а событие уходит, когда тело
+дочитано или ответ закрыт (тело в sink'и не передаётся).
+
+Instrumentation — транспортный адаптер (как Recorder в src/recorder.py),
+поэтому видит и вызовы OpenMRSClient, и прямые requests.get/post из
+request_modules/. События уходят в подключаемые sink'и:
+MetricsAggregator (в памяти, гистограммы src/histogram.py),
+JsonlSink, PrometheusTextSink.
+"""
+
+import base64
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+from src import transport
+from src.histogram import HistogramSet
+from src.openmrs_patient import OpenMRSClient
+
+
+_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+
+def endpoint_template(path: str) -> str:
+    """
+    "/visit/3f1c...-.../attribute" -> "/visit/{uuid}/attribute"
+    """
+    path = path.split("?", 1)[0]
+    if path.startswith(OpenMRSClient.BASE_URL):
+        path = path[len(OpenMRSClient.BASE_URL):]
+    return "/".join("{uuid}" if _UUID_RE.match(segment) else segment for segment in path.split("/"))
+
+
+@dataclass
+class RequestEvent:
+    endpoint: str
+    method: str
+    status: int  # 0 — ответа нет (ошибка соединения)
+    bytes_out: int
+    bytes_in: int
+    queue_ms: float
+    connect_ms: float
+    ttfb_ms: float
+    total_ms: float
+    timestamp: float
+    url: str = ""
+    user: Optional[str] = None  # из Basic-авторизации
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.endpoint}"
+
+
+# -----------------------------
+# urllib3 phase timings
+# -----------------------------
+
+_phases = threading.local()
+_patch_lock = threading.Lock()
+_patched = False
+
+
+def _add_phase(name: str, started: float) -> None:
+    if getattr(_phases, "active", False):
+        setattr(_phases, name, getattr(_phases, name, 0.0) + time.perf_counter() - started)
+
+
+def _patch_urllib3() -> None:
+    """
+    Один раз оборачивает получение соединения из пула и открытие сокета,
+    чтобы queue/connect копились в thread-local текущего запроса.
+    """
+    global _patched
+    with _patch_lock:
+        if _patched:
+            return
+
+        get_conn = HTTPConnectionPool._get_conn
+        new_conn = HTTPConnection._new_conn
+
+        def timed_get_conn(self, timeout=None):
+            started = time.perf_counter()
+            try:
+                return get_conn(self, timeout)
+            finally:
+                _add_phase("queue", started)
+
+        def timed_new_conn(self):
+            started = time.perf_counter()
+            try:
+                return new_conn(self)
+            finally:
+                _add_phase("connect", started)
+
+        HTTPConnectionPool._get_conn = timed_get_conn
+        HTTPConnection._new_conn = timed_new_conn
+        _patched = True
+
+
+# -----------------------------
+# adapter
+# -----------------------------
+
+class Instrumentation(BaseAdapter):
+    """
+    Адаптер-обёртка: запрос выполняет inner (живой HTTP, стенд, replay),
+    а каждый вызов превращается в RequestEvent для всех sink'ов.
+    """
+
+    def __init__(self, sinks: Iterable["Sink"], prefix: str = OpenMRSClient.BASE_URL,
+                 inner: Optional[BaseAdapter] = None) -> None:
+        super().__init__()
+        self.sinks: List[Sink] = list(sinks)
+        self.prefix = prefix
+        self.inner = inner
+        self._installed = False
+
+    def install(self) -> "Instrumentation":
+        if not self._installed:
+            if self.inner is None:
+                self.inner = transport.current_adapter(self.prefix) or HTTPAdapter()
+            _patch_urllib3()
+            transport.mount(self.prefix, self)
+            self._installed = True
+        return self
+
+    def uninstall(self) -> None:
+        if self._installed:
+            transport.unmount(self)
+            self._installed = False
+            for sink in self.sinks:
+                sink.close()
+
+    def __enter__(self) -> "Instrumentation":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        body = request.body
+        bytes_out = len(body.encode("utf-8") if isinstance(body, str) else body or b"")
+
+        _phases.active, _phases.queue, _phases.connect = True, 0.0, 0.0
+        timestamp = time.time()
+        started = time.perf_counter()
+        resp = None
+        error = None
+        content = b""
+        ttfb = 0.0
+        streamed = False
+        try:
+            resp = self.inner.send(request, **kwargs)
+            ttfb = time.perf_counter() - started
+            if kwargs.get("stream"):
+                # тело не буферизуем: событие — когда вызывающий дочитает или закроет ответ
+                queue, connect = _phases.queue, _phases.connect
+                finished = resp
+
+                def on_done(bytes_in: int) -> None:
+                    self._emit(body, None, self._event(
+                        request, finished, bytes_out, bytes_in, queue, connect,
+                        ttfb, time.perf_counter() - started, timestamp, None,
+                    ))
+
+                resp.raw = _CountingRaw(resp.raw, on_done)
+                streamed = True
+                return resp
+            content = resp.content
+            return resp
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            ttfb = time.perf_counter() - started
+            raise
+        finally:
+            total = time.perf_counter() - started
+            _phases.active = False
+            if not streamed:
+                self._emit(body, content, self._event(
+                    request, resp, bytes_out, len(content or b""), _phases.queue, _phases.connect,
+                    ttfb, total, timestamp, error,
+                ))
+
+    @staticmethod
+    def _event(request: requests.PreparedRequest, resp: Optional[requests.Response], bytes_out: int,
+               bytes_in: int, queue: float, connect: float, ttfb: float, total: float,
+               timestamp: float, error: Optional[str]) -> RequestEvent:
+        return RequestEvent(
+            endpoint=endpoint_template(request.url),
+            method=request.method,
+            status=resp.status_code if resp is not None else 0,
+            bytes_out=bytes_out,
+            bytes_in=bytes_in,
+            queue_ms=queue * 1000,
+            connect_ms=connect * 1000,
+            ttfb_ms=ttfb * 1000,
+            total_ms=total * 1000,
+            timestamp=timestamp,
+            url=request.url,
+            user=_basic_auth_user(request.headers.get("Authorization")),
+            error=error,
+        )
+
+    def _emit(self, body, content: Optional[bytes], event: RequestEvent) -> None:
+        for sink in self.sinks:
+            sink.emit_exchange(event, body, content)
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+
+class _CountingRaw:
+    """
+    raw ответа с stream=True: считает прочитанные байты и один раз вызывает
+    on_done(bytes_in), когда тело дочитано (read -> b"") или ответ закрыт.
+    Остальное делегируется исходному raw (urllib3 HTTPResponse, BytesIO стенда).
+    """
+
+    def __init__(self, raw, on_done) -> None:
+        self._raw = raw
+        self._on_done = on_done
+        self._done = False
+        self.bytes_in = 0
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _finish(self) -> None:
+        if not self._done:
+            self._done = True
+            self._on_done(self.bytes_in)
+
+    def read(self, *args, **kwargs):
+        data = self._raw.read(*args, **kwargs)
+        self.bytes_in += len(data or b"")
+        if not data or not (args or kwargs.get("amt")):
+            self._finish()
+        return data
+
+    def stream(self, *args, **kwargs):
+        # Response.iter_content идёт через stream(), если он есть у raw
+        if hasattr(self._raw, "stream"):
+            chunks = self._raw.stream(*args, **kwargs)
+        else:
+            size = args[0] if args else kwargs.get("amt") or 2 ** 16
+            chunks = iter(lambda: self._raw.read(size), b"")
+        try:
+            for chunk in chunks:
+                self.bytes_in += len(chunk)
+                yield chunk
+        finally:
+            self._finish()
+
+    def close(self) -> None:
+        try:
+            self._raw.close()
+        finally:
+            self._finish()
+
+
+def _basic_auth_user(header: Optional[str]) -> Optional[str]:
+    if not header or not header.startswith("Basic "):
+        return None
+    try:
+        return base64.b64decode(header[6:]).decode("utf-8").split(":", 1)[0]
+    except ValueError:
+        return None
+
+
+# -----------------------------
+# sinks
+# -----------------------------
+
+class Sink(ABC):
+    @abstractmethod
+    def emit(self, event: RequestEvent) -> None:
+        ...
+
+    def emit_exchange(self, event: RequestEvent, request_body, response_body: Optional[bytes]) -> None:
+        """
+        То же, что emit, но с телами запроса и ответа — для sink'ов,
+        которым нужно содержимое (src/pytest_timeline.py). Тела не копируются.
+        """
+        self.emit(event)
+
+    def close(self) -> None:
+        pass
+
+
+class MetricsAggregator(Sink):
+    """
+    В памяти: гистограммы total по (эндпоинт, статус), суммы фаз и байтов по эндпоинту.
+    """
+
+    PHASES = ("queue_ms", "connect_ms", "ttfb_ms", "total_ms")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms = HistogramSet()
+        # key -> {"count", "errors", "bytes_out", "bytes_in", "queue_ms", ...}
+        self.totals: Dict[str, Dict[str, float]] = {}
+
+    def emit(self, event: RequestEvent) -> None:
+        self.histograms.record(event.key, event.status, event.total_ms)
+        with self._lock:
+            totals = self.totals.setdefault(event.key, dict.fromkeys(
+                ("count", "errors", "bytes_out", "bytes_in") + self.PHASES, 0))
+            totals["count"] += 1
+            totals["errors"] += 1 if event.error or event.status >= 400 else 0
+            totals["bytes_out"] += event.bytes_out
+            totals["bytes_in"] += event.bytes_in
+            for phase in self.PHASES:
+                totals[phase] += getattr(event, phase)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {key: dict(values) for key, values in self.totals.items()}
+
+    REPORT_HEADERS = ("endpoint", "count", "errors", "total ms", "avg queue", "avg connect", "avg ttfb",
+                      "p50 ms", "p95 ms", "p99 ms", "bytes in", "bytes out")
+
+    def rows(self, percentiles: Sequence[float] = (50, 95, 99)) -> Iterator[Tuple]:
+        """
+        Строки отчёта (для src/report_render.py), самые «дорогие» по суммарному времени — первыми.
+        """
+        totals = self.snapshot()
+        histograms = dict(self.histograms.by_endpoint())
+
+        for key, t in sorted(totals.items(), key=lambda item: -item[1]["total_ms"]):
+            n = t["count"]
+            yield (
+                key,
+                n,
+                t["errors"],
+                f"{t['total_ms']:.0f}",
+                f"{t['queue_ms'] / n:.2f}",
+                f"{t['connect_ms'] / n:.2f}",
+                f"{t['ttfb_ms'] / n:.1f}",
+                *(f"{v:.1f}" for v in histograms[key].percentiles(percentiles)),
+                t["bytes_in"],
+                t["bytes_out"],
+            )
+
+
+class JsonlSink(Sink):
+    """
+    Событие на строку, запись под замком с буферизацией файла.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, event: RequestEvent) -> None:
+        line = json.dumps(asdict(event), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusTextSink(MetricsAggregator):
+    """
+    Агрегатор, который при close() (или write()) пишет метрики
+    в формате text exposition — для node_exporter textfile collector.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, path: str, prefix: str = "openmrs_http") -> None:
+        super().__init__()
+        self.path = path
+        self.prefix = prefix
+
+    def close(self) -> None:
+        self.write()
+
+    def write(self) -> None:
+        p = self.prefix
+        lines = [
+            f"# TYPE {p}_requests_total counter",
+            f"# TYPE {p}_request_duration_seconds summary",
+            f"# TYPE {p}_request_phase_seconds_total counter",
+            f"# TYPE {p}_response_bytes_total counter",
+            f"# TYPE {p}_request_bytes_total counter",
+        ]
+
+        for (key, status), hist in self.histograms.items():
+            method, endpoint = key.split(" ", 1)
+            labels = f'method="{method}",endpoint="{_escape(endpoint)}",status="{status}"'
+            lines.append(f"{p}_requests_total{{{labels}}} {hist.count}")
+            for q, value in zip(self.QUANTILES, hist.percentiles(q * 100 for q in self.QUANTILES)):
+                lines.append(f'{p}_request_duration_seconds{{{labels},quantile="{q}"}} {value / 1000:.6f}')
+            lines.append(f"{p}_request_duration_seconds_sum{{{labels}}} {hist.mean * hist.count / 1000:.6f}")
+            lines.append(f"{p}_request_duration_seconds_count{{{labels}}} {hist.count}")
+
+        for key, t in sorted(self.snapshot().items()):
+            method, endpoint = key.split(" ", 1)
+            labels = f'method="{method}",endpoint="{_escape(endpoint)}"'
+            for phase in ("queue", "connect", "ttfb"):
+                lines.append(f'{p}_request_phase_seconds_total{{{labels},phase="{phase}"}} '
+                             f"{t[phase + '_ms'] / 1000:.6f}")
+            lines.append(f"{p}_response_bytes_total{{{labels}}} {int(t['bytes_in'])}")
+            lines.append(f"{p}_request_bytes_total{{{labels}}} {int(t['bytes_out'])}")
+
+        # атомарная замена: collector не должен увидеть половину файла
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
@@ -0,0 +1,244 @@
+"""
+json_views.py
+
+Ленивые типизированные обёртки над уже разобранным JSON ответа OpenMRS.
+
+    person = PersonView(resp.json())
+    person.preferredName.givenName      # читается только это поле
+    for patient in PatientView.list(resp.json()["results"]):
+        patient.person.display           # остальное в ответе не трогается
+
+Вид ничего не копирует: атрибут читает поле из исходного dict в момент
+обращения, вложенный объект — такой же вид над вложенным dict, список —
+ViewList, который создаёт вид элемента при индексации. Разбор листинга
+стоит ровно столько, сколько из него прочитано. view.raw — исходный dict.
+
+Виды не ходят в сеть. Отсутствующее в ответе поле — default (None, если
+не задан); strict=True — FieldNotFetched: поле не пришло в этом v=,
+значит, представление запроса надо расширить, а не догружать объект
+молча. Поле со значением null — None в обоих режимах.
+
+В dataclass'ы src/openmrs_patient.py (PersonView.to_person()) —
+явно и только там, где объект действительно нужен целиком.
+"""
+
+import itertools
+from typing import Generic, Iterator, Mapping, Optional, Sequence, Type, TypeVar, Union, overload
+
+from src.openmrs_patient import Address, Person, PersonName
+
+
+V = TypeVar("V", bound="JsonView")
+
+
+class FieldNotFetched(LookupError):
+    pass
+
+
+# -----------------------------
+# fields
+# -----------------------------
+
+class Field:
+    """
+    Поле ответа как атрибут вида; key — имя в JSON (по умолчанию имя атрибута).
+    """
+
+    def __init__(self, key: Optional[str] = None, default: object = None) -> None:
+        self.key = key
+        self.default = default
+        self.name = key
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        if self.key is None:
+            self.key = name
+
+    def __get__(self, view: Optional["JsonView"], owner: type):
+        if view is None:
+            return self
+        try:
+            value = view._data[self.key]
+        except KeyError:
+            if view._strict:
+                raise FieldNotFetched(
+                    f"{type(view).__name__}.{self.name}: {self.key!r} is not in the response, extend v="
+                ) from None
+            return self.default
+        return None if value is None else self.decode(value, view._strict)
+
+    def decode(self, value: object, strict: bool) -> object:
+        return value
+
+
+class Ref(Field):
+    """
+    Ссылка: {"uuid": ...} или строка uuid (зависит от v=) -> uuid.
+    """
+
+    def decode(self, value, strict):
+        return value.get("uuid") if isinstance(value, Mapping) else value
+
+
+class One(Field):
+    def __init__(self, view: Type["JsonView"], key: Optional[str] = None) -> None:
+        super().__init__(key)
+        self.view = view
+
+    def decode(self, value, strict):
+        return self.view(value, strict=strict)
+
+
+class Many(Field):
+    def __init__(self, view: Type["JsonView"], key: Optional[str] = None) -> None:
+        super().__init__(key)
+        self.view = view
+
+    def decode(self, value, strict):
+        return ViewList(value, self.view, strict)
+
+
+# -----------------------------
+# views
+# -----------------------------
+
+class JsonView:
+    __slots__ = ("_data", "_strict")
+
+    def __init__(self, data: Mapping, strict: bool = False) -> None:
+        self._data = data
+        self._strict = strict
+
+    @property
+    def raw(self) -> Mapping:
+        return self._data
+
+    @classmethod
+    def list(cls: Type[V], items: Sequence[Mapping], strict: bool = False) -> "ViewList[V]":
+        return ViewList(items, cls, strict)
+
+    def __repr__(self) -> str:
+        label = self._data.get("display") or self._data.get("uuid") or ""
+        return f"{type(self).__name__}({label!r})"
+
+
+class ViewList(Sequence, Generic[V]):
+    """
+    Список JSON-объектов, вид элемента создаётся при обращении к нему.
+    """
+
+    __slots__ = ("_items", "_view", "_strict")
+
+    def __init__(self, items: Sequence[Mapping], view: Type[V], strict: bool = False) -> None:
+        self._items = items
+        self._view = view
+        self._strict = strict
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @overload
+    def __getitem__(self, index: int) -> V: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ViewList[V]": ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return ViewList(self._items[index], self._view, self._strict)
+        return self._view(self._items[index], self._strict)
+
+    def __iter__(self) -> Iterator[V]:
+        view, strict = self._view, self._strict
+        for item in self._items:
+            yield view(item, strict)
+
+    def __repr__(self) -> str:
+        return f"ViewList[{self._view.__name__}]({len(self._items)})"
+
+
+# -----------------------------
+# OpenMRS
+# -----------------------------
+
+class PersonNameView(JsonView):
+    __slots__ = ()
+    uuid = Field()
+    display = Field()
+    givenName = Field()
+    middleName = Field()
+    familyName = Field()
+    preferred = Field()
+
+    def to_name(self) -> PersonName:
+        return PersonName(givenName=self.givenName, familyName=self.familyName, middleName=self.middleName)
+
+
+class AddressView(JsonView):
+    __slots__ = ()
+    address1 = Field(default="")
+    cityVillage = Field(default="")
+    country = Field(default="")
+
+    def to_address(self) -> Address:
+        return Address(address1=self.address1 or "", cityVillage=self.cityVillage or "", country=self.country or "")
+
+
+class PersonView(JsonView):
+    __slots__ = ()
+    uuid = Field()
+    display = Field()
+    gender = Field(default="")
+    birthdate = Field(default="")
+    voided = Field()
+    preferredName = One(PersonNameView)
+    names = Many(PersonNameView)
+    addresses = Many(AddressView)
+
+    def to_person(self) -> Person:
+        """
+        Person целиком: preferredName, затем names без повторов (по множеству
+        пар givenName / familyName), только имена с обоими полями.
+        Горячий путь — прямо по dict, без видов на каждое поле.
+        """
+        data = self._data
+        if self._strict:
+            missing = [k for k in ("gender", "birthdate", "names") if k not in data]
+            if missing:
+                raise FieldNotFetched(f"PersonView.to_person: {', '.join(missing)} not in the response, extend v=")
+
+        names, seen = [], set()
+        preferred = data.get("preferredName")
+        for n in itertools.chain((preferred,) if preferred else (), data.get("names") or ()):
+            if not isinstance(n, Mapping):
+                continue
+            given, family = n.get("givenName"), n.get("familyName")
+            if given and family and (given, family) not in seen:
+                seen.add((given, family))
+                names.append(PersonName(given, family, n.get("middleName")))
+
+        return Person(
+            names,
+            data.get("gender", ""),
+            data.get("birthdate", ""),
+            [AddressView(a).to_address() for a in data.get("addresses") or () if isinstance(a, Mapping)],
+        )
+
+
+class IdentifierView(JsonView):
+    __slots__ = ()
+    uuid = Field()
+    display = Field()
+    identifier = Field()
+    identifierType = Ref()
+    location = Ref()
+    preferred = Field()
+
+
+class PatientView(JsonView):
+    __slots__ = ()
+    uuid = Field()
+    display = Field()
+    voided = Field()
+    person = One(PersonView)
+    identifiers = Many(IdentifierView)
@@ -0,0 +1,220 @@
+"""
+latency_slo.py
+
+SLO по задержке эндпоинтов OpenMRS — как часть прогона тестов.
+
+В тесте (замеры только этого теста, setup + call):
+
+    @pytest.mark.latency_slo("POST /patient", p95=300, samples=20)
+    def test_create_patient_latency(): ...
+
+На весь прогон (замеры всех тестов, проверка в конце сессии):
+
+    pytest --latency-slo "POST /patient p95<300 n=50" --latency-slo "GET /visit/{uuid} p99<500"
+
+Ключ — как в отчётах src/instrumentation.py: "МЕТОД /шаблон". Учитываются
+только успешные ответы (< 400). Меньше samples замеров — предупреждение,
+а не падение: по паре запросов p95 не оценить.
+
+Нарушение по умолчанию валит тест (сессию); mode="warn" в маркере
+или --latency-slo-mode=warn — только предупреждение (PytestWarning
+для маркера, строка в сводке latency SLO для --latency-slo).
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+
+from src.histogram import HistogramSet, LatencyHistogram
+from src.instrumentation import RequestEvent, Sink
+
+
+PLUGIN_NAME = "latency_slo"
+
+MODES = ("fail", "warn")
+
+
+class LatencySLOWarning(pytest.PytestWarning):
+    pass
+
+
+@dataclass(frozen=True)
+class LatencySLO:
+    key: str  # "POST /patient"
+    percentile: float
+    threshold_ms: float
+    min_samples: int = 1
+    mode: str = "fail"
+
+    def __str__(self) -> str:
+        return f"{self.key} p{self.percentile:g} < {self.threshold_ms:g} ms (n >= {self.min_samples})"
+
+    @classmethod
+    def parse(cls, text: str, mode: str = "fail") -> "LatencySLO":
+        """
+        "POST /patient p95<300 n=20" -> LatencySLO("POST /patient", 95, 300, 20)
+        """
+        m = _SPEC_RE.match(text.strip())
+        if not m:
+            raise ValueError(f"Bad latency SLO {text!r}, expected e.g. 'POST /patient p95<300 n=20'")
+        return cls(
+            key=f"{m['method'].upper()} {m['endpoint']}",
+            percentile=float(m["p"].replace("_", ".")),
+            threshold_ms=float(m["ms"]),
+            min_samples=int(m["n"] or 1),
+            mode=mode,
+        )
+
+
+_SPEC_RE = re.compile(
+    r"^(?P<method>[A-Za-z]+)\s+(?P<endpoint>\S+)\s+p(?P<p>[\d_.]+)\s*<\s*(?P<ms>[\d.]+)\s*(?:ms)?"
+    r"(?:\s+n\s*=\s*(?P<n>\d+))?$"
+)
+
+
+@dataclass
+class SLOResult:
+    slo: LatencySLO
+    samples: int
+    value_ms: float
+
+    @property
+    def status(self) -> str:
+        if self.samples < self.slo.min_samples:
+            return "insufficient"
+        return "ok" if self.value_ms < self.slo.threshold_ms else "violated"
+
+    def message(self) -> str:
+        if self.status == "insufficient":
+            return f"{self.slo}: only {self.samples} samples"
+        return f"{self.slo}: p{self.slo.percentile:g} = {self.value_ms:.1f} ms over {self.samples} samples"
+
+
+def evaluate(slo: LatencySLO, histograms: HistogramSet) -> SLOResult:
+    merged = dict(histograms.by_endpoint()).get(slo.key) or LatencyHistogram()
+    return SLOResult(slo, merged.count, merged.percentile(slo.percentile) if merged.count else 0.0)
+
+
+def slos_from_marker(marker, mode: str) -> List[LatencySLO]:
+    """
+    latency_slo("POST /patient", p95=300, p99=800, samples=20, mode="warn")
+    — по LatencySLO на каждый pNN (p99_9 = 99.9).
+    """
+    key = marker.args[0]
+    kwargs = dict(marker.kwargs)
+    samples = kwargs.pop("samples", 1)
+    mode = kwargs.pop("mode", mode)
+    if mode not in MODES:
+        raise ValueError(f"latency_slo mode must be one of {MODES}, got {mode!r}")
+
+    slos = []
+    for name, threshold in kwargs.items():
+        if not re.fullmatch(r"p[\d_]+", name):
+            raise TypeError(f"Unexpected latency_slo argument {name!r}")
+        slos.append(LatencySLO(key, float(name[1:].replace("_", ".")), threshold, samples, mode))
+    return slos
+
+
+class LatencySLOPlugin(Sink):
+    """
+    Sink + хуки pytest: гистограммы на весь прогон и отдельные —
+    на текущий тест, если у него есть маркер latency_slo.
+    """
+
+    def __init__(self, config) -> None:
+        self.config = config
+        self.mode: Optional[str] = config.getoption("--latency-slo-mode")
+        self.session_slos = [LatencySLO.parse(text, self.mode or "fail")
+                             for text in config.getoption("--latency-slo") or ()]
+        self.session = HistogramSet()
+        self.results: List[SLOResult] = []
+        self._lock = threading.Lock()
+        self._test: Optional[HistogramSet] = None
+
+    # -----------------------------
+    # sink
+    # -----------------------------
+
+    def emit(self, event: RequestEvent) -> None:
+        if event.error or event.status >= 400:
+            return
+        self.session.record(event.key, event.status, event.total_ms)
+        test = self._test
+        if test is not None:
+            test.record(event.key, event.status, event.total_ms)
+
+    # -----------------------------
+    # hooks
+    # -----------------------------
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_setup(self, item):
+        if item.get_closest_marker("latency_slo") is not None:
+            with self._lock:
+                self._test = HistogramSet()
+        return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        report = yield
+        if call.when == "teardown":
+            with self._lock:
+                self._test = None
+        if call.when != "call" or not report.passed:
+            return report
+
+        test = self._test
+        slos = [slo for marker in item.iter_markers("latency_slo")
+                for slo in slos_from_marker(marker, self.mode or "fail")]
+        if test is None or not slos:
+            return report
+
+        results = [evaluate(slo, test) for slo in slos]
+        report.sections.append(("latency SLO", "\n".join(f"{r.status:>12}  {r.message()}" for r in results)))
+
+        failed = []
+        for r in results:
+            if r.status == "violated" and r.slo.mode == "fail" and self.mode != "warn":
+                failed.append(r.message())
+            elif r.status != "ok":
+                item.warn(LatencySLOWarning(r.message()))
+        if failed:
+            report.outcome = "failed"
+            report.longrepr = "Latency SLO violated:\n" + "\n".join(failed)
+        return report
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.results = [evaluate(slo, self.session) for slo in self.session_slos]
+        for r in self.results:
+            if r.status == "violated" and r.slo.mode == "fail":
+                session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        tr = terminalreporter
+        tr.section("latency SLO")
+        for r in self.results:
+            tr.write_line(f"{r.status:>12}  {r.message()}",
+                          red=r.status == "violated" and r.slo.mode == "fail",
+                          yellow=r.status != "ok" and r.slo.mode == "warn")
+
+
+def addoption(parser) -> None:
+    parser.addoption("--latency-slo", action="append", default=[],
+                     help="SLO на весь прогон, например 'POST /patient p95<300 n=50' (можно несколько)")
+    parser.addoption("--latency-slo-mode", choices=MODES, default=None,
+                     help="warn — нарушения SLO только предупреждают (маркеры и --latency-slo)")
+
+
+def configure(config) -> LatencySLOPlugin:
+    config.addinivalue_line(
+        "markers",
+        "latency_slo(key, p95=ms, ..., samples=n, mode='fail'|'warn'): SLO по задержке вызовов теста",
+    )
+    plugin = LatencySLOPlugin(config)
+    config.pluginmanager.register(plugin, PLUGIN_NAME)
+    return plugin
@@ -0,0 +1,357 @@
+"""
+load.py
+
+Нагрузочный прогон OpenMRS по сценариям из JSONL.
+
+Строка файла — один сценарий:
+    {"scenario": "patient_visit", "repeat": 50}
+    {"scenario": "list_users", "username": "user124", "password": "Password123"}
+    {"scenario": "request", "method": "GET", "path": "/location", "params": {"v": "ref"}}
+
+Файл читается потоково (repeat разворачивается лениво). Сценарии
+выполняются либо с фиксированной параллельностью (closed loop),
+либо с фиксированной частотой запуска (rate, сценариев в секунду).
+По каждому эндпоинту (метод + шаблон пути) считаются throughput,
+ошибки и перцентили задержки (по гистограммам src/histogram.py).
+
+Сами сценарии (что именно вызывать) лежат в load/scenarios.py.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from src.concurrency import ADMIN_PASSWORD, ADMIN_USERNAME, run_bounded, thread_client
+from src.histogram import HistogramSet
+from src.instrumentation import endpoint_template
+from src.openmrs_patient import OpenMRSClient
+
+
+DEFAULT_EXPECT = (200, 201, 204)
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+class StepFailed(RuntimeError):
+    """
+    Шаг сценария вернул неожиданный статус.
+    """
+
+    def __init__(self, endpoint: str, status_code: int, body: str) -> None:
+        super().__init__(f"{endpoint} -> {status_code}: {body[:200]}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+# -----------------------------
+# stats
+# -----------------------------
+
+class LoadStats:
+    """
+    Задержки по эндпоинтам и статусам (гистограммы постоянного размера)
+    и итоги по сценариям. Потокобезопасен.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms = HistogramSet()
+        self.errors: Dict[str, int] = {}
+        self.scenarios: Dict[str, Dict[str, int]] = {}
+        # сценарий -> {тип исключения: сколько раз}; и первый текст ошибки каждого типа
+        self.scenario_errors: Dict[str, Dict[str, int]] = {}
+        self.error_samples: Dict[Tuple[str, str], str] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, endpoint: str, status: int, latency_ms: float, ok: bool) -> None:
+        self.histograms.record(endpoint, status, latency_ms)
+        if not ok:
+            with self._lock:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def record_scenario(self, name: str, ok: bool, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            counts = self.scenarios.setdefault(name, {"ok": 0, "failed": 0})
+            counts["ok" if ok else "failed"] += 1
+            if error is not None:
+                kind = type(error).__name__
+                errors = self.scenario_errors.setdefault(name, {})
+                errors[kind] = errors.get(kind, 0) + 1
+                self.error_samples.setdefault((name, kind), str(error)[:200])
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def rows(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Iterator[Tuple]:
+        """
+        (endpoint, count, errors, rps, p50, p90, p95, p99, max) по каждому эндпоинту.
+        """
+        duration = max(self.duration, 1e-9)
+        with self._lock:
+            errors = dict(self.errors)
+
+        for endpoint, hist in self.histograms.by_endpoint():
+            yield (
+                endpoint,
+                hist.count,
+                errors.get(endpoint, 0),
+                f"{hist.count / duration:.1f}",
+                *(f"{value:.1f}" for value in hist.percentiles(percentiles)),
+                f"{hist.max:.1f}",
+            )
+
+    @staticmethod
+    def headers(percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Tuple[str, ...]:
+        return ("endpoint", "count", "errors", "rps", *(f"p{p:g} ms" for p in percentiles), "max ms")
+
+
+# -----------------------------
+# scenario context
+# -----------------------------
+
+class SharedCache:
+    """
+    Кэш на весь прогон (локации, типы идентификаторов, ...): loader
+    вызывается один раз на ключ, даже если сценарии стартуют одновременно.
+
+    Общий замок держится только на поиск в словаре; загрузка идёт вне
+    него через Future на ключ: разные ключи грузятся параллельно,
+    остальные потоки ждут только свой ключ, loader может сам звать get.
+    Упавший loader не кэшируется — следующий get попробует снова.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, Future] = {}
+
+    def get(self, key: str, loader: Callable[[], object]) -> object:
+        with self._lock:
+            future = self._values.get(key)
+            owner = future is None
+            if owner:
+                future = self._values[key] = Future()
+
+        if owner:
+            try:
+                future.set_result(loader())
+            except BaseException as e:
+                with self._lock:
+                    self._values.pop(key, None)
+                future.set_exception(e)
+                raise
+        return future.result()
+
+    def set(self, key: str, value: object) -> None:
+        """
+        Перезаписывает значение (последний созданный пациент и т.п.).
+        """
+        future: Future = Future()
+        future.set_result(value)
+        with self._lock:
+            self._values[key] = future
+
+    def peek(self, key: str, default: object = None) -> object:
+        """
+        Готовое значение или default — без загрузки и без записи default в кэш.
+        """
+        with self._lock:
+            future = self._values.get(key)
+        if future is None or not future.done() or future.exception() is not None:
+            return default
+        return future.result()
+
+
+class ScenarioContext:
+    """
+    То, что видит функция сценария: клиент (свой на поток и креды),
+    параметры строки сценария, общие кэши и замер каждого вызова.
+    """
+
+    def __init__(self, spec: Dict, stats: LoadStats, shared: SharedCache) -> None:
+        self.spec = spec
+        self.stats = stats
+        self.shared = shared
+        self.client = thread_client(spec.get("username", ADMIN_USERNAME), spec.get("password", ADMIN_PASSWORD))
+
+    def call(self, method: str, path: str, params: Optional[Dict] = None, json_body: object = None,
+             expect: Iterable[int] = DEFAULT_EXPECT) -> Dict:
+        """
+        Один HTTP-вызов с замером. Неожиданный статус — StepFailed.
+        """
+        endpoint = f"{method} {endpoint_template(path)}"
+        expect = tuple(expect)
+
+        started = time.perf_counter()
+        try:
+            resp = self.client.session.request(method, f"{OpenMRSClient.BASE_URL}{path}",
+                                               params=params, json=json_body, timeout=30)
+        except Exception:
+            self.stats.record(endpoint, 0, (time.perf_counter() - started) * 1000, ok=False)
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        ok = resp.status_code in expect
+        self.stats.record(endpoint, resp.status_code, latency_ms, ok)
+        if not ok:
+            raise StepFailed(endpoint, resp.status_code, resp.text)
+        return resp.json() if resp.content else {}
+
+
+# -----------------------------
+# input
+# -----------------------------
+
+def iter_scenarios(path: str) -> Iterator[Dict]:
+    """
+    Строки сценариев из JSONL; "repeat": n разворачивается в n запусков.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            spec = json.loads(line)
+            if "scenario" not in spec:
+                raise ValueError(f"{path}:{line_no}: missing 'scenario'")
+            for _ in range(int(spec.get("repeat", 1))):
+                yield spec
+
+
+# -----------------------------
+# drivers
+# -----------------------------
+
+ScenarioFn = Callable[[ScenarioContext], None]
+
+
+def _known_scenarios(specs: Iterable[Dict], registry: Dict[str, ScenarioFn]) -> Iterator[Dict]:
+    """
+    Проверяет имя сценария до запуска: опечатка в файле останавливает прогон
+    на первой же такой строке, а не теряется среди ошибок сценариев.
+    """
+    for spec in specs:
+        name = spec.get("scenario")
+        if name not in registry:
+            raise ValueError(f"Unknown scenario: {name} (expected one of {sorted(registry)})")
+        yield spec
+
+
+def run_load(
+    specs: Iterable[Dict],
+    registry: Dict[str, ScenarioFn],
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+) -> LoadStats:
+    """
+    Прогоняет сценарии. rate=None — closed loop на concurrency потоках,
+    иначе — запуск rate сценариев в секунду (ограничено concurrency потоками).
+
+    Неизвестное имя сценария — ValueError до его запуска. Исключение внутри
+    сценария прогон не останавливает: оно считается в stats.scenarios (failed)
+    и stats.scenario_errors по типу.
+    """
+    stats = LoadStats()
+    shared = SharedCache()
+    specs = _known_scenarios(specs, registry)
+
+    def run_one(spec: Dict) -> None:
+        registry[spec["scenario"]](ScenarioContext(spec, stats, shared))
+
+    def done(spec: Dict, error: Optional[BaseException]) -> None:
+        stats.record_scenario(spec["scenario"], ok=error is None, error=error)
+
+    if rate is None:
+        for spec, result in run_bounded(specs, run_one, concurrency):
+            done(spec, result if isinstance(result, BaseException) else None)
+    else:
+        _run_at_rate(specs, run_one, done, rate, concurrency)
+
+    stats.finish()
+    return stats
+
+
+def _run_at_rate(specs: Iterable[Dict], fn: Callable[[Dict], None],
+                 done: Callable[[Dict, Optional[BaseException]], None], rate: float, concurrency: int) -> None:
+    interval = 1.0 / rate
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, spec in enumerate(specs):
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            future = pool.submit(fn, spec)
+            future.add_done_callback(lambda f, spec=spec: done(spec, f.exception()))
+
+
+# -----------------------------
+# open loop
+# -----------------------------
+
+@dataclass
+class OpenLoopResult:
+    corrected: LoadStats  # задержка от запланированного момента отправки
+    service: LoadStats    # задержка от фактической отправки (как видит closed loop)
+    scheduled: int
+    max_lag_ms: float     # наибольшее отставание фактической отправки от плана
+
+
+def run_open_loop(
+    calls: Iterable[Tuple[str, str, object]],
+    rate: float,
+    workers: int = 64,
+    username: str = ADMIN_USERNAME,
+    password: str = ADMIN_PASSWORD,
+) -> OpenLoopResult:
+    """
+    Open loop: запрос i отправляется в момент start + i / rate независимо от того,
+    ответил ли сервер на предыдущие. calls — (method, path, json_body).
+
+    Задержка в corrected считается от запланированного момента, поэтому время,
+    которое запрос простоял в очереди из-за зависшего сервера, попадает
+    в перцентили (поправка на coordinated omission). service — то же без поправки.
+    """
+    corrected, service = LoadStats(), LoadStats()
+    lag_lock = threading.Lock()
+    max_lag = [0.0]
+    interval = 1.0 / rate
+
+    def send(call: Tuple[str, str, object], intended: float) -> None:
+        method, path, body = call
+        endpoint = f"{method} {endpoint_template(path)}"
+        client = thread_client(username, password)
+
+        actual = time.perf_counter()
+        with lag_lock:
+            max_lag[0] = max(max_lag[0], actual - intended)
+        try:
+            resp = client.session.request(method, f"{OpenMRSClient.BASE_URL}{path}", json=body, timeout=30)
+            status, ok = resp.status_code, resp.status_code in DEFAULT_EXPECT
+        except Exception:
+            status, ok = 0, False
+        done = time.perf_counter()
+
+        corrected.record(endpoint, status, (done - intended) * 1000, ok)
+        service.record(endpoint, status, (done - actual) * 1000, ok)
+
+    scheduled = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, call in enumerate(calls):
+            intended = started + i * interval
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, call, intended)
+            scheduled += 1
+
+    corrected.finish()
+    service.finish()
+    return OpenLoopResult(corrected, service, scheduled, max_lag[0] * 1000)
@@ -5,12 +5,16 @@ openmrs_patient.py
 BASE_URL зашит в OpenMRSClient.
 """
 
+import threading
+import weakref
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
 import requests
 from requests.auth import HTTPBasicAuth
 
+from src.patient_index import PATIENT_INDEX
+
 
 # -----------------------------
 # dataclasses
@@ -55,6 +59,95 @@ class PatientPayload:
         return asdict(self)
 
 
+@dataclass
+class CreatedPatient:
+    """
+    Пациент из ответа POST /patient?v=PATIENT_REPRESENTATION.
+    raw — ответ целиком (для checks/ и сравнения с поиском).
+    """
+    uuid: str
+    display: str
+    person: Person
+    identifiers: List[Identifier]
+    raw: Dict
+
+
+# ответ на создание сразу со всем, что нужно тестам и checks/patient_checks.py,
+# чтобы не догружать person через GET /person/{uuid}?v=full
+PATIENT_REPRESENTATION = (
+    "custom:(uuid,display,voided,"
+    "person:(uuid,display,gender,birthdate,"
+    "preferredName:(uuid,display,givenName,familyName,middleName),"
+    "names:(uuid,display,givenName,familyName,middleName),"
+    "addresses:(address1,cityVillage,country)),"
+    "identifiers:(uuid,display,identifier,preferred,identifierType:(uuid,display),location:(uuid,display)))"
+)
+
+
+def person_from_representation(data: Dict) -> Person:
+    """
+    Person из уже полученного представления — без запросов к серверу.
+    """
+    names = [
+        PersonName(givenName=n["givenName"], familyName=n.get("familyName") or "", middleName=n.get("middleName"))
+        for n in data.get("names") or []
+        if isinstance(n, dict) and n.get("givenName")
+    ]
+    preferred = data.get("preferredName")
+    if not names and isinstance(preferred, dict) and preferred.get("givenName"):
+        names.append(PersonName(givenName=preferred["givenName"], familyName=preferred.get("familyName") or "",
+                                middleName=preferred.get("middleName")))
+
+    return Person(
+        names=names,
+        gender=data.get("gender") or "",
+        birthdate=data.get("birthdate") or "",
+        addresses=[
+            Address(address1=a.get("address1") or "", cityVillage=a.get("cityVillage") or "",
+                    country=a.get("country") or "")
+            for a in data.get("addresses") or []
+            if isinstance(a, dict)
+        ],
+    )
+
+
+def _ref(value: object) -> str:
+    return value.get("uuid", "") if isinstance(value, dict) else value or ""
+
+
+def patient_from_representation(data: Dict) -> CreatedPatient:
+    return CreatedPatient(
+        uuid=data["uuid"],
+        display=data.get("display") or "",
+        person=person_from_representation(data.get("person") or {}),
+        identifiers=[
+            Identifier(
+                identifier=i.get("identifier") or "",
+                identifierType=_ref(i.get("identifierType")),
+                location=_ref(i.get("location")),
+                preferred=bool(i.get("preferred")),
+            )
+            for i in data.get("identifiers") or []
+        ],
+        raw=data,
+    )
+
+
+# -----------------------------
+# errors
+# -----------------------------
+
+class OpenMRSError(RuntimeError):
+    """
+    Ответ OpenMRS с неуспешным статусом.
+    """
+
+    def __init__(self, status_code: int, body: str) -> None:
+        super().__init__(f"OpenMRS error {status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+
+
 # -----------------------------
 # client
 # -----------------------------
@@ -72,22 +165,163 @@ class OpenMRSClient:
         "Accept": "application/json",
     }
 
+    # подписчики на изменения пользователей (кэши username -> uuid)
+    _user_listeners: List[weakref.ReferenceType] = []
+    _user_listeners_lock = threading.Lock()
+
+
+    @classmethod
+    def add_user_listener(cls, listener: Callable[..., None]) -> None:
+        """
+        listener(username=..., user_uuid=...) вызывается после create/retire/unretire/purge.
+        Храним слабые ссылки, чтобы не держать кэши живыми.
+        """
+        ref = weakref.WeakMethod(listener) if hasattr(listener, "__self__") else weakref.ref(listener)
+        with cls._user_listeners_lock:
+            cls._user_listeners.append(ref)
+
+
+    @classmethod
+    def _notify_user_changed(cls, username: Optional[str] = None, user_uuid: Optional[str] = None) -> None:
+        with cls._user_listeners_lock:
+            cls._user_listeners[:] = [ref for ref in cls._user_listeners if ref() is not None]
+            listeners = [ref() for ref in cls._user_listeners]
+
+        for listener in listeners:
+            if listener is not None:
+                listener(username=username, user_uuid=user_uuid)
+
 
     def __init__(self, username: str, password: str) -> None:
         self.auth = HTTPBasicAuth(username, password)
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+
+
+    def get_json(self, path: str, params: Optional[Dict] = None, timeout: int = 30) -> Dict:
+        resp = self.session.get(
+            f"{self.BASE_URL}{path}",
+            params=params,
+            timeout=timeout,
+        )
 
+        if not resp.ok:
+            raise OpenMRSError(resp.status_code, resp.text)
 
-    def create_patient(self, payload: PatientPayload) -> Dict:
-        resp = requests.post(
+        return resp.json()
+
+
+    def get_checked(self, path: str, validator, *extra: str, params: Optional[Dict] = None) -> Dict:
+        """
+        GET с v=custom:(...), выведенным из полей, которые читает validator
+        (checks/schema.py), и extra — полей, нужных самому вызывающему.
+        Сервер не собирает v=full, а всё нужное проверке в ответе есть.
+        """
+        return self.get_json(path, params={**(params or {}), "v": validator.representation(*extra)})
+
+
+    def iter_results(self, path: str, params: Optional[Dict] = None, page_size: int = 100) -> Iterator[Dict]:
+        """
+        Постраничный обход списка ресурсов (startIndex/limit).
+
+        Элементы отдаются по мере прихода страниц — в памяти
+        держится только текущая страница.
+        """
+        query = dict(params or {})
+        query["limit"] = page_size
+        start_index = 0
+
+        while True:
+            query["startIndex"] = start_index
+            data = self.get_json(path, params=query)
+
+            results = data.get("results", []) or []
+            yield from results
+
+            has_next = any(link.get("rel") == "next" for link in data.get("links", []) or [])
+            if not results or not has_next:
+                return
+
+            start_index += len(results)
+
+
+    def create_patient(self, payload: PatientPayload, params: Optional[Dict] = None, index: bool = True) -> Dict:
+        """
+        index=False — не запоминать пациента в PATIENT_INDEX (массовый импорт).
+        """
+        body = payload.to_dict()
+        resp = self.session.post(
             f"{self.BASE_URL}/patient",
-            headers=self.headers,
-            json=payload.to_dict(),
-            auth=self.auth,
+            params=params,
+            json=body,
         )
 
         if resp.status_code not in (200, 201):
-            raise RuntimeError(
-                f"OpenMRS error {resp.status_code}: {resp.text}"
-            )
+            raise OpenMRSError(resp.status_code, resp.text)
+
+        patient = resp.json()
+        if index:
+            PATIENT_INDEX.add(patient, payload=body)
+        return patient
+
+
+    def create_patient_with_person(self, payload: PatientPayload,
+                                   representation: str = PATIENT_REPRESENTATION) -> CreatedPatient:
+        """
+        Один запрос на пациента: person создаётся вложенно в POST /patient,
+        а нужное представление (person с именами, идентификаторы) приходит
+        в том же ответе — без POST /person и GET /person/{uuid}?v=full.
+        """
+        return patient_from_representation(self.create_patient(payload, params={"v": representation}))
+
+
+    def create_user(self, payload: Dict) -> Dict:
+        resp = self.session.post(
+            f"{self.BASE_URL}/user",
+            json=payload,
+            timeout=30,
+        )
+        # в т.ч. 409: имя могло числиться в кэше как несуществующее
+        self._notify_user_changed(username=payload.get("username"))
+
+        if resp.status_code not in (200, 201):
+            raise OpenMRSError(resp.status_code, resp.text)
+
+        return resp.json()
+
+
+    def retire_user(self, user_uuid: str, reason: str) -> None:
+        self._delete(f"/user/{user_uuid}", params={"reason": reason})
+        self._notify_user_changed(user_uuid=user_uuid)
+
+
+    def unretire_user(self, user_uuid: str) -> Dict:
+        resp = self.session.post(
+            f"{self.BASE_URL}/user/{user_uuid}",
+            json={"retired": False},
+            timeout=30,
+        )
+
+        self._notify_user_changed(user_uuid=user_uuid)
+
+        if not resp.ok:
+            raise OpenMRSError(resp.status_code, resp.text)
 
         return resp.json()
+
+
+    def purge_user(self, user_uuid: str) -> None:
+        self._delete(f"/user/{user_uuid}", params={"purge": "true"})
+        self._notify_user_changed(user_uuid=user_uuid)
+
+
+    def _delete(self, path: str, params: Optional[Dict] = None) -> None:
+        resp = self.session.delete(
+            f"{self.BASE_URL}{path}",
+            params=params,
+            timeout=30,
+        )
+
+        if resp.status_code not in (200, 204):
+            raise OpenMRSError(resp.status_code, resp.text)
@@ -0,0 +1,1208 @@
+"""
+openmrs_standin.py
+
+Локальная in-process замена OpenMRS REST API (/ws/rest/v1) для офлайн-прогонов.
+
+Эмулирует эндпоинты, которыми пользуется проект:
+/person, /patient, /visit (+ /visit/{uuid}/attribute), /encounter, /location,
+/visittype, /encountertype, /visitattributetype, /patientidentifiertype,
+/user, /role, /session.
+
+Состояние хранится в памяти с индексами (uuid, username, identifier,
+визиты по пациенту). Валидация повторяет поведение OpenMRS в тех местах,
+на которые опираются тесты: LuhnMod30 для OpenMRS ID, обязательный
+идентификатор, привилегии пользователя, пересечение визитов.
+
+Подключение:
+    standin = OpenMRSStandIn()
+    standin.install()        # все requests.* на BASE_URL идут в стенд
+    ...
+    standin.uninstall()
+
+или как обычный HTTP-сервер: standin.serve(port=8080).
+"""
+
+import base64
+import json
+import re
+import threading
+import uuid as uuid_lib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+from src import transport
+from src.openmrs_patient import OpenMRSClient
+
+
+REST_PREFIX = "/openmrs/ws/rest/v1"
+
+MOD30_ALPHABET = "0123456789ACDEFGHJKLMNPRTUVWXY"
+MAX_IDENTIFIER_LENGTH = 50
+
+
+# -----------------------------
+# errors
+# -----------------------------
+
+class StandInError(Exception):
+    def __init__(self, status: int, message: str, code: str = "") -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+
+    def to_json(self) -> Dict:
+        return {
+            "error": {
+                "message": self.message,
+                "code": self.code,
+                "detail": "",
+                "globalErrors": [],
+                "fieldErrors": {},
+            }
+        }
+
+
+def _bad_request(message: str, code: str = "org.openmrs.module.webservices.rest.web.response.ConversionException") -> StandInError:
+    return StandInError(400, message, code)
+
+
+def _not_found(resource: str, value: object) -> StandInError:
+    return StandInError(404, f"Object with given uuid doesn't exist [{resource}: {value}]",
+                        "org.openmrs.module.webservices.rest.web.response.ObjectNotFoundException")
+
+
+# -----------------------------
+# seed data
+# -----------------------------
+
+ALL_PRIVILEGES = [
+    "Get Locations", "Manage Locations",
+    "Get Identifier Types", "Get Visit Types", "Get Encounter Types", "Get Visit Attribute Types",
+    "Get People", "Add People", "Edit People",
+    "Get Patients", "Add Patients", "Edit Patients",
+    "Add Patient Identifiers", "Edit Patient Identifiers",
+    "Get Visits", "Add Visits", "Edit Visits",
+    "Get Encounters", "Add Encounters",
+    "Get Users", "Add Users", "Edit Users", "Delete Users", "Purge Users",
+    "Get Roles", "Manage Roles", "Get Privileges",
+    "Get Concepts",
+]
+
+SEED_ROLES = [
+    # (uuid, name, privileges)
+    ("8d94f852-c2cc-11de-8d13-0010c6dffd0f", "System Developer", ALL_PRIVILEGES),
+    ("ab2160f6-0941-430c-9752-6714353fbd3c", "Privilege Level: Full", ALL_PRIVILEGES),
+    ("f089471c-e00b-468e-96e8-46aea1b339af", "Privilege Level: High",
+     [p for p in ALL_PRIVILEGES if p not in ("Purge Users", "Manage Roles")]),
+    ("4ef1f0f9-fee6-414b-910d-28e17df345c2", "Doctor", [
+        "Get Locations", "Get Identifier Types", "Get Visit Types", "Get Encounter Types",
+        "Get Visit Attribute Types", "Get People", "Add People", "Get Patients", "Add Patients",
+        "Add Patient Identifiers", "Get Visits", "Add Visits", "Edit Visits", "Get Encounters",
+        "Add Encounters", "Get Concepts",
+    ]),
+    ("2749cd1b-251a-4d8b-bc35-0165f2b1af3e", "Inventory Clerk", ["Get Locations", "Get Concepts"]),
+]
+
+SEED_USERS = [
+    # (username, password, role uuid, retired)
+    ("admin", "Admin123", "8d94f852-c2cc-11de-8d13-0010c6dffd0f", False),
+    ("user124", "Password123", "ab2160f6-0941-430c-9752-6714353fbd3c", False),
+    ("user125", "Password123", "f089471c-e00b-468e-96e8-46aea1b339af", False),
+    ("user220", "Password123", "4ef1f0f9-fee6-414b-910d-28e17df345c2", False),
+    ("user215", "Password123", "2749cd1b-251a-4d8b-bc35-0165f2b1af3e", False),
+    ("user225", "Password123", "4ef1f0f9-fee6-414b-910d-28e17df345c2", True),
+]
+
+SEED_LOCATIONS = ["Outpatient Clinic", "Inpatient Ward", "Registration Desk", "Pharmacy"]
+
+SEED_IDENTIFIER_TYPES = [
+    # (name, required, format, validator)
+    ("OpenMRS ID", True, None, "org.openmrs.module.idgen.validator.LuhnMod30IdentifierValidator"),
+    ("Old Identification Number", False, None, None),
+    ("ID Card", False, "^[A-Z]{1}-[0-9]{7}$", None),
+]
+
+SEED_VISIT_TYPES = ["Facility Visit", "Home Visit"]
+SEED_ENCOUNTER_TYPES = ["Visit Note", "Vitals"]
+SEED_VISIT_ATTRIBUTE_TYPES = [
+    ("Patient condition", "org.openmrs.customdatatype.datatype.FreeTextDatatype"),
+    ("Insured", "org.openmrs.customdatatype.datatype.BooleanDatatype"),
+]
+
+
+# -----------------------------
+# helpers
+# -----------------------------
+
+def _new_uuid() -> str:
+    return str(uuid_lib.uuid4())
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _format_datetime(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}+0000"
+
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATETIME_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,3}))?(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+
+def _parse_datetime(value: object, field: str) -> datetime:
+    """
+    Форматы, которые принимает OpenMRS REST: yyyy-MM-dd и yyyy-MM-dd'T'HH:mm:ss.SSSZ.
+    """
+    if not isinstance(value, str) or not value:
+        raise _bad_request(f"Failed to convert {field}: {value!r} is not a valid date")
+
+    try:
+        if _DATE_RE.match(value):
+            return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+        m = _DATETIME_RE.match(value)
+        if m:
+            day, hh, mm, ss, ms, tz = m.groups()
+            parsed = datetime.strptime(f"{day} {hh}:{mm}:{ss}", "%Y-%m-%d %H:%M:%S")
+            parsed = parsed.replace(microsecond=int((ms or "0").ljust(3, "0")) * 1000)
+            offset = timedelta(0)
+            if tz and tz != "Z":
+                sign = -1 if tz[0] == "-" else 1
+                digits = tz[1:].replace(":", "")
+                offset = sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+            return parsed.replace(tzinfo=timezone(offset)).astimezone(timezone.utc)
+    except ValueError:
+        pass
+
+    raise _bad_request(f"Failed to convert {field}: {value!r} is not a valid date")
+
+
+def luhn_mod30_is_valid(value: str) -> bool:
+    """
+    Проверка LuhnMod30IdentifierValidator: последний символ — контрольный.
+    """
+    if len(value) < 2 or any(ch not in MOD30_ALPHABET for ch in value):
+        return False
+
+    total = 0
+    double = False
+    for ch in reversed(value):
+        v = MOD30_ALPHABET.index(ch)
+        if double:
+            v *= 2
+            v = (v // 30) + (v % 30)
+        total += v
+        double = not double
+    return total % 30 == 0
+
+
+def _ref_uuid(value: object) -> Optional[str]:
+    # ссылка в теле запроса: "uuid" или {"uuid": "..."}
+    if isinstance(value, dict):
+        value = value.get("uuid")
+    return value if isinstance(value, str) else None
+
+
+def parse_custom_representation(spec: str) -> Dict[str, Optional[dict]]:
+    """
+    "custom:(uuid,person:(uuid,display))" -> {"uuid": None, "person": {"uuid": None, "display": None}}
+    """
+    body = spec[len("custom:"):] if spec.startswith("custom:") else spec
+    pos = 0
+
+    def parse_group() -> Dict[str, Optional[dict]]:
+        nonlocal pos
+        fields: Dict[str, Optional[dict]] = {}
+        assert body[pos] == "("
+        pos += 1
+        while pos < len(body) and body[pos] != ")":
+            start = pos
+            while pos < len(body) and body[pos] not in ",:()":
+                pos += 1
+            name = body[start:pos].strip()
+            sub = None
+            if pos < len(body) and body[pos] == ":":
+                pos += 1
+                if body[pos] == "(":
+                    sub = parse_group()
+                else:
+                    # person:ref / person:full — берём поле целиком
+                    while pos < len(body) and body[pos] not in ",)":
+                        pos += 1
+            if name:
+                fields[name] = sub
+            if pos < len(body) and body[pos] == ",":
+                pos += 1
+        pos += 1
+        return fields
+
+    if not body.startswith("("):
+        raise _bad_request(f"Invalid custom representation: {spec}")
+    return parse_group()
+
+
+def project(value: object, fields: Dict[str, Optional[dict]]) -> object:
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    out = {}
+    for name, sub in fields.items():
+        if name in value:
+            out[name] = project(value[name], sub) if sub is not None else value[name]
+    return out
+
+
+# -----------------------------
+# stand-in
+# -----------------------------
+
+class OpenMRSStandIn:
+    """
+    Состояние и обработчики эмулятора. Потокобезопасен (один RLock на запрос).
+    """
+
+    def __init__(self, seed: bool = True, base_url: str = OpenMRSClient.BASE_URL) -> None:
+        self.base_url = base_url
+        self._lock = threading.RLock()
+
+        self.privileges: Dict[str, Dict] = {}
+        self.roles: Dict[str, Dict] = {}
+        self.users: Dict[str, Dict] = {}
+        self.persons: Dict[str, Dict] = {}
+        self.patients: Dict[str, Dict] = {}
+        self.visits: Dict[str, Dict] = {}
+        self.encounters: Dict[str, Dict] = {}
+        self.locations: Dict[str, Dict] = {}
+        self.identifier_types: Dict[str, Dict] = {}
+        self.visit_types: Dict[str, Dict] = {}
+        self.encounter_types: Dict[str, Dict] = {}
+        self.visit_attribute_types: Dict[str, Dict] = {}
+
+        # вторичные индексы
+        self.users_by_username: Dict[str, str] = {}
+        self.patients_by_identifier: Dict[str, str] = {}
+        self.visits_by_patient: Dict[str, List[str]] = {}
+
+        self.request_count = 0
+        self._adapter: Optional["StandInAdapter"] = None
+
+        if seed:
+            self._seed()
+
+    # -----------------------------
+    # seed
+    # -----------------------------
+
+    def _seed(self) -> None:
+        for name in ALL_PRIVILEGES:
+            self.privileges[name] = {"uuid": _new_uuid(), "name": name}
+
+        for role_uuid, name, privs in SEED_ROLES:
+            self.roles[role_uuid] = {"uuid": role_uuid, "name": name, "description": name,
+                                     "privileges": list(privs), "retired": False}
+
+        for username, password, role_uuid, retired in SEED_USERS:
+            person = self._store_person({"names": [{"givenName": username.capitalize(), "familyName": "User"}],
+                                         "gender": "M", "birthdate": "1990-01-01"})
+            self._store_user(username, password, person["uuid"], [role_uuid], retired=retired)
+
+        for name in SEED_LOCATIONS:
+            self._store_metadata(self.locations, name, description=f"{name} (stand-in)")
+        for name, required, fmt, validator in SEED_IDENTIFIER_TYPES:
+            self._store_metadata(self.identifier_types, name, required=required, format=fmt, validator=validator,
+                                 formatDescription=None, locationBehavior=None, uniquenessBehavior=None)
+        for name in SEED_VISIT_TYPES:
+            self._store_metadata(self.visit_types, name)
+        for name in SEED_ENCOUNTER_TYPES:
+            self._store_metadata(self.encounter_types, name)
+        for name, datatype in SEED_VISIT_ATTRIBUTE_TYPES:
+            self._store_metadata(self.visit_attribute_types, name, datatypeClassname=datatype,
+                                 minOccurs=0, maxOccurs=1)
+
+    def _store_metadata(self, table: Dict[str, Dict], name: str, **extra) -> Dict:
+        obj = {"uuid": _new_uuid(), "name": name, "description": extra.pop("description", None), "retired": False}
+        obj.update(extra)
+        table[obj["uuid"]] = obj
+        return obj
+
+    # -----------------------------
+    # transport
+    # -----------------------------
+
+    def install(self) -> "OpenMRSStandIn":
+        """
+        Перенаправляет все запросы requests на base_url в этот стенд.
+        """
+        if self._adapter is None:
+            self._adapter = StandInAdapter(self)
+            transport.mount(self.base_url, self._adapter)
+        return self
+
+    def uninstall(self) -> None:
+        if self._adapter is not None:
+            transport.unmount(self._adapter)
+            self._adapter = None
+
+    def __enter__(self) -> "OpenMRSStandIn":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+        """
+        Поднимает стенд как HTTP-сервер (в фоновом потоке).
+        REST доступен по http://host:port/openmrs/ws/rest/v1.
+        """
+        server = ThreadingHTTPServer((host, port), _make_http_handler(self))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    # -----------------------------
+    # dispatch
+    # -----------------------------
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]],
+               body: Optional[bytes], authorization: Optional[str]) -> Tuple[int, Optional[Dict]]:
+        """
+        Обрабатывает один запрос. path — путь после /ws/rest/v1 (например "/patient/uuid").
+        Возвращает (status, json-тело или None).
+        """
+        params = {k: v[-1] for k, v in query.items()}
+        segments = [s for s in path.split("/") if s]
+
+        with self._lock:
+            self.request_count += 1
+            try:
+                user = self._authenticate(authorization)
+                payload = self._decode_body(body) if method in ("POST", "PUT") else None
+                status, result = self._route(method, segments, params, payload, user)
+            except StandInError as e:
+                return e.status, e.to_json()
+        return status, result
+
+    def _decode_body(self, body: Optional[bytes]) -> object:
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise _bad_request("Could not read JSON: malformed request body")
+
+    def _route(self, method: str, segments: List[str], params: Dict[str, str],
+               payload: object, user: Optional[Dict]) -> Tuple[int, Optional[Dict]]:
+        if not segments:
+            raise StandInError(404, "Unknown resource")
+
+        resource, rest = segments[0], segments[1:]
+        v = params.get("v", "default")
+
+        if resource == "session":
+            if method == "DELETE":
+                return 204, None
+            return 200, self._session(user, v)
+
+        handlers = self._handlers()
+        if resource not in handlers:
+            raise StandInError(404, f"Unknown resource: {resource}")
+        h = handlers[resource]
+
+        if method == "GET" and not rest:
+            self._require(user, h["get_privilege"])
+            return 200, self._list(h, params, user)
+
+        if method == "GET" and len(rest) == 1:
+            self._require(user, h["get_privilege"])
+            obj = h["lookup"](rest[0])
+            if obj is None:
+                raise _not_found(resource, rest[0])
+            return 200, self._represent(h["rep"], obj, v)
+
+        if method == "POST" and not rest and "create" in h:
+            if not isinstance(payload, dict):
+                raise _bad_request(f"Could not read JSON: expected object for {resource}")
+            obj = h["create"](payload, user)
+            return 201, self._represent(h["rep"], obj, v)
+
+        if method == "POST" and len(rest) == 1 and "update" in h:
+            obj = h["lookup"](rest[0])
+            if obj is None:
+                raise _not_found(resource, rest[0])
+            h["update"](obj, payload if isinstance(payload, dict) else {}, user)
+            return 200, self._represent(h["rep"], obj, v)
+
+        if method == "POST" and len(rest) == 2 and resource == "visit" and rest[1] == "attribute":
+            visit = self.visits.get(rest[0])
+            if visit is None:
+                raise _not_found(resource, rest[0])
+            attribute = self._create_visit_attribute(visit, payload if isinstance(payload, dict) else {}, user)
+            return 201, self._rep_visit_attribute(attribute, v)
+
+        if method == "DELETE" and len(rest) == 1 and "delete" in h:
+            obj = h["lookup"](rest[0])
+            if obj is None:
+                raise _not_found(resource, rest[0])
+            h["delete"](obj, params, user)
+            return 204, None
+
+        raise StandInError(405, f"Method {method} not supported for {'/'.join(segments)}")
+
+    def _handlers(self) -> Dict[str, Dict]:
+        def meta(table, privilege, rep, manage=None):
+            h = {"get_privilege": privilege, "lookup": table.get, "items": table.values, "rep": rep}
+            if manage:
+                h["delete"] = lambda obj, params, user: self._retire_metadata(table, obj, params, user, manage)
+            return h
+
+        return {
+            "location": meta(self.locations, "Get Locations", self._rep_metadata, manage="Manage Locations"),
+            "patientidentifiertype": meta(self.identifier_types, "Get Identifier Types", self._rep_metadata),
+            "visittype": meta(self.visit_types, "Get Visit Types", self._rep_metadata),
+            "encountertype": meta(self.encounter_types, "Get Encounter Types", self._rep_metadata),
+            "visitattributetype": meta(self.visit_attribute_types, "Get Visit Attribute Types", self._rep_metadata),
+            "role": {
+                "get_privilege": "Get Roles", "lookup": self._lookup_role, "items": self.roles.values,
+                "rep": self._rep_role, "create": self._create_role,
+            },
+            "user": {
+                "get_privilege": "Get Users", "lookup": self._lookup_user, "items": self.users.values,
+                "rep": self._rep_user, "create": self._create_user, "update": self._update_user,
+                "delete": self._delete_user, "search": self._search_users,
+            },
+            "person": {
+                "get_privilege": "Get People", "lookup": self.persons.get, "items": self.persons.values,
+                "rep": self._rep_person, "create": self._create_person,
+            },
+            "patient": {
+                "get_privilege": "Get Patients", "lookup": self.patients.get, "items": self.patients.values,
+                "rep": self._rep_patient, "create": self._create_patient, "search": self._search_patients,
+            },
+            "visit": {
+                "get_privilege": "Get Visits", "lookup": self.visits.get, "items": self.visits.values,
+                "rep": self._rep_visit, "create": self._create_visit,
+            },
+            "encounter": {
+                "get_privilege": "Get Encounters", "lookup": self.encounters.get, "items": self.encounters.values,
+                "rep": self._rep_encounter, "create": self._create_encounter,
+            },
+        }
+
+    def _list(self, h: Dict, params: Dict[str, str], user: Optional[Dict]) -> Dict:
+        q = params.get("q")
+        include_all = params.get("includeAll") == "true"
+
+        if q and "search" in h:
+            items = h["search"](q, include_all)
+        else:
+            items = [o for o in h["items"]() if include_all or not (o.get("retired") or o.get("voided"))]
+
+        limit = min(int(params.get("limit", 50)), 100)
+        start = int(params.get("startIndex", 0))
+        page = items[start:start + limit]
+
+        result = {"results": [self._represent(h["rep"], o, params.get("v", "default")) for o in page]}
+        if start + limit < len(items):
+            result["links"] = [{"rel": "next", "uri": f"{self.base_url}?startIndex={start + limit}&limit={limit}"}]
+        return result
+
+    def _represent(self, rep: Callable[[Dict, str], Dict], obj: Dict, v: str) -> Dict:
+        if v.startswith("custom:"):
+            return project(rep(obj, "full"), parse_custom_representation(v))
+        return rep(obj, v)
+
+    # -----------------------------
+    # auth / privileges
+    # -----------------------------
+
+    def _authenticate(self, authorization: Optional[str]) -> Optional[Dict]:
+        if not authorization or not authorization.startswith("Basic "):
+            return None
+        try:
+            username, _, password = base64.b64decode(authorization[6:]).decode("utf-8").partition(":")
+        except ValueError:
+            return None
+
+        user = self._lookup_user(username)
+        # retired пользователь не аутентифицируется — дальше работает как анонимный
+        if user is None or user["password"] != password or user["retired"]:
+            return None
+        return user
+
+    def _user_privileges(self, user: Optional[Dict]) -> set:
+        if user is None:
+            return set()
+        privs = set()
+        for role_uuid in user["roles"]:
+            role = self.roles.get(role_uuid)
+            if role:
+                privs.update(role["privileges"])
+        return privs
+
+    def _require(self, user: Optional[Dict], privilege: str) -> None:
+        # действие над ресурсом: 401 для анонимного, 403 для аутентифицированного
+        if privilege not in self._user_privileges(user):
+            status = 401 if user is None else 403
+            raise StandInError(status, f"Privileges required: {privilege}",
+                               "org.openmrs.api.APIAuthenticationException")
+
+    def _require_for_conversion(self, user: Optional[Dict], privilege: str) -> None:
+        # разрешение ссылки в теле запроса: OpenMRS отдаёт 400 (ConversionException)
+        if privilege not in self._user_privileges(user):
+            raise _bad_request(f"Privileges required: {privilege}")
+
+    def _resolve(self, table: Dict[str, Dict], value: object, field: str, privilege: str,
+                 user: Optional[Dict], label: Optional[str] = None) -> Dict:
+        self._require_for_conversion(user, privilege)
+        if value is None:
+            raise _bad_request(f"{field} is required (null): {label or field}")
+        ref = _ref_uuid(value)
+        obj = table.get(ref) if ref else None
+        if obj is None:
+            raise _bad_request(f"{field}: Object with given uuid doesn't exist [{label or field}: {value!r}]")
+        return obj
+
+    # -----------------------------
+    # representations
+    # -----------------------------
+
+    def _link(self, resource: str, obj_uuid: str) -> List[Dict]:
+        return [{"rel": "self", "uri": f"{self.base_url}/{resource}/{obj_uuid}", "resourceAlias": resource}]
+
+    def _ref(self, resource: str, obj_uuid: str, display: str) -> Dict:
+        return {"uuid": obj_uuid, "display": display, "links": self._link(resource, obj_uuid)}
+
+    def _audit(self, obj: Dict) -> Dict:
+        return {"creator": self._ref("user", obj.get("creator", ""), obj.get("creator_name", "admin")),
+                "dateCreated": _format_datetime(obj.get("created")), "changedBy": None, "dateChanged": None}
+
+    def _rep_metadata(self, obj: Dict, v: str) -> Dict:
+        resource = self._resource_of(obj)
+        if v == "ref":
+            return self._ref(resource, obj["uuid"], obj["name"])
+        rep = {k: val for k, val in obj.items() if k not in ("created", "creator", "creator_name")}
+        rep["display"] = obj["name"]
+        rep["links"] = self._link(resource, obj["uuid"])
+        if v == "full":
+            rep["auditInfo"] = self._audit(obj)
+        return rep
+
+    def _resource_of(self, obj: Dict) -> str:
+        for resource, table in (("location", self.locations), ("patientidentifiertype", self.identifier_types),
+                                ("visittype", self.visit_types), ("encountertype", self.encounter_types),
+                                ("visitattributetype", self.visit_attribute_types)):
+            if obj["uuid"] in table:
+                return resource
+        return "unknown"
+
+    def _person_display(self, person: Dict) -> str:
+        name = person["names"][0]
+        return " ".join(p for p in (name["givenName"], name.get("middleName"), name.get("familyName")) if p)
+
+    def _rep_name(self, name: Dict, v: str) -> Dict:
+        display = " ".join(p for p in (name["givenName"], name.get("middleName"), name.get("familyName")) if p)
+        if v == "ref":
+            return {"uuid": name["uuid"], "display": display, "links": []}
+        return {"uuid": name["uuid"], "display": display, "givenName": name["givenName"],
+                "middleName": name.get("middleName"), "familyName": name.get("familyName"),
+                "familyName2": None, "preferred": name["preferred"], "voided": False, "links": []}
+
+    def _rep_person(self, person: Dict, v: str) -> Dict:
+        display = self._person_display(person)
+        if v == "ref":
+            return self._ref("person", person["uuid"], display)
+
+        birthdate = person["birthdate"]
+        rep = {
+            "uuid": person["uuid"],
+            "display": display,
+            "gender": person["gender"],
+            "age": (date.today().year - birthdate.year) if birthdate else None,
+            "birthdate": _format_datetime(datetime.combine(birthdate, datetime.min.time(), timezone.utc))
+            if birthdate else None,
+            "birthdateEstimated": False,
+            "dead": False,
+            "deathDate": None,
+            "causeOfDeath": None,
+            "preferredName": self._rep_name(person["names"][0], "ref"),
+            "preferredAddress": None,
+            "attributes": [],
+            "voided": False,
+            "links": self._link("person", person["uuid"]),
+        }
+        if v == "full":
+            rep["preferredName"] = self._rep_name(person["names"][0], "full")
+            rep["names"] = [self._rep_name(n, "full") for n in person["names"]]
+            rep["addresses"] = []
+            rep["auditInfo"] = self._audit(person)
+        return rep
+
+    def _rep_identifier(self, identifier: Dict, v: str) -> Dict:
+        id_type = self.identifier_types[identifier["identifierType"]]
+        display = f"{id_type['name']} = {identifier['identifier']}"
+        if v == "ref":
+            return {"uuid": identifier["uuid"], "display": display, "links": []}
+        location = self.locations[identifier["location"]]
+        return {"uuid": identifier["uuid"], "display": display, "identifier": identifier["identifier"],
+                "identifierType": self._ref("patientidentifiertype", id_type["uuid"], id_type["name"]),
+                "location": self._ref("location", location["uuid"], location["name"]),
+                "preferred": identifier["preferred"], "voided": False, "links": []}
+
+    def _rep_patient(self, patient: Dict, v: str) -> Dict:
+        person = self.persons[patient["uuid"]]
+        preferred = patient["identifiers"][0]["identifier"]
+        display = f"{preferred} - {self._person_display(person)}"
+        if v == "ref":
+            return self._ref("patient", patient["uuid"], display)
+
+        rep = {
+            "uuid": patient["uuid"],
+            "display": display,
+            "identifiers": [self._rep_identifier(i, "full" if v == "full" else "ref") for i in patient["identifiers"]],
+            "person": self._rep_person(person, "full" if v == "full" else "default"),
+            "voided": False,
+            "links": self._link("patient", patient["uuid"]),
+        }
+        if v == "full":
+            rep["auditInfo"] = self._audit(patient)
+        return rep
+
+    def _rep_role(self, role: Dict, v: str) -> Dict:
+        if v == "ref":
+            return self._ref("role", role["uuid"], role["name"])
+        rep = {
+            "uuid": role["uuid"],
+            "display": role["name"],
+            "name": role["name"],
+            "description": role["description"],
+            "retired": role["retired"],
+            "privileges": [self._ref("privilege", self.privileges[p]["uuid"], p) for p in role["privileges"]],
+            "inheritedRoles": [],
+            "links": self._link("role", role["uuid"]),
+        }
+        if v == "full":
+            rep["allInheritedRoles"] = []
+            rep["auditInfo"] = self._audit(role)
+        return rep
+
+    def _rep_user(self, user: Dict, v: str) -> Dict:
+        if v == "ref":
+            return self._ref("user", user["uuid"], user["username"])
+        person = self.persons[user["person"]]
+        roles = [self.roles[r] for r in user["roles"] if r in self.roles]
+        privileges = sorted({p for role in roles for p in role["privileges"]})
+        rep = {
+            "uuid": user["uuid"],
+            "display": user["username"],
+            "username": user["username"],
+            "systemId": user["systemId"],
+            "userProperties": {},
+            "person": self._rep_person(person, "default" if v == "full" else "ref"),
+            "privileges": [self._ref("privilege", self.privileges[p]["uuid"], p) for p in privileges],
+            "roles": [self._rep_role(r, "default" if v == "full" else "ref") for r in roles],
+            "retired": user["retired"],
+            "links": self._link("user", user["uuid"]),
+        }
+        if v == "full":
+            rep["auditInfo"] = self._audit(user)
+        return rep
+
+    def _rep_visit(self, visit: Dict, v: str) -> Dict:
+        patient_person = self.persons[visit["patient"]]
+        visit_type = self.visit_types[visit["visitType"]]
+        location = self.locations.get(visit["location"]) if visit["location"] else None
+        display = f"{visit_type['name']}" + (f" @ {location['name']}" if location else "") \
+                  + f" - {visit['startDatetime'].strftime('%d/%m/%Y %H:%M')}"
+        if v == "ref":
+            return self._ref("visit", visit["uuid"], display)
+
+        sub = "default" if v == "full" else "ref"
+        rep = {
+            "uuid": visit["uuid"],
+            "display": display,
+            "patient": self._ref("patient", visit["patient"], self._person_display(patient_person)),
+            "visitType": self._ref("visittype", visit_type["uuid"], visit_type["name"]),
+            "indication": visit["indication"],
+            "location": self._ref("location", location["uuid"], location["name"]) if location else None,
+            "startDatetime": _format_datetime(visit["startDatetime"]),
+            "stopDatetime": _format_datetime(visit["stopDatetime"]),
+            "encounters": [self._rep_encounter(self.encounters[e], sub) for e in visit["encounters"]],
+            "attributes": [self._rep_visit_attribute(a, sub) for a in visit["attributes"]],
+            "voided": False,
+            "links": self._link("visit", visit["uuid"]),
+        }
+        if v == "full":
+            rep["auditInfo"] = self._audit(visit)
+        return rep
+
+    def _rep_visit_attribute(self, attribute: Dict, v: str) -> Dict:
+        attr_type = self.visit_attribute_types[attribute["attributeType"]]
+        display = f"{attr_type['name']}: {attribute['value']}"
+        if v == "ref":
+            return {"uuid": attribute["uuid"], "display": display, "links": []}
+        return {"uuid": attribute["uuid"], "display": display,
+                "attributeType": self._ref("visitattributetype", attr_type["uuid"], attr_type["name"]),
+                "value": attribute["value"], "voided": False, "links": []}
+
+    def _rep_encounter(self, encounter: Dict, v: str) -> Dict:
+        enc_type = self.encounter_types[encounter["encounterType"]]
+        display = f"{enc_type['name']} {encounter['encounterDatetime'].strftime('%d/%m/%Y')}"
+        if v == "ref":
+            return self._ref("encounter", encounter["uuid"], display)
+        location = self.locations.get(encounter["location"]) if encounter["location"] else None
+        return {
+            "uuid": encounter["uuid"],
+            "display": display,
+            "encounterDatetime": _format_datetime(encounter["encounterDatetime"]),
+            "patient": self._ref("patient", encounter["patient"], self._person_display(self.persons[encounter["patient"]])),
+            "location": self._ref("location", location["uuid"], location["name"]) if location else None,
+            "encounterType": self._ref("encountertype", enc_type["uuid"], enc_type["name"]),
+            "visit": self._ref("visit", encounter["visit"], "") if encounter["visit"] else None,
+            "voided": False,
+            "links": self._link("encounter", encounter["uuid"]),
+        }
+
+    def _session(self, user: Optional[Dict], v: str) -> Dict:
+        return {
+            "sessionId": _new_uuid().replace("-", "").upper(),
+            "authenticated": user is not None,
+            "user": self._rep_user(user, "default") if user else None,
+            "locale": "en",
+            "allowedLocales": ["en", "ru"],
+            "sessionLocation": None,
+            "currentProvider": None,
+        }
+
+    # -----------------------------
+    # person / patient
+    # -----------------------------
+
+    def _validate_person(self, data: object) -> Dict:
+        if not isinstance(data, dict):
+            raise _bad_request(f"Could not convert person: expected object, got {data!r}")
+
+        names = data.get("names")
+        if not isinstance(names, list) or not names:
+            raise _bad_request(f"Person names are required: names={names!r}",
+                               "org.openmrs.api.ValidationException")
+        for name in names:
+            if not isinstance(name, dict):
+                raise _bad_request(f"Could not convert person name: {name!r}")
+            given = name.get("givenName")
+            if not isinstance(given, str) or not given.strip():
+                raise _bad_request("PersonName.givenName is required: name must have a given name",
+                                   "org.openmrs.api.ValidationException")
+            # PersonNameValidator: длины — по колонкам person_name (varchar(50))
+            for part in ("givenName", "middleName", "familyName"):
+                if isinstance(name.get(part), str) and len(name[part]) > 50:
+                    raise _bad_request(f"PersonName.{part} exceeds the maximum length of 50",
+                                       "org.openmrs.api.ValidationException")
+
+        gender = data.get("gender")
+        if not isinstance(gender, str) or not gender.strip():
+            raise _bad_request(f"Person gender is required: gender={gender!r}",
+                               "org.openmrs.api.ValidationException")
+
+        birthdate = data.get("birthdate")
+        if birthdate is not None:
+            parsed = _parse_datetime(birthdate, "birthdate").date()
+            if parsed > date.today():
+                raise _bad_request("Person birthdate cannot be in the future",
+                                   "org.openmrs.api.ValidationException")
+        return data
+
+    def _store_person(self, data: Dict) -> Dict:
+        birthdate = data.get("birthdate")
+        person = {
+            "uuid": _new_uuid(),
+            "names": [
+                {"uuid": _new_uuid(), "givenName": n["givenName"], "middleName": n.get("middleName"),
+                 "familyName": n.get("familyName"), "preferred": i == 0}
+                for i, n in enumerate(data["names"])
+            ],
+            "gender": data["gender"],
+            "birthdate": _parse_datetime(birthdate, "birthdate").date() if birthdate is not None else None,
+            "created": _now(),
+        }
+        self.persons[person["uuid"]] = person
+        return person
+
+    def _create_person(self, data: Dict, user: Optional[Dict]) -> Dict:
+        self._validate_person(data)
+        self._require(user, "Add People")
+        return self._store_person(data)
+
+    def _create_patient(self, data: Dict, user: Optional[Dict]) -> Dict:
+        # person: новый (объект) или существующий (uuid)
+        person_value = data.get("person")
+        existing_person = None
+        if person_value is None:
+            raise _bad_request("person is required (null)", "org.openmrs.api.ValidationException")
+        if isinstance(person_value, str):
+            existing_person = self.persons.get(person_value)
+            if existing_person is None:
+                raise _bad_request(f"person: Object with given uuid doesn't exist [person: {person_value!r}]")
+            if person_value in self.patients:
+                raise _bad_request("person is already a patient")
+        else:
+            self._validate_person(person_value)
+
+        identifiers = data.get("identifiers")
+        if identifiers is not None and not isinstance(identifiers, list):
+            raise _bad_request(f"Could not convert identifiers to collection: {identifiers!r}")
+
+        resolved = []
+        for item in identifiers or []:
+            if not isinstance(item, dict):
+                raise _bad_request(f"Could not convert identifier: {item!r}")
+
+            id_type = self._resolve(self.identifier_types, item.get("identifierType"), "identifierType",
+                                    "Get Identifier Types", user, label="identifier type")
+
+            value = item.get("identifier")
+            if not isinstance(value, str) or not value.strip():
+                raise _bad_request(f"Identifier is required: identifier={value!r}",
+                                   "org.openmrs.api.BlankIdentifierException")
+
+            location_value = item.get("location")
+            if location_value is None:
+                raise _bad_request("Identifier location is required (null)", "org.openmrs.api.ValidationException")
+            location = self._resolve(self.locations, location_value, "location", "Get Locations", user)
+
+            self._validate_identifier(value, id_type)
+            resolved.append({"uuid": _new_uuid(), "identifier": value, "identifierType": id_type["uuid"],
+                             "location": location["uuid"], "preferred": bool(item.get("preferred", not resolved))})
+
+        self._require(user, "Add Patients")
+
+        present_types = {i["identifierType"] for i in resolved}
+        for id_type in self.identifier_types.values():
+            if id_type["required"] and not id_type["retired"] and id_type["uuid"] not in present_types:
+                raise _bad_request(f"Patient missing required identifier {id_type['name']}",
+                                   "org.openmrs.api.MissingRequiredIdentifierException")
+
+        person = existing_person or self._store_person(person_value)
+        patient = {"uuid": person["uuid"], "identifiers": resolved, "created": _now()}
+        self.patients[patient["uuid"]] = patient
+        for identifier in resolved:
+            self.patients_by_identifier[identifier["identifier"]] = patient["uuid"]
+        return patient
+
+    def _validate_identifier(self, value: str, id_type: Dict) -> None:
+        if len(value) > MAX_IDENTIFIER_LENGTH:
+            raise _bad_request(f"Identifier {value[:20]}... exceeds {MAX_IDENTIFIER_LENGTH} characters",
+                               "org.openmrs.api.InvalidIdentifierFormatException")
+        if id_type["format"] and not re.fullmatch(id_type["format"], value):
+            raise _bad_request(f"Identifier {value} does not match format {id_type['format']}",
+                               "org.openmrs.api.InvalidIdentifierFormatException")
+        if id_type["validator"] and "LuhnMod30" in id_type["validator"] and not luhn_mod30_is_valid(value):
+            raise _bad_request(f"Invalid identifier {value} for type {id_type['name']}: failed LuhnMod30 check digit",
+                               "org.openmrs.api.InvalidCheckDigitException")
+        if value in self.patients_by_identifier:
+            raise _bad_request(f"Identifier {value} already in use by another patient",
+                               "org.openmrs.api.IdentifierNotUniqueException")
+
+    def _search_patients(self, q: str, include_all: bool) -> List[Dict]:
+        by_identifier = self.patients_by_identifier.get(q)
+        if by_identifier:
+            return [self.patients[by_identifier]]
+
+        needle = q.lower()
+        return [p for p in self.patients.values()
+                if needle in self._person_display(self.persons[p["uuid"]]).lower()]
+
+    # -----------------------------
+    # visit / encounter
+    # -----------------------------
+
+    def _create_visit(self, data: Dict, user: Optional[Dict]) -> Dict:
+        patient = self._resolve(self.patients, data.get("patient"), "patient", "Get Patients", user)
+        visit_type = self._resolve(self.visit_types, data.get("visitType"), "visitType", "Get Visit Types",
+                                   user, label="visit type")
+
+        location = None
+        if data.get("location") is not None:
+            location = self._resolve(self.locations, data.get("location"), "location", "Get Locations", user)
+
+        start = _parse_datetime(data["startDatetime"], "startDatetime") \
+            if data.get("startDatetime") is not None else _now()
+        # явный "stopDatetime": null сервер не принимает, отсутствие поля — открытый визит
+        stop = _parse_datetime(data["stopDatetime"], "stopDatetime") if "stopDatetime" in data else None
+
+        indication = data.get("indication")
+        if indication is not None and not isinstance(indication, str):
+            raise _bad_request(f"Failed to convert indication: {indication!r}")
+
+        encounters = self._resolve_encounters(data.get("encounters"), patient)
+
+        self._require(user, "Add Visits")
+
+        if start > _now() + timedelta(minutes=1):
+            raise _bad_request("Visit startDatetime cannot be in the future", "org.openmrs.api.ValidationException")
+        if stop is not None and stop < start:
+            raise _bad_request("Visit stopDatetime must be after startDatetime", "org.openmrs.api.ValidationException")
+        self._check_overlap(patient["uuid"], start, stop)
+
+        visit = {"uuid": _new_uuid(), "patient": patient["uuid"], "visitType": visit_type["uuid"],
+                 "location": location["uuid"] if location else None, "startDatetime": start,
+                 "stopDatetime": stop, "indication": indication, "encounters": [e["uuid"] for e in encounters],
+                 "attributes": [], "created": _now()}
+        self.visits[visit["uuid"]] = visit
+        self.visits_by_patient.setdefault(patient["uuid"], []).append(visit["uuid"])
+        for encounter in encounters:
+            encounter["visit"] = visit["uuid"]
+        return visit
+
+    def _resolve_encounters(self, value: object, patient: Dict) -> List[Dict]:
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            raise _bad_request(f"Failed to convert encounters: could not convert {value!r} to collection (array)")
+
+        resolved = []
+        for item in value:
+            ref = _ref_uuid(item)
+            encounter = self.encounters.get(ref) if ref else None
+            if encounter is None:
+                raise _bad_request(f"Failed to convert encounters: could not convert {item!r} to Encounter")
+            if encounter["patient"] != patient["uuid"]:
+                raise _bad_request("Failed to convert encounters: encounter belongs to another patient")
+            resolved.append(encounter)
+        return resolved
+
+    def _check_overlap(self, patient_uuid: str, start: datetime, stop: Optional[datetime]) -> None:
+        far = datetime.max.replace(tzinfo=timezone.utc)
+        for visit_uuid in self.visits_by_patient.get(patient_uuid, []):
+            other = self.visits[visit_uuid]
+            if start <= (other["stopDatetime"] or far) and other["startDatetime"] <= (stop or far):
+                raise _bad_request("This visit overlaps with another visit of the same patient",
+                                   "org.openmrs.api.ValidationException")
+
+    def _create_visit_attribute(self, visit: Dict, data: Dict, user: Optional[Dict]) -> Dict:
+        attr_type = self._resolve(self.visit_attribute_types, data.get("attributeType"), "attributeType",
+                                  "Get Visit Attribute Types", user, label="attribute type")
+        value = data.get("value")
+
+        if "BooleanDatatype" in attr_type["datatypeClassname"]:
+            if str(value).lower() not in ("true", "false"):
+                raise _bad_request(f"Invalid value {value!r} for boolean attribute {attr_type['name']}")
+            value = str(value).lower() == "true"
+        elif not isinstance(value, str):
+            raise _bad_request(f"Invalid value {value!r} for attribute {attr_type['name']}")
+
+        self._require(user, "Edit Visits")
+
+        attribute = {"uuid": _new_uuid(), "attributeType": attr_type["uuid"], "value": value}
+        visit["attributes"].append(attribute)
+        return attribute
+
+    def _create_encounter(self, data: Dict, user: Optional[Dict]) -> Dict:
+        patient = self._resolve(self.patients, data.get("patient"), "patient", "Get Patients", user)
+        enc_type = self._resolve(self.encounter_types, data.get("encounterType"), "encounterType",
+                                 "Get Encounter Types", user, label="encounter type")
+        location = None
+        if data.get("location") is not None:
+            location = self._resolve(self.locations, data.get("location"), "location", "Get Locations", user)
+        when = _parse_datetime(data["encounterDatetime"], "encounterDatetime") \
+            if data.get("encounterDatetime") is not None else _now()
+
+        self._require(user, "Add Encounters")
+
+        encounter = {"uuid": _new_uuid(), "patient": patient["uuid"], "encounterType": enc_type["uuid"],
+                     "location": location["uuid"] if location else None, "encounterDatetime": when,
+                     "visit": None, "created": _now()}
+        self.encounters[encounter["uuid"]] = encounter
+        return encounter
+
+    # -----------------------------
+    # users / roles / metadata
+    # -----------------------------
+
+    def _lookup_user(self, key: str) -> Optional[Dict]:
+        # OpenMRS ищет пользователя по uuid, затем по username
+        user = self.users.get(key)
+        if user is None and key in self.users_by_username:
+            user = self.users[self.users_by_username[key]]
+        return user
+
+    def _lookup_role(self, key: str) -> Optional[Dict]:
+        role = self.roles.get(key)
+        if role is None:
+            role = next((r for r in self.roles.values() if r["name"] == key), None)
+        return role
+
+    def _store_user(self, username: str, password: str, person_uuid: str, roles: List[str],
+                    system_id: Optional[str] = None, retired: bool = False) -> Dict:
+        user = {"uuid": _new_uuid(), "username": username, "password": password,
+                "systemId": system_id or username, "person": person_uuid, "roles": roles,
+                "retired": retired, "created": _now()}
+        self.users[user["uuid"]] = user
+        self.users_by_username[username] = user["uuid"]
+        return user
+
+    def _create_user(self, data: Dict, user: Optional[Dict]) -> Dict:
+        username = data.get("username")
+        if not isinstance(username, str) or not username:
+            raise _bad_request("username is required", "org.openmrs.api.ValidationException")
+
+        roles = [self._resolve(self.roles, r, "roles", "Get Roles", user, label="role")["uuid"]
+                 for r in data.get("roles") or []]
+
+        person_value = data.get("person")
+        if isinstance(person_value, str):
+            if person_value not in self.persons:
+                raise _bad_request(f"person: Object with given uuid doesn't exist [person: {person_value!r}]")
+        else:
+            self._validate_person(person_value)
+
+        self._require(user, "Add Users")
+
+        if username in self.users_by_username:
+            raise StandInError(409, f"Username {username} is already in use",
+                               "org.openmrs.api.DuplicateUsernameException")
+
+        password = data.get("password")
+        if not isinstance(password, str) or len(password) < 8:
+            raise _bad_request("Password must be at least 8 characters", "org.openmrs.api.PasswordException")
+
+        person_uuid = person_value if isinstance(person_value, str) else self._store_person(person_value)["uuid"]
+        return self._store_user(username, password, person_uuid, roles, system_id=data.get("systemId"))
+
+    def _update_user(self, obj: Dict, data: Dict, user: Optional[Dict]) -> None:
+        self._require(user, "Edit Users")
+        if "retired" in data:
+            obj["retired"] = bool(data["retired"])
+
+    def _delete_user(self, obj: Dict, params: Dict[str, str], user: Optional[Dict]) -> None:
+        if params.get("purge") == "true":
+            self._require(user, "Purge Users")
+            del self.users[obj["uuid"]]
+            self.users_by_username.pop(obj["username"], None)
+        else:
+            self._require(user, "Edit Users")
+            obj["retired"] = True
+
+    def _search_users(self, q: str, include_all: bool) -> List[Dict]:
+        needle = q.lower()
+        return [u for u in self.users.values()
+                if (include_all or not u["retired"])
+                and (needle in u["username"].lower() or needle in self._person_display(self.persons[u["person"]]).lower())]
+
+    def _create_role(self, data: Dict, user: Optional[Dict]) -> Dict:
+        name = data.get("name")
+        if not isinstance(name, str) or not name:
+            raise _bad_request("Role name is required", "org.openmrs.api.ValidationException")
+        self._require(user, "Manage Roles")
+        if self._lookup_role(name):
+            raise _bad_request(f"Role {name} already exists", "org.openmrs.api.ValidationException")
+
+        privileges = []
+        for p in data.get("privileges") or []:
+            p_name = p.get("name") if isinstance(p, dict) else p
+            if p_name not in self.privileges:
+                raise _bad_request(f"privileges: Object with given uuid doesn't exist [privilege: {p!r}]")
+            privileges.append(p_name)
+
+        role = {"uuid": _new_uuid(), "name": name, "description": data.get("description"),
+                "privileges": privileges, "retired": False, "created": _now()}
+        self.roles[role["uuid"]] = role
+        return role
+
+    def _retire_metadata(self, table: Dict[str, Dict], obj: Dict, params: Dict[str, str],
+                         user: Optional[Dict], privilege: str) -> None:
+        self._require(user, privilege)
+        if params.get("purge") == "true":
+            del table[obj["uuid"]]
+        else:
+            obj["retired"] = True
+            obj["retireReason"] = params.get("reason")
+
+
+# -----------------------------
+# requests adapter
+# -----------------------------
+
+class StandInAdapter(BaseAdapter):
+    """
+    Транспортный адаптер requests: запрос обрабатывается стендом в текущем потоке,
+    без сокетов.
+    """
+
+    def __init__(self, standin: OpenMRSStandIn) -> None:
+        super().__init__()
+        self.standin = standin
+        self._rest_path = urlsplit(standin.base_url).path
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        started = datetime.now()
+        parts = urlsplit(request.url)
+        path = parts.path[len(self._rest_path):] if parts.path.startswith(self._rest_path) else parts.path
+
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        status, result = self.standin.handle(
+            request.method, path, parse_qs(parts.query, keep_blank_values=True),
+            body, request.headers.get("Authorization"),
+        )
+        content = json.dumps(result).encode("utf-8") if result is not None else b""
+        return transport.build_response(request, status, content, datetime.now() - started)
+
+    def close(self) -> None:
+        pass
+
+
+# -----------------------------
+# http server
+# -----------------------------
+
+def _make_http_handler(standin: OpenMRSStandIn):
+    class Handler(BaseHTTPRequestHandler):
+        def _dispatch(self) -> None:
+            parts = urlsplit(self.path)
+            if not parts.path.startswith(REST_PREFIX):
+                self.send_error(404)
+                return
+
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else None
+            status, result = standin.handle(
+                self.command, parts.path[len(REST_PREFIX):], parse_qs(parts.query, keep_blank_values=True),
+                body, self.headers.get("Authorization"),
+            )
+
+            content = json.dumps(result).encode("utf-8") if result is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    import time
+
+    server = OpenMRSStandIn().serve(port=8080)
+    print("OpenMRS stand-in: http://127.0.0.1:8080/openmrs/ws/rest/v1 (Ctrl+C для остановки)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,287 @@
+"""
+patient_import.py
+
+Массовый импорт пациентов (демография + идентификатор) из CSV или JSONL
+на тестовые и staging-стенды OpenMRS.
+
+    report = import_patients("patients.csv", ImportDefaults(id_type_uuid, location_uuid),
+                             error_path="patients.errors.jsonl")
+    print(report.summary())
+
+Файл читается потоково: строка -> проверка -> PatientPayload -> POST /patient.
+Запросы идут параллельно через run_bounded: в работе не больше
+2 * concurrency пациентов, следующая строка читается только когда
+освободилось место — память не растёт с размером файла, а медленный
+сервер тормозит чтение, а не копит очередь.
+
+Колонки (CSV-заголовок или ключи JSONL-объекта):
+    given_name, middle_name, family_name, gender (M/F/O/U), birthdate (YYYY-MM-DD),
+    identifier, identifier_type, location, address1, city_village, country
+identifier_type и location — uuid; пустые берутся из ImportDefaults.
+
+Отклонённые строки (проверка на клиенте) и ошибки сервера пишутся в
+error_path (JSONL): исходная строка + _line, _stage (rejected/server),
+_code, _error. Исправленный файл ошибок можно подать на вход как JSONL.
+Созданные пациенты фиксируются в журнале (Journal из src/user_bulk.py),
+повторный запуск пропускает уже созданные identifier.
+"""
+
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple, Union
+
+from src.concurrency import run_bounded, thread_client
+from src.openmrs_patient import Address, Identifier, OpenMRSError, PatientPayload, Person, PersonName
+from src.user_bulk import Journal
+
+
+GENDERS = {"M", "F", "O", "U"}
+MAX_NAME_LENGTH = 50
+MAX_IDENTIFIER_LENGTH = 50
+
+# пациента после создания не перечитываем — достаточно uuid
+CREATED_REPRESENTATION = "custom:(uuid)"
+
+
+class RowRejected(ValueError):
+    pass
+
+
+@dataclass
+class ImportDefaults:
+    identifier_type: str
+    location: str
+
+
+# -----------------------------
+# reading
+# -----------------------------
+
+Row = Union[Dict[str, object], str]
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, Row]]:
+    """
+    (номер строки, строка) по одной, формат — по расширению (.csv, иначе JSONL).
+    Нечитаемая строка JSONL отдаётся как есть (str) и отклоняется в row_to_payload.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, line
+
+
+def _text(row: Dict, key: str, required: bool = False, max_length: int = MAX_NAME_LENGTH) -> str:
+    value = row.get(key)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise RowRejected(f"{key} is required")
+    if len(value) > max_length:
+        raise RowRejected(f"{key} exceeds the maximum length of {max_length}")
+    return value
+
+
+def row_to_payload(row: Row, defaults: ImportDefaults) -> PatientPayload:
+    """
+    Строка файла -> PatientPayload. RowRejected, если строку отправлять нельзя.
+    Формат identifier (Luhn и т.п.) не проверяется — это ответ сервера.
+    """
+    if not isinstance(row, dict):
+        raise RowRejected("not a JSON object")
+
+    gender = _text(row, "gender", required=True).upper()
+    if gender not in GENDERS:
+        raise RowRejected(f"gender must be one of {'/'.join(sorted(GENDERS))}: {gender!r}")
+
+    birthdate = _text(row, "birthdate", required=True)
+    try:
+        born = date.fromisoformat(birthdate)
+    except ValueError:
+        raise RowRejected(f"birthdate is not YYYY-MM-DD: {birthdate!r}") from None
+    if born > date.today():
+        raise RowRejected(f"birthdate is in the future: {birthdate}")
+
+    name = PersonName(
+        givenName=_text(row, "given_name", required=True),
+        familyName=_text(row, "family_name", required=True),
+        middleName=_text(row, "middle_name") or None,
+    )
+
+    address = Address(
+        address1=_text(row, "address1", max_length=255),
+        cityVillage=_text(row, "city_village", max_length=255),
+        country=_text(row, "country", max_length=255),
+    )
+
+    identifier = Identifier(
+        identifier=_text(row, "identifier", required=True, max_length=MAX_IDENTIFIER_LENGTH),
+        identifierType=_text(row, "identifier_type") or defaults.identifier_type,
+        location=_text(row, "location") or defaults.location,
+    )
+
+    return PatientPayload(
+        person=Person(
+            names=[name],
+            gender=gender,
+            birthdate=birthdate,
+            addresses=[address] if any((address.address1, address.cityVillage, address.country)) else [],
+        ),
+        identifiers=[identifier],
+    )
+
+
+# -----------------------------
+# errors
+# -----------------------------
+
+class ErrorFile:
+    """
+    JSONL с отклонёнными строками. Пишется из одного потока; открывается при первой ошибке.
+    """
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self._file = None
+
+    def write(self, line: int, row: Row, stage: str, error: str, code: Optional[int] = None) -> None:
+        if not self.path:
+            return
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        entry = dict(row) if isinstance(row, dict) else {"_raw": row}
+        entry.update({"_line": line, "_stage": stage, "_code": code, "_error": error[:500]})
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# -----------------------------
+# import
+# -----------------------------
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    created: int = 0
+    rejected: int = 0
+    failed: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """
+        Созданных пациентов в секунду.
+        """
+        return self.created / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"read: {self.read}, created: {self.created}, rejected: {self.rejected}, "
+                f"failed: {self.failed}, skipped: {self.skipped} — "
+                f"{self.elapsed:.1f} s, {self.throughput:.1f} patients/s")
+
+
+@dataclass
+class _Pending:
+    line: int
+    row: Row
+    payload: PatientPayload
+
+    @property
+    def key(self) -> str:
+        return self.payload.identifiers[0].identifier
+
+
+def _submit(item: _Pending) -> Dict:
+    # без PATIENT_INDEX: десятки тысяч payload'ов в памяти импорту не нужны
+    client = thread_client()
+    try:
+        created = client.create_patient(item.payload, params={"v": CREATED_REPRESENTATION}, index=False)
+    except OpenMRSError as e:
+        return {"key": item.key, "status": "failed", "code": e.status_code, "error": e.body[:500]}
+    return {"key": item.key, "status": "created", "uuid": created.get("uuid")}
+
+
+def import_patients(
+    path: str,
+    defaults: ImportDefaults,
+    error_path: Optional[str] = None,
+    journal_path: Optional[str] = None,
+    concurrency: int = 8,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    progress_every: int = 1000,
+) -> ImportReport:
+    """
+    Импортирует пациентов из path. Повтор identifier внутри файла отклоняется,
+    identifier, созданные в прошлых запусках (journal_path), пропускаются.
+    progress(report) вызывается каждые progress_every прочитанных строк.
+    """
+    report = ImportReport()
+    errors = ErrorFile(error_path)
+    journal = Journal(journal_path)
+    done = journal.completed()
+    seen: Set[str] = set()
+
+    # генератор выполняется в потоке run_bounded, который отдаёт результаты, —
+    # ошибки и журнал пишутся из одного потока
+    def pending() -> Iterator[_Pending]:
+        for line, row in read_rows(path):
+            report.read += 1
+            if progress is not None and report.read % progress_every == 0:
+                progress(report)
+
+            try:
+                item = _Pending(line, row, row_to_payload(row, defaults))
+                if item.key in seen:
+                    raise RowRejected(f"duplicate identifier in file: {item.key}")
+            except RowRejected as e:
+                report.rejected += 1
+                errors.write(line, row, "rejected", str(e))
+                continue
+
+            seen.add(item.key)
+            if item.key in done:
+                report.skipped += 1
+                continue
+            yield item
+
+    try:
+        for item, result in run_bounded(pending(), _submit, concurrency):
+            if isinstance(result, Exception):
+                result = {"key": item.key, "status": "failed", "error": str(result)[:500]}
+            journal.record({**result, "line": item.line})
+
+            if result["status"] == "created":
+                report.created += 1
+            else:
+                report.failed += 1
+                errors.write(item.line, item.row, "server", result["error"], result.get("code"))
+    finally:
+        journal.close()
+        errors.close()
+        report.finished = time.perf_counter()
+
+    return report
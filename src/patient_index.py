@@ -0,0 +1,117 @@
+"""
+patient_index.py
+
+Локальный индекс созданных пациентов: identifier -> (uuid, payload, ответ сервера).
+
+GET /patient?q=... идёт через Lucene-поиск OpenMRS и очень медленный,
+а сразу после создания пациента клиент и так знает его identifier и uuid.
+Поиск на сервере остаётся для случаев, когда он действительно нужен
+(find_patient_by_identifier(..., search_server=True) — тесты самого поиска),
+плюс есть массовая сверка индекса с сервером (verify).
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+# сколько identifier держит индекс; старые вытесняются (LRU) — процесс,
+# создающий пациентов часами (нагрузка, длинный прогон), память не копит
+DEFAULT_MAX_SIZE = 10000
+
+
+@dataclass
+class IndexedPatient:
+    identifier: str
+    uuid: str
+    payload: Optional[Dict]
+    response: Dict
+
+
+class PatientIndex:
+    """
+    Потокобезопасный индекс identifier -> IndexedPatient, не больше
+    max_size записей: вытесняется давно не использованный identifier.
+    Вытесненный пациент просто ищется на сервере.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._by_identifier: "OrderedDict[str, IndexedPatient]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._by_identifier)
+
+    def add(self, response: Dict, payload: Optional[Dict] = None) -> None:
+        """
+        Индексирует пациента по всем identifier из payload (или из ответа).
+        """
+        identifiers = (payload or response).get("identifiers") or []
+
+        with self._lock:
+            for item in identifiers:
+                value = _identifier_value(item)
+                if value:
+                    self._by_identifier[value] = IndexedPatient(
+                        identifier=value,
+                        uuid=response["uuid"],
+                        payload=payload,
+                        response=response,
+                    )
+                    self._by_identifier.move_to_end(value)
+            while len(self._by_identifier) > self.max_size:
+                self._by_identifier.popitem(last=False)
+
+    def get(self, identifier: str) -> Optional[IndexedPatient]:
+        with self._lock:
+            entry = self._by_identifier.get(identifier)
+            if entry is not None:
+                self._by_identifier.move_to_end(identifier)
+            return entry
+
+    def discard(self, identifier: str) -> None:
+        with self._lock:
+            self._by_identifier.pop(identifier, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_identifier.clear()
+
+    def verify(self, concurrency: int = 8) -> List[Dict]:
+        """
+        Сверяет весь индекс с сервером (GET /patient?q=identifier параллельно).
+        Возвращает расхождения: [{"identifier", "expected_uuid", "found_uuid" | "error"}].
+        """
+        # импорт здесь: concurrency -> openmrs_patient -> patient_index
+        from src.concurrency import run_bounded, thread_client
+
+        with self._lock:
+            entries = list(self._by_identifier.values())
+
+        def check(entry: IndexedPatient) -> Optional[str]:
+            data = thread_client().get_json("/patient", params={"q": entry.identifier, "v": "default"})
+            results = data.get("results", []) or []
+            return results[0]["uuid"] if results else None
+
+        mismatches = []
+        for entry, found in run_bounded(entries, check, concurrency):
+            if isinstance(found, Exception):
+                mismatches.append({"identifier": entry.identifier, "expected_uuid": entry.uuid, "error": str(found)})
+            elif found != entry.uuid:
+                mismatches.append({"identifier": entry.identifier, "expected_uuid": entry.uuid, "found_uuid": found})
+        return mismatches
+
+
+def _identifier_value(item) -> Optional[str]:
+    if isinstance(item, dict):
+        value = item.get("identifier")
+        if value is None and isinstance(item.get("display"), str):
+            # в ответе сервера: "OpenMRS ID = 10001YY"
+            value = item["display"].split("=")[-1].strip()
+        return value if isinstance(value, str) else None
+    return None
+
+
+PATIENT_INDEX = PatientIndex()
@@ -0,0 +1,160 @@
+"""
+payload_mutation.py
+
+Варианты одного валидного payload для матриц невалидных входных данных.
+
+Вариант — не глубокая копия: копируются только словари и списки на пути
+к изменяемому полю, остальное дерево общее с базой (structural sharing).
+Мутации описываются заранее и ничего не стоят при сборе тестов; payload
+собирается в самом тесте из базы, которая строится один раз на модуль.
+
+    @pytest.fixture(scope="module")
+    def base_payload():
+        return build_valid_patient_payload_dict()   # метаданные — один раз
+
+    @pytest.mark.parametrize("mutation", cases(
+        *invalid_values("person.gender"),
+        oversize("person.names.0.givenName", 51),
+    ))
+    def test_invalid(base_payload, mutation):
+        post_patient(mutation.apply(base_payload))
+
+Путь — через точку, индексы списков числами: "identifiers.0.location".
+База и варианты делят вложенные объекты: менять payload после apply
+нельзя — это изменит базу для следующих тестов. Несколько мутаций
+сразу — chain(...).
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+
+import pytest
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+Key = Union[str, int]
+
+WRONG_TYPE_VALUES = (123, 1.5, True, "", {}, [])
+
+
+@dataclass(frozen=True)
+class Mutation:
+    path: str
+    value: object = MISSING  # MISSING — убрать поле
+    label: str = ""
+
+    @property
+    def id(self) -> str:
+        return self.label or f"{self.path}={'<removed>' if self.value is MISSING else repr(self.value)}"
+
+    def apply(self, base: object) -> object:
+        return _assoc(base, _split(self.path), self.value)
+
+
+@dataclass(frozen=True)
+class Chain:
+    mutations: Tuple[Mutation, ...] = field(default_factory=tuple)
+
+    @property
+    def id(self) -> str:
+        return "+".join(m.id for m in self.mutations)
+
+    def apply(self, base: object) -> object:
+        for m in self.mutations:
+            base = m.apply(base)
+        return base
+
+
+def chain(*mutations: Mutation) -> Chain:
+    return Chain(tuple(mutations))
+
+
+def _split(path: str) -> List[Key]:
+    return [int(p) if p.lstrip("-").isdigit() else p for p in path.split(".")]
+
+
+def _assoc(node: object, keys: Sequence[Key], value: object) -> object:
+    """
+    Копия node, где по пути keys стоит value (MISSING — удалить).
+    Копируется только путь; промежуточных узлов нет — KeyError / IndexError.
+    """
+    key, rest = keys[0], keys[1:]
+    if isinstance(node, dict):
+        copy = dict(node)
+        if rest:
+            copy[key] = _assoc(node[key], rest, value)
+        elif value is MISSING:
+            copy.pop(key, None)
+        else:
+            copy[key] = value
+        return copy
+    if isinstance(node, list):
+        copy = list(node)
+        if rest:
+            copy[key] = _assoc(node[key], rest, value)
+        elif value is MISSING:
+            del copy[key]
+        else:
+            copy[key] = value
+        return copy
+    raise TypeError(f"Cannot set {key!r} inside {type(node).__name__}")
+
+
+# -----------------------------
+# generators
+# -----------------------------
+
+def remove(path: str) -> Mutation:
+    return Mutation(path, MISSING, f"{path}:removed")
+
+
+def set_value(path: str, value: object, label: str = "") -> Mutation:
+    return Mutation(path, value, label)
+
+
+def null(path: str) -> Mutation:
+    return Mutation(path, None, f"{path}:null")
+
+
+def wrong_types(path: str, keep: Iterable[type] = (str,)) -> Iterator[Mutation]:
+    """
+    Значения других типов; keep — типы поля, которые не считаются «неверными».
+    """
+    keep = tuple(keep)
+    for value in WRONG_TYPE_VALUES:
+        # True — тоже int: bool проверяем отдельно
+        if type(value) in keep or (isinstance(value, bool) and bool in keep):
+            continue
+        yield Mutation(path, value, f"{path}:{type(value).__name__}")
+
+
+def oversize(path: str, length: int, char: str = "x") -> Mutation:
+    return Mutation(path, char * length, f"{path}:len{length}")
+
+
+def bad_formats(path: str, values: Iterable[str]) -> Iterator[Mutation]:
+    for value in values:
+        yield Mutation(path, value, f"{path}:{value!r}")
+
+
+def invalid_values(path: str, keep: Iterable[type] = (str,)) -> Iterator[Mutation]:
+    """
+    Обязательное поле: нет поля, null, неверный тип.
+    """
+    yield remove(path)
+    yield null(path)
+    yield from wrong_types(path, keep)
+
+
+def cases(*mutations: Union[Mutation, Chain]) -> List:
+    """
+    pytest.param на мутацию, id — из пути и значения:
+    @pytest.mark.parametrize("mutation", cases(...)).
+    """
+    return [pytest.param(m, id=m.id) for m in mutations]
@@ -0,0 +1,171 @@
+"""
+pytest_http.py
+
+pytest-плагин: учёт HTTP-вызовов по тестам и фикстурам.
+
+- считает вызовы каждого теста (setup + call) и каждой фикстуры;
+- помечает одинаковые GET (тот же URL с query и тот же пользователь)
+  внутри одного теста — типичный N+1 / повторная загрузка метаданных;
+- @pytest.mark.http_budget(n) — тест падает, если сделал больше n вызовов;
+- --http-calls печатает сводку в конце прогона,
+  --http-fail-on-duplicates превращает повторные GET в падение теста.
+
+События приходят из src/instrumentation.py: трекер — обычный sink,
+который conftest добавляет в Instrumentation.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from src.instrumentation import RequestEvent, Sink
+
+
+PLUGIN_NAME = "http_calls"
+
+
+class CallTally:
+    def __init__(self) -> None:
+        self.count = 0
+        self.by_phase: Counter = Counter()
+        self.gets: Counter = Counter()  # (url, user) -> сколько раз
+
+    def duplicates(self) -> List[Tuple[str, Optional[str], int]]:
+        return sorted((url, user, n) for (url, user), n in self.gets.items() if n > 1)
+
+
+class HttpCallTracker(Sink):
+    """
+    Sink + хуки pytest. Текущий тест/фикстура хранятся не в thread-local:
+    вызовы из рабочих потоков (run_bounded и т.п.) тоже засчитываются тесту.
+    """
+
+    def __init__(self, config) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self.tests: Dict[str, CallTally] = {}
+        self.fixtures: Counter = Counter()       # имя фикстуры -> вызовов
+        self.fixture_setups: Counter = Counter()  # имя фикстуры -> сколько раз поднималась
+        self._test: Optional[str] = None
+        self._phase: Optional[str] = None
+        self._fixtures: List[str] = []
+
+    # -----------------------------
+    # sink
+    # -----------------------------
+
+    def emit(self, event: RequestEvent) -> None:
+        with self._lock:
+            if self._fixtures:
+                self.fixtures[self._fixtures[-1]] += 1
+            if self._test is None:
+                return
+
+            calls = self.tests.setdefault(self._test, CallTally())
+            calls.count += 1
+            calls.by_phase[self._fixtures[-1] if self._fixtures else self._phase] += 1
+            if event.method == "GET":
+                calls.gets[(event.url, event.user)] += 1
+
+    # -----------------------------
+    # hooks
+    # -----------------------------
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_setup(self, item):
+        self._enter(item.nodeid, "setup")
+        return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item):
+        self._enter(item.nodeid, "call")
+        return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        self._enter(item.nodeid, "teardown")
+        try:
+            return (yield)
+        finally:
+            self._enter(None, None)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        with self._lock:
+            self._fixtures.append(fixturedef.argname)
+            self.fixture_setups[fixturedef.argname] += 1
+        try:
+            return (yield)
+        finally:
+            with self._lock:
+                self._fixtures.pop()
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        report = yield
+        if call.when != "call" or not report.passed:
+            return report
+
+        calls = self.tests.get(item.nodeid) or CallTally()
+        problems = []
+
+        marker = item.get_closest_marker("http_budget")
+        if marker is not None:
+            budget = marker.args[0] if marker.args else marker.kwargs["n"]
+            if calls.count > budget:
+                problems.append(f"HTTP budget exceeded: {calls.count} calls > {budget} "
+                                f"({_format_phases(calls)})")
+
+        duplicates = calls.duplicates()
+        if duplicates:
+            text = "\n".join(f"  {n}x GET {url} (user={user})" for url, user, n in duplicates)
+            report.sections.append(("repeated GET requests", text))
+            if self.config.getoption("--http-fail-on-duplicates"):
+                problems.append(f"Repeated identical GET requests:\n{text}")
+
+        if problems:
+            report.outcome = "failed"
+            report.longrepr = "\n".join(problems)
+        return report
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.config.getoption("--http-calls") or not self.tests:
+            return
+
+        tr = terminalreporter
+        tr.section("HTTP calls")
+        top = sorted(self.tests.items(), key=lambda item: -item[1].count)[:20]
+        for nodeid, calls in top:
+            dup = sum(n - 1 for _, _, n in calls.duplicates())
+            tr.write_line(f"{calls.count:5d}  {nodeid}" + (f"  (repeated GET: {dup})" if dup else ""))
+
+        tr.write_line("")
+        tr.write_line("fixtures (calls / setups):")
+        for name, n in self.fixtures.most_common(20):
+            tr.write_line(f"{n:5d} / {self.fixture_setups[name]:<4d} {name}")
+
+        total = sum(c.count for c in self.tests.values())
+        tr.write_line(f"\nИтого: {total} вызовов в {len(self.tests)} тестах")
+
+    def _enter(self, nodeid: Optional[str], phase: Optional[str]) -> None:
+        with self._lock:
+            self._test, self._phase = nodeid, phase
+
+
+def _format_phases(calls: CallTally) -> str:
+    return ", ".join(f"{name}: {n}" for name, n in calls.by_phase.most_common())
+
+
+def addoption(parser) -> None:
+    parser.addoption("--http-calls", action="store_true", help="сводка HTTP-вызовов по тестам и фикстурам")
+    parser.addoption("--http-fail-on-duplicates", action="store_true",
+                     help="повторный одинаковый GET внутри теста — падение теста")
+
+
+def configure(config) -> HttpCallTracker:
+    config.addinivalue_line("markers", "http_budget(n): тест падает, если сделал больше n HTTP-вызовов")
+    tracker = HttpCallTracker(config)
+    config.pluginmanager.register(tracker, PLUGIN_NAME)
+    return tracker
@@ -0,0 +1,332 @@
+"""
+pytest_timeline.py
+
+pytest-плагин: временная шкала каждого теста — фазы setup / call / teardown,
+подъём фикстур и HTTP-вызовы — с критическим путём по вызовам.
+
+    pytest --http-timeline=timeline.json   # + timeline.html рядом (диаграмма Ганта)
+
+Зависимость между вызовами выводится из данных: вызов B зависит от A,
+если uuid из ответа A встречается в URL или теле B (POST /patient после
+POST /person), либо если A — изменяющий запрос (POST/DELETE...) к тому же
+ресурсу (GET /patient?q=... после POST /patient). Поиск по имени,
+созданному локально, и прочие неявные связи эвристика не видит.
+
+По графу считается критический путь — самая длинная цепочка зависимых
+вызовов. Вызов помечается parallel, если он не зависит от предыдущего
+(например, GET /location, GET /patientidentifiertype и POST /person
+в patient_context): такие вызовы можно запускать одновременно.
+"""
+
+import html
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Set
+
+import pytest
+
+from src.instrumentation import RequestEvent, Sink
+
+
+PLUGIN_NAME = "http_timeline"
+
+_UUID_RE = re.compile(rb"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # phase | fixture
+    start_ms: float
+    end_ms: float = 0.0
+
+
+@dataclass
+class CallSpan:
+    id: int
+    key: str
+    status: int
+    start_ms: float
+    duration_ms: float
+    owner: str  # фикстура или фаза, в которой сделан вызов
+    deps: List[int] = field(default_factory=list)
+    critical: bool = False
+    parallel: bool = False
+
+
+class Timeline:
+    def __init__(self, nodeid: str, started: float) -> None:
+        self.nodeid = nodeid
+        self.started = started
+        self.duration_ms = 0.0
+        self.spans: List[Span] = []
+        self.calls: List[CallSpan] = []
+        self.critical_path_ms = 0.0
+        # для вывода зависимостей: uuid -> id вызова, который его вернул
+        self._produced: Dict[bytes, int] = {}
+        self._writes: Dict[str, int] = {}  # ресурс -> последний изменяющий вызов
+
+    def offset_ms(self, at: float) -> float:
+        return (at - self.started) * 1000
+
+    def add_call(self, event: RequestEvent, owner: str, request_body, response_body: Optional[bytes]) -> None:
+        call = CallSpan(
+            id=len(self.calls),
+            key=event.key,
+            status=event.status,
+            start_ms=self.offset_ms(event.timestamp),
+            duration_ms=event.total_ms,
+            owner=owner,
+        )
+
+        if isinstance(request_body, str):
+            request_body = request_body.encode("utf-8")
+        used: Set[bytes] = set(_UUID_RE.findall(event.url.encode("utf-8")))
+        used.update(_UUID_RE.findall(request_body or b""))
+        deps = {self._produced[u] for u in used if u in self._produced}
+
+        resource = _resource(event.endpoint)
+        if resource in self._writes:
+            deps.add(self._writes[resource])
+        call.deps = sorted(deps)
+
+        if event.status < 400:
+            for u in _UUID_RE.findall(response_body or b""):
+                self._produced.setdefault(u, call.id)
+            if event.method != "GET":
+                self._writes[resource] = call.id
+
+        self.calls.append(call)
+
+    def finish(self, at: float) -> None:
+        self.duration_ms = self.offset_ms(at)
+        self._produced.clear()
+        self._writes.clear()
+
+        # самая длинная цепочка: end[i] = duration[i] + max(end[dep])
+        end: List[float] = []
+        via: List[Optional[int]] = []
+        for call in self.calls:
+            prev = max(call.deps, key=lambda d: end[d], default=None)
+            end.append(call.duration_ms + (end[prev] if prev is not None else 0.0))
+            via.append(prev)
+            call.parallel = call.id > 0 and not _reaches(self.calls, call.id, call.id - 1)
+
+        if not end:
+            return
+        self.critical_path_ms = max(end)
+        i: Optional[int] = end.index(self.critical_path_ms)
+        while i is not None:
+            self.calls[i].critical = True
+            i = via[i]
+
+    @property
+    def http_ms(self) -> float:
+        return sum(c.duration_ms for c in self.calls)
+
+    def to_dict(self) -> Dict:
+        return {
+            "nodeid": self.nodeid,
+            "started": self.started,
+            "duration_ms": round(self.duration_ms, 3),
+            "http_ms": round(self.http_ms, 3),
+            "critical_path_ms": round(self.critical_path_ms, 3),
+            "spans": [asdict(s) for s in self.spans],
+            "calls": [asdict(c) for c in self.calls],
+        }
+
+
+def _resource(endpoint: str) -> str:
+    # "/patient/{uuid}/identifier" -> "/patient"
+    return "/" + endpoint.lstrip("/").split("/", 1)[0]
+
+
+def _reaches(calls: List[CallSpan], start: int, target: int) -> bool:
+    """
+    Есть ли target среди (транзитивных) зависимостей вызова start.
+    """
+    stack = list(calls[start].deps)
+    seen: Set[int] = set()
+    while stack:
+        i = stack.pop()
+        if i == target:
+            return True
+        if i > target and i not in seen:
+            seen.add(i)
+            stack.extend(calls[i].deps)
+    return False
+
+
+class TimelineRecorder(Sink):
+    """
+    Sink + хуки pytest. Как и HttpCallTracker, текущий тест и стек фикстур —
+    общие для всех потоков.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.timelines: List[Timeline] = []
+        self._current: Optional[Timeline] = None
+        self._phase: Optional[Span] = None
+        self._fixtures: List[Span] = []
+
+    # -----------------------------
+    # sink
+    # -----------------------------
+
+    def emit(self, event: RequestEvent) -> None:
+        self.emit_exchange(event, None, None)
+
+    def emit_exchange(self, event: RequestEvent, request_body, response_body: Optional[bytes]) -> None:
+        with self._lock:
+            timeline = self._current
+            if timeline is None:
+                return
+            owner = self._fixtures[-1].name if self._fixtures else (self._phase.name if self._phase else "")
+            timeline.add_call(event, owner, request_body, response_body)
+
+    # -----------------------------
+    # hooks
+    # -----------------------------
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_setup(self, item):
+        with self._lock:
+            self._current = Timeline(item.nodeid, time.time())
+        with self._span("setup"):
+            return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item):
+        with self._span("call"):
+            return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        try:
+            with self._span("teardown"):
+                return (yield)
+        finally:
+            with self._lock:
+                timeline, self._current = self._current, None
+            if timeline is not None:
+                timeline.finish(time.time())
+                self.timelines.append(timeline)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        with self._lock:
+            span = None
+            if self._current is not None:
+                span = Span(fixturedef.argname, "fixture", self._current.offset_ms(time.time()))
+                self._current.spans.append(span)
+                self._fixtures.append(span)
+        try:
+            return (yield)
+        finally:
+            if span is not None:
+                with self._lock:
+                    span.end_ms = self._current.offset_ms(time.time())
+                    self._fixtures.remove(span)
+
+    def pytest_sessionfinish(self, session):
+        if not self.timelines:
+            return
+        data = [t.to_dict() for t in self.timelines]
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        with open(os.path.splitext(self.path)[0] + ".html", "w", encoding="utf-8") as f:
+            f.write(render_html(data))
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        with self._lock:
+            if self._current is not None:
+                self._phase = Span(name, "phase", self._current.offset_ms(time.time()))
+                self._current.spans.append(self._phase)
+        try:
+            yield
+        finally:
+            with self._lock:
+                if self._current is not None and self._phase is not None:
+                    self._phase.end_ms = self._current.offset_ms(time.time())
+                self._phase = None
+
+
+# -----------------------------
+# html
+# -----------------------------
+
+_STYLE = """
+body { font: 13px sans-serif; margin: 16px; }
+h2 { font-size: 14px; margin: 24px 0 4px; }
+.meta { color: #555; margin-bottom: 4px; }
+.row { position: relative; height: 18px; border-bottom: 1px solid #eee; }
+.label { position: absolute; left: 0; width: 300px; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }
+.track { position: absolute; left: 310px; right: 0; top: 2px; bottom: 2px; }
+.bar { position: absolute; top: 0; bottom: 0; min-width: 2px; }
+.phase { background: #d8e4f0; } .fixture { background: #b8c8a0; }
+.call { background: #a0a0a0; } .parallel { background: #f0a040; } .critical { background: #d04040; }
+"""
+
+
+def render_html(timelines: List[Dict]) -> str:
+    """
+    Статическая страница без JS: строка на фазу, фикстуру и вызов,
+    ширина полосы — доля от длительности теста.
+    """
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>HTTP timeline</title>",
+        f"<style>{_STYLE}</style></head><body>",
+        "<p><span class='bar critical' style='position:static;display:inline-block;width:12px'>&nbsp;</span> "
+        "критический путь &nbsp; <span class='bar parallel' style='position:static;display:inline-block;"
+        "width:12px'>&nbsp;</span> не зависит от предыдущего вызова</p>",
+    ]
+
+    for t in sorted(timelines, key=lambda t: -t["http_ms"]):
+        scale = max(t["duration_ms"], 1e-3)
+        parts.append(f"<h2>{html.escape(t['nodeid'])}</h2>")
+        parts.append(f"<div class='meta'>тест {t['duration_ms']:.0f} мс, HTTP {t['http_ms']:.0f} мс, "
+                     f"критический путь {t['critical_path_ms']:.0f} мс</div>")
+
+        for span in t["spans"]:
+            parts.append(_row(f"{span['kind']}: {span['name']}", span["kind"],
+                              span["start_ms"], span["end_ms"] - span["start_ms"], scale))
+        for call in t["calls"]:
+            css = "critical" if call["critical"] else "parallel" if call["parallel"] else "call"
+            deps = ", ".join(f"#{d}" for d in call["deps"]) or "—"
+            parts.append(_row(f"#{call['id']} {call['key']} {call['status']}", f"call {css}",
+                              call["start_ms"], call["duration_ms"], scale,
+                              f"{call['owner']}; зависит от: {deps}"))
+
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _row(label: str, css: str, start_ms: float, duration_ms: float, scale: float, title: str = "") -> str:
+    left = max(0.0, start_ms / scale * 100)
+    width = max(0.0, min(100 - left, duration_ms / scale * 100))
+    tip = html.escape(f"{label} — {duration_ms:.1f} мс" + (f" ({title})" if title else ""), quote=True)
+    return (f"<div class='row' title=\"{tip}\"><div class='label'>{html.escape(label)}</div>"
+            f"<div class='track'><div class='bar {css}' style='left:{left:.2f}%;width:{width:.2f}%'>"
+            f"</div></div></div>")
+
+
+def addoption(parser) -> None:
+    parser.addoption("--http-timeline", default=None,
+                     help="JSON с временной шкалой тестов (HTTP-вызовы, фикстуры) + HTML рядом")
+
+
+def configure(config) -> Optional[TimelineRecorder]:
+    path = config.getoption("--http-timeline")
+    if not path:
+        return None
+    recorder = TimelineRecorder(path)
+    config.pluginmanager.register(recorder, PLUGIN_NAME)
+    return recorder
@@ -0,0 +1,154 @@
+"""
+readonly_context.py
+
+Общие (на модуль / сессию) данные только для чтения — для матриц
+негативных проверок: отклонённый запрос ничего не меняет, и создавать
+пациента на каждое плохое значение незачем.
+
+    @pytest.fixture(scope="module")          # или scope="session"
+    def shared_patient(request):
+        return ReadOnlyContext(build_patient_context, guard=readonly_context.guard(request.config),
+                               watch=("patient_uuid",))
+
+    @pytest.fixture()
+    def shared_patient_context(request, shared_patient):
+        with shared_patient.use(request.node) as context:
+            yield context
+
+Защита от изменения:
+  - тест получает MappingProxyType (вложенные списки — tuple): запись
+    в словарь падает сразу, TypeError;
+  - MutationGuard — sink src/instrumentation.py: успешный (< 400) не-GET
+    вызов во время теста, в URL или теле которого есть uuid из watch,
+    помечает контекст изменённым. Например, «негативный» POST /visit,
+    который сервер принял: у пациента появился активный визит, и
+    следующий тест получил бы 400 из-за пересечения визитов, а не из-за
+    проверяемого поля.
+Изменённый контекст выбрасывается (тесту — SharedContextMutated),
+следующий тест получает свежий: build вызывается заново.
+"""
+
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+import pytest
+
+from src.instrumentation import RequestEvent, Sink
+
+
+PLUGIN_NAME = "readonly_context_guard"
+
+
+class SharedContextMutated(pytest.PytestWarning):
+    pass
+
+
+class MutationGuard(Sink):
+    """
+    uuid -> контекст, который сейчас в работе у теста.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._watched: Dict[str, "ReadOnlyContext"] = {}
+
+    def watch(self, uuids: Iterable[str], context: "ReadOnlyContext") -> None:
+        with self._lock:
+            for u in uuids:
+                self._watched[u] = context
+
+    def unwatch(self, uuids: Iterable[str]) -> None:
+        with self._lock:
+            for u in uuids:
+                self._watched.pop(u, None)
+
+    def emit(self, event: RequestEvent) -> None:
+        pass
+
+    def emit_exchange(self, event: RequestEvent, request_body, response_body: Optional[bytes]) -> None:
+        if event.method == "GET" or event.error or not 200 <= event.status < 400 or not self._watched:
+            return
+        if isinstance(request_body, bytes):
+            request_body = request_body.decode("utf-8", "replace")
+        text = f"{event.url} {request_body or ''}"
+        with self._lock:
+            hits = [(u, c) for u, c in self._watched.items() if u in text]
+        for u, context in hits:
+            context.mark_mutated(f"{event.key} -> {event.status} references {u}")
+
+
+class ReadOnlyContext:
+    """
+    Ленивое значение build() на время жизни фикстуры-владельца.
+    watch — ключи, чьи значения (uuid) отслеживает guard;
+    по умолчанию все строковые значения верхнего уровня.
+    """
+
+    def __init__(self, build: Callable[[], Mapping], guard: Optional[MutationGuard] = None,
+                 watch: Optional[Iterable[str]] = None) -> None:
+        self.build = build
+        self.guard = guard
+        self.watch = tuple(watch) if watch is not None else None
+        self.builds = 0
+        self.uses = 0
+        self.mutations: List[str] = []
+        self._lock = threading.Lock()
+        self._value: Optional[Mapping] = None
+        self._mutated: Optional[str] = None
+
+    def mark_mutated(self, reason: str) -> None:
+        with self._lock:
+            if self._mutated is None:
+                self._mutated = reason
+
+    def get(self) -> Mapping:
+        with self._lock:
+            if self._value is None:
+                self._value = _freeze(self.build())
+                self.builds += 1
+            return self._value
+
+    @contextmanager
+    def use(self, node=None) -> Iterator[Mapping]:
+        """
+        Контекст на один тест; node — pytest Item, ему уходит предупреждение
+        SharedContextMutated, если тест изменил общие данные.
+        """
+        value = self.get()
+        self.uses += 1
+        uuids = [value[k] for k in self.watch] if self.watch is not None \
+            else [v for v in value.values() if isinstance(v, str)]
+        if self.guard is not None:
+            self.guard.watch(uuids, self)
+        try:
+            yield value
+        finally:
+            if self.guard is not None:
+                self.guard.unwatch(uuids)
+            with self._lock:
+                reason, self._mutated = self._mutated, None
+                if reason is not None:
+                    self._value = None
+                    self.mutations.append(reason)
+            if reason is not None and node is not None:
+                node.warn(SharedContextMutated(f"shared context discarded: {reason}"))
+
+
+def _freeze(value: object) -> object:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def guard(config) -> Optional[MutationGuard]:
+    return config.pluginmanager.get_plugin(PLUGIN_NAME)
+
+
+def configure(config) -> MutationGuard:
+    plugin = MutationGuard()
+    config.pluginmanager.register(plugin, PLUGIN_NAME)
+    return plugin
@@ -0,0 +1,286 @@
+"""
+recorder.py
+
+Запись и воспроизведение HTTP-обмена с OpenMRS через requests.jsonl.
+
+Запись (Recorder): транспортный адаптер пропускает запрос дальше
+(в живой сервер или в стенд) и кладёт пару запрос/ответ в очередь;
+JSONL пишет отдельный фоновый поток, вызывающий код на диск не ждёт.
+
+Воспроизведение (Replayer / ReplayAdapter): файл открывается через mmap,
+при открытии строится индекс ключ -> смещения строк, поиск ответа — O(1)
+по словарю, в память читается только найденная строка.
+
+Ключ: пользователь (Basic-auth username, иначе хэш Authorization) +
+метод + путь + отсортированный query + нормализованное тело (JSON
+с отсортированными ключами). Одинаковые запросы одного пользователя
+отдаются в порядке записи, последний ответ повторяется.
+
+Воспроизведение работает только для детерминированных запросов: тело
+с datetime.now() или uuid4() при replay не совпадёт с записанным.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import mmap
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from src import transport
+from src.openmrs_patient import OpenMRSClient
+
+
+DEFAULT_PATH = "requests.jsonl"
+
+# каждая строка записи начинается с ключа фиксированной длины (sha1 hex),
+# поэтому индекс строится без разбора JSON
+_KEY_PREFIX = b'{"key": "'
+_KEY_LENGTH = 40
+
+_STOP = object()
+
+
+class ReplayMiss(requests.ConnectionError):
+    """
+    В записи нет ответа на такой запрос.
+    """
+
+
+# -----------------------------
+# keys
+# -----------------------------
+
+def normalize_body(body: object) -> str:
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except ValueError:
+        return body
+
+
+def request_principal(authorization: Optional[str]) -> str:
+    """
+    Кто отправил запрос: username из Basic-auth, для другой схемы — хэш заголовка.
+    Пароль в ключ и в запись не попадает.
+    """
+    if not authorization:
+        return ""
+    scheme, _, value = authorization.partition(" ")
+    if scheme.lower() == "basic":
+        try:
+            return base64.b64decode(value, validate=True).decode("utf-8").partition(":")[0]
+        except (binascii.Error, UnicodeDecodeError):
+            pass
+    return "sha1:" + hashlib.sha1(authorization.encode("utf-8")).hexdigest()[:16]
+
+
+def request_key(method: str, url: str, body: object, authorization: Optional[str] = None) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    raw = f"{request_principal(authorization)}\n{method.upper()} {parts.path}?{query}\n{normalize_body(body)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# capture
+# -----------------------------
+
+class Recorder(BaseAdapter):
+    """
+    Адаптер записи: ответ берётся у inner (по умолчанию — адаптер, который
+    обслуживал prefix до install, иначе обычный HTTPAdapter).
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, prefix: str = OpenMRSClient.BASE_URL,
+                 inner: Optional[BaseAdapter] = None, max_pending: int = 10000) -> None:
+        super().__init__()
+        self.path = path
+        self.prefix = prefix
+        self.inner = inner
+        self.recorded = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._writer: Optional[threading.Thread] = None
+
+    def install(self) -> "Recorder":
+        if self._writer is None:
+            if self.inner is None:
+                self.inner = transport.current_adapter(self.prefix) or HTTPAdapter()
+            self._writer = threading.Thread(target=self._write_loop, name="requests-recorder", daemon=True)
+            self._writer.start()
+            transport.mount(self.prefix, self)
+        return self
+
+    def uninstall(self) -> None:
+        """
+        Снимает адаптер и дожидается, пока фоновый поток допишет очередь.
+        """
+        if self._writer is not None:
+            transport.unmount(self)
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+    def __enter__(self) -> "Recorder":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        resp = self.inner.send(request, **kwargs)
+        content = resp.content
+
+        self._queue.put({
+            "key": request_key(request.method, request.url, request.body, request.headers.get("Authorization")),
+            "user": request_principal(request.headers.get("Authorization")),
+            "method": request.method,
+            "url": request.url,
+            "request_body": normalize_body(request.body) or None,
+            "status": resp.status_code,
+            "content_type": resp.headers.get("Content-Type"),
+            "body": content.decode("utf-8", errors="replace"),
+            "elapsed_ms": round(resp.elapsed.total_seconds() * 1000, 3),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        })
+        return resp
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                entry = self._queue.get()
+                if entry is _STOP:
+                    break
+                # "key" — первое поле строки (см. _KEY_PREFIX)
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.recorded += 1
+                if self._queue.empty():
+                    f.flush()
+
+
+# -----------------------------
+# replay
+# -----------------------------
+
+class Replayer:
+    """
+    Индекс записи: key -> [смещения строк]. Сам файл остаётся в mmap.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._index: Dict[str, List[int]] = {}
+        self._served: Dict[str, int] = {}
+        self._build_index()
+
+    def __len__(self) -> int:
+        return sum(len(offsets) for offsets in self._index.values())
+
+    def _build_index(self) -> None:
+        data = self._data
+        size = len(data)
+        pos = 0
+        while pos < size:
+            end = data.find(b"\n", pos)
+            if end == -1:
+                end = size
+
+            # строки без ключа (чужие или оборванные) пропускаем
+            key_start = pos + len(_KEY_PREFIX)
+            if data[pos:key_start] == _KEY_PREFIX and end - key_start > _KEY_LENGTH:
+                key = data[key_start:key_start + _KEY_LENGTH].decode("ascii", errors="replace")
+                self._index.setdefault(key, []).append(pos)
+            pos = end + 1
+
+    def lookup(self, method: str, url: str, body: object, authorization: Optional[str] = None) -> Optional[Dict]:
+        key = request_key(method, url, body, authorization)
+        offsets = self._index.get(key)
+        if not offsets:
+            return None
+
+        with self._lock:
+            n = self._served.get(key, 0)
+            self._served[key] = n + 1
+        offset = offsets[min(n, len(offsets) - 1)]
+
+        end = self._data.find(b"\n", offset)
+        line = self._data[offset:end if end != -1 else len(self._data)]
+        return json.loads(line)
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._served.clear()
+
+    def close(self) -> None:
+        # повторный close безопасен: mmap.close и file.close идемпотентны
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Отвечает из записи; запрос, которого нет в записи, — ReplayMiss.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, prefix: str = OpenMRSClient.BASE_URL) -> None:
+        super().__init__()
+        self.prefix = prefix
+        self.replayer = Replayer(path)
+        self.misses = 0
+        self._installed = False
+
+    def install(self) -> "ReplayAdapter":
+        if not self._installed:
+            transport.mount(self.prefix, self)
+            self._installed = True
+        return self
+
+    def uninstall(self) -> None:
+        if self._installed:
+            transport.unmount(self)
+            self._installed = False
+
+    def __enter__(self) -> "ReplayAdapter":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        # with — полный жизненный цикл: снимаем адаптер и отпускаем mmap и файл записи
+        self.uninstall()
+        self.close()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        entry = self.replayer.lookup(request.method, request.url, request.body, request.headers.get("Authorization"))
+        if entry is None:
+            self.misses += 1
+            raise ReplayMiss(f"No recorded response for {request.method} {request.url}", request=request)
+
+        headers = {"Content-Type": entry["content_type"]} if entry.get("content_type") else None
+        return transport.build_response(
+            request, entry["status"], entry["body"].encode("utf-8"),
+            timedelta(seconds=time.perf_counter() - started), headers,
+        )
+
+    def close(self) -> None:
+        self.replayer.close()
@@ -0,0 +1,111 @@
+"""
+report_render.py
+
+Потоковый вывод отчётов по пользователям и ролям: table / csv / jsonl.
+
+Строки пишутся по мере поступления (например, из OpenMRSClient.iter_results),
+поэтому вывод начинается сразу, а память не растёт с размером отчёта.
+Для table ширины колонок считаются по ограниченной выборке первых строк.
+"""
+
+import csv
+import json
+import sys
+from itertools import chain, islice
+from typing import Iterable, List, Optional, Sequence, TextIO
+
+
+FORMATS = ("table", "csv", "jsonl")
+
+
+def render_rows(
+    headers: Sequence[str],
+    rows: Iterable[Sequence],
+    fmt: str = "table",
+    out: Optional[TextIO] = None,
+    sample_size: int = 100,
+    max_width: int = 80,
+) -> int:
+    """
+    Выводит строки отчёта в выбранном формате.
+    Возвращает количество выведенных строк (без заголовка).
+    """
+    out = out or sys.stdout
+
+    if fmt == "csv":
+        return _render_csv(headers, rows, out)
+    if fmt == "jsonl":
+        return _render_jsonl(headers, rows, out)
+    if fmt == "table":
+        return _render_table(headers, rows, out, sample_size, max_width)
+
+    raise ValueError(f"Unsupported report format: {fmt} (expected one of {FORMATS})")
+
+
+# -----------------------------
+# csv / jsonl
+# -----------------------------
+
+def _render_csv(headers: Sequence[str], rows: Iterable[Sequence], out: TextIO) -> int:
+    writer = csv.writer(out)
+    writer.writerow(headers)
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _render_jsonl(headers: Sequence[str], rows: Iterable[Sequence], out: TextIO) -> int:
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+# -----------------------------
+# fixed-width table
+# -----------------------------
+
+def _render_table(
+    headers: Sequence[str],
+    rows: Iterable[Sequence],
+    out: TextIO,
+    sample_size: int,
+    max_width: int,
+) -> int:
+    rows = iter(rows)
+
+    # ширины считаем только по первым sample_size строкам,
+    # остальные строки обрезаются под эти ширины
+    sample = [[str(cell) for cell in row] for row in islice(rows, sample_size)]
+    if not sample:
+        return 0
+
+    col_widths = [
+        min(max_width, max([len(headers[i])] + [len(row[i]) for row in sample]))
+        for i in range(len(headers))
+    ]
+
+    out.write(_format_row(headers, col_widths) + "\n")
+    out.write("-+-".join("-" * w for w in col_widths) + "\n")
+
+    count = 0
+    for row in chain(sample, rows):
+        out.write(_format_row(row, col_widths) + "\n")
+        count += 1
+    return count
+
+
+def _format_row(row: Sequence, col_widths: List[int]) -> str:
+    cells = []
+    for i, cell in enumerate(row):
+        text = str(cell)
+        width = col_widths[i]
+        if len(text) > width:
+            text = text[: width - 1] + "…"
+        cells.append(text.ljust(width))
+    return " | ".join(cells)
@@ -0,0 +1,265 @@
+"""
+scenario_engine.py
+
+Декларативные сценарии OpenMRS: шаги, связывание переменных между шагами,
+ожидаемые статусы. Один и тот же файл — и функциональный тест
+(tests/scenarios/), и профиль нагрузки (load/run_load.py через SCENARIOS).
+
+Файл — JSON: {"scenarios": [...]}, сценарий:
+
+    {
+      "name": "patient_visit",
+      "metadata": {
+        "location": {"path": "/location", "params": {"v": "default"}, "pick": "random"},
+        "id_type": {"path": "/patientidentifiertype", "where": {"name": "OpenMRS ID"}}
+      },
+      "let": {"identifier": "${gen.openmrs_id}"},
+      "steps": [
+        {"name": "patient", "method": "POST", "path": "/patient",
+         "json": {"person": "${gen.person}", "identifiers": [{"identifier": "${identifier}",
+                  "identifierType": "${meta.id_type}", "location": "${meta.location}"}]},
+         "expect": 201, "save": {"patient_uuid": "uuid"}},
+        {"name": "read", "method": "GET", "path": "/patient/${patient_uuid}",
+         "assert": {"identifiers.0.identifier": "${identifier}"}}
+      ]
+    }
+
+Подстановки "${...}": переменные (let, save, "vars" из строки JSONL),
+путь внутрь переменной (${patient.person.uuid}), meta.<ключ> и gen.<генератор>.
+Строка целиком из одной подстановки сохраняет тип значения (dict, bool...).
+
+metadata — GET один раз на прогон (SharedCache, общий для всех сценариев
+с тем же запросом); where — фильтр по полям, field — что брать (uuid),
+pick — first / random (выбор на каждый запуск сценария).
+"""
+
+import json
+import random
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from request_modules.create_random_valid_person import generate_person_payload
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import generate_openmrs_id
+from src.load import DEFAULT_EXPECT, ScenarioContext
+
+
+def _iso_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+GENERATORS: Dict[str, Callable[[], object]] = {
+    "openmrs_id": lambda: generate_openmrs_id(payload_length=7),
+    "person": generate_person_payload,
+    "uuid": lambda: str(uuid.uuid4()),
+    "username": lambda: f"wf_{uuid.uuid4().hex[:12]}",
+    "now": lambda: _iso_utc(datetime.now(timezone.utc)),
+    # визит нельзя начать «в будущем» из-за рассинхрона часов клиента и сервера
+    "minute_ago": lambda: _iso_utc(datetime.now(timezone.utc) - timedelta(minutes=1)),
+}
+
+_PLACEHOLDER = re.compile(r"\$\{([^}]+)\}")
+
+
+class ScenarioAssertionFailed(AssertionError):
+    pass
+
+
+# -----------------------------
+# format
+# -----------------------------
+
+@dataclass
+class MetadataQuery:
+    path: str
+    params: Dict = field(default_factory=lambda: {"v": "default"})
+    where: Dict = field(default_factory=dict)
+    field: str = "uuid"
+    pick: str = "first"  # first | random
+
+    @property
+    def cache_key(self) -> str:
+        return "meta:" + json.dumps([self.path, self.params, self.where, self.field], sort_keys=True)
+
+
+@dataclass
+class Step:
+    name: str
+    method: str
+    path: str
+    params: Optional[Dict] = None
+    json: object = None
+    expect: Tuple[int, ...] = DEFAULT_EXPECT
+    save: Dict[str, str] = field(default_factory=dict)     # переменная -> путь в ответе
+    checks: Dict[str, object] = field(default_factory=dict)  # путь в ответе -> ожидаемое значение
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Step":
+        expect = data.get("expect", DEFAULT_EXPECT)
+        return cls(
+            name=data.get("name") or f"{data['method']} {data['path']}",
+            method=data["method"].upper(),
+            path=data["path"],
+            params=data.get("params"),
+            json=data.get("json"),
+            expect=(expect,) if isinstance(expect, int) else tuple(expect),
+            save=dict(data.get("save") or {}),
+            checks=dict(data.get("assert") or {}),
+        )
+
+
+@dataclass
+class Scenario:
+    name: str
+    steps: List[Step]
+    metadata: Dict[str, MetadataQuery] = field(default_factory=dict)
+    let: Dict[str, object] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Scenario":
+        scenario = cls(
+            name=data["name"],
+            steps=[Step.from_dict(s) for s in data["steps"]],
+            metadata={key: MetadataQuery(**query) for key, query in (data.get("metadata") or {}).items()},
+            let=dict(data.get("let") or {}),
+        )
+        scenario.validate()
+        return scenario
+
+    def validate(self) -> None:
+        """
+        Ошибки формата — при загрузке, а не на тысячном запуске под нагрузкой:
+        переменная используется раньше, чем определена (let или save
+        предыдущего шага; vars из строки JSONL перекрывают только let),
+        неизвестные meta.* и gen.*.
+        """
+        defined = set(self.let)
+        parts = [("let", self.let, {})] + [(s.name, (s.path, s.params, s.json, s.checks), s.save)
+                                           for s in self.steps]
+        for label, value, saves in parts:
+            for name in _placeholders(value):
+                root, _, rest = name.partition(".")
+                if root == "meta":
+                    if rest not in self.metadata:
+                        raise ValueError(f"{self.name}/{label}: unknown metadata {name!r}")
+                elif root == "gen":
+                    if rest not in GENERATORS:
+                        raise ValueError(f"{self.name}/{label}: unknown generator {name!r}")
+                elif label == "let" or root not in defined:
+                    raise ValueError(f"{self.name}/{label}: variable {root!r} is used before it is defined")
+            defined.update(saves)
+
+    def __call__(self, ctx: ScenarioContext) -> Dict[str, object]:
+        return _Run(self, ctx).execute()
+
+
+def load_scenarios(path: str) -> Dict[str, Scenario]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    items = data["scenarios"] if isinstance(data, dict) else data
+    scenarios = {}
+    for item in items:
+        scenario = Scenario.from_dict(item)
+        if scenario.name in scenarios:
+            raise ValueError(f"{path}: duplicate scenario {scenario.name!r}")
+        scenarios[scenario.name] = scenario
+    return scenarios
+
+
+# -----------------------------
+# execution
+# -----------------------------
+
+class _Run:
+    """
+    Один запуск сценария: свои переменные и выбранные метаданные.
+    """
+
+    def __init__(self, scenario: Scenario, ctx: ScenarioContext) -> None:
+        self.scenario = scenario
+        self.ctx = ctx
+        self.variables: Dict[str, object] = {}
+        self._meta: Dict[str, object] = {}
+
+    def execute(self) -> Dict[str, object]:
+        for name, value in self.scenario.let.items():
+            self.variables[name] = self.render(value)
+        # vars из строки JSONL (load/scenarios.jsonl) перекрывают let
+        self.variables.update(self.ctx.spec.get("vars") or {})
+
+        for step in self.scenario.steps:
+            body = self.ctx.call(
+                step.method,
+                self.render(step.path),
+                params=self.render(step.params),
+                json_body=self.render(step.json),
+                expect=step.expect,
+            )
+            for name, path in step.save.items():
+                self.variables[name] = _dig(body, path)
+            for path, expected in step.checks.items():
+                actual, expected = _dig(body, path), self.render(expected)
+                if actual != expected:
+                    raise ScenarioAssertionFailed(
+                        f"{self.scenario.name}/{step.name}: {path} = {actual!r}, expected {expected!r}")
+        return self.variables
+
+    def render(self, value: object) -> object:
+        if isinstance(value, str):
+            whole = _PLACEHOLDER.fullmatch(value)
+            if whole:
+                return self.resolve(whole.group(1))
+            return _PLACEHOLDER.sub(lambda m: str(self.resolve(m.group(1))), value)
+        if isinstance(value, dict):
+            return {k: self.render(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.render(v) for v in value]
+        return value
+
+    def resolve(self, name: str) -> object:
+        if name.startswith("gen."):
+            return GENERATORS[name[4:]]()
+        if name.startswith("meta."):
+            return self.metadata(name[5:])
+        root, _, rest = name.partition(".")
+        return _dig(self.variables[root], rest) if rest else self.variables[root]
+
+    def metadata(self, key: str) -> object:
+        if key not in self._meta:
+            query = self.scenario.metadata[key]
+            candidates = self.ctx.shared.get(query.cache_key, lambda: self._load_metadata(query))
+            if not candidates:
+                raise LookupError(f"{self.scenario.name}: no {query.path} matching {query.where}")
+            self._meta[key] = random.choice(candidates) if query.pick == "random" else candidates[0]
+        return self._meta[key]
+
+    def _load_metadata(self, query: MetadataQuery) -> List[object]:
+        results = self.ctx.call("GET", query.path, params=query.params).get("results") or []
+        return [_dig(item, query.field) for item in results
+                if all(_dig(item, k) == v for k, v in query.where.items())]
+
+
+def _dig(value: object, path: str) -> object:
+    """
+    "person.names.0.givenName" по dict / list; нет такого поля — None.
+    """
+    for part in path.split(".") if path else ():
+        if isinstance(value, list):
+            value = value[int(part)] if part.lstrip("-").isdigit() and -len(value) <= int(part) < len(value) else None
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def _placeholders(value: object) -> List[str]:
+    if isinstance(value, str):
+        return _PLACEHOLDER.findall(value)
+    if isinstance(value, dict):
+        return [name for v in value.values() for name in _placeholders(v)]
+    if isinstance(value, (list, tuple)):
+        return [name for v in value for name in _placeholders(v)]
+    return []
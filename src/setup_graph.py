@@ -0,0 +1,199 @@
+"""
+setup_graph.py
+
+Граф шагов подготовки данных: шаг объявляет входы именами параметров
+(как фикстуры pytest), независимые шаги выполняются параллельно в пуле
+потоков, результаты запоминаются в области (scope).
+
+    SETUP = SetupGraph()
+
+    @SETUP.step(scope="session")
+    def location_uuid():
+        ...
+
+    @SETUP.step()
+    def patient(person, location_uuid, openmrs_id_type_uuid):
+        ...
+
+    scope = SETUP.scope()            # на тест
+    scope.start("patient", "visit_type_uuid")  # запустить заранее, не ждать
+    scope.get("patient")
+
+Время подготовки — критический путь графа, а не сумма шагов.
+
+Области: "session" — на весь процесс (общая для всех scope() графа),
+"function" — на объект SetupScope. Исключение шага (в т.ч. pytest.skip /
+xfail) запоминается так же, как результат, и пробрасывается всем,
+кто от него зависит.
+"""
+
+import inspect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+SCOPES = ("session", "function")
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    fn: Callable
+    needs: Tuple[str, ...]
+    scope: str
+
+
+class SetupGraph:
+    def __init__(self, max_workers: int = 8) -> None:
+        self.max_workers = max_workers
+        self._steps: Dict[str, Step] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._checked = False
+        self.session = SetupScope(self, "session")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._steps
+
+    def step(self, fn: Optional[Callable] = None, *, name: Optional[str] = None,
+             scope: str = "function") -> Callable:
+        """
+        Декоратор: @graph.step() / @graph.step(scope="session") / @graph.step(name="...").
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scope {scope!r}, expected one of {SCOPES}")
+
+        def register(func: Callable) -> Callable:
+            needs = tuple(inspect.signature(func).parameters)
+            self.add(name or func.__name__, func, needs, scope)
+            return func
+
+        return register(fn) if fn is not None else register
+
+    def add(self, name: str, fn: Callable, needs: Iterable[str] = (), scope: str = "function") -> None:
+        with self._lock:
+            if name in self._steps:
+                raise ValueError(f"Step {name!r} is already defined")
+            self._steps[name] = Step(name, fn, tuple(needs), scope)
+            self._checked = False
+
+    def scope(self) -> "SetupScope":
+        return SetupScope(self, "function", parent=self.session)
+
+    def check(self) -> None:
+        """
+        Все входы определены, циклов нет.
+        """
+        if self._checked:
+            return
+        state: Dict[str, int] = {}  # 1 — в обходе, 2 — проверен
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Setup dependency cycle: {' -> '.join(path + [name])}")
+            if name not in self._steps:
+                raise KeyError(f"Unknown setup step {name!r}" + (f" (needed by {path[-1]!r})" if path else ""))
+            state[name] = 1
+            for dep in self._steps[name].needs:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in list(self._steps):
+            visit(name, [])
+        self._checked = True
+
+    def _submit(self, fn: Callable) -> None:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="setup")
+        self._pool.submit(fn)
+
+
+class SetupScope:
+    """
+    Запомненные результаты (Future) шагов своей области.
+    Шаги session-области попадают в graph.session.
+    """
+
+    def __init__(self, graph: SetupGraph, name: str, parent: Optional["SetupScope"] = None) -> None:
+        self.graph = graph
+        self.name = name
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        # шаг -> (начало, конец) по time.perf_counter, для разбора критического пути
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    def _owner(self, step_scope: str) -> "SetupScope":
+        scope: Optional[SetupScope] = self
+        while scope is not None:
+            if scope.name == step_scope:
+                return scope
+            scope = scope.parent
+        return self
+
+    def start(self, *names: str) -> List[Future]:
+        """
+        Запускает шаги (и их входы) и сразу возвращает Future.
+        """
+        self.graph.check()
+        return [self._schedule(name) for name in names]
+
+    def get(self, name: str) -> object:
+        return self.start(name)[0].result()
+
+    def resolve(self, *names: str) -> Dict[str, object]:
+        futures = self.start(*names)
+        return {name: future.result() for name, future in zip(names, futures)}
+
+    def _schedule(self, name: str) -> Future:
+        step = self.graph._steps[name]
+        owner = self._owner(step.scope)
+        with owner._lock:
+            future = owner._futures.get(name)
+            if future is not None:
+                return future
+            future = owner._futures[name] = Future()
+
+        deps = [self._schedule(dep) for dep in step.needs]
+
+        def run() -> None:
+            started = time.perf_counter()
+            try:
+                future.set_result(step.fn(**{d: f.result() for d, f in zip(step.needs, deps)}))
+            except BaseException as e:  # pytest.skip / xfail — не Exception
+                future.set_exception(e)
+            finally:
+                owner.timings[name] = (started, time.perf_counter())
+
+        # шаг уходит в пул, только когда готовы все входы: потоки пула не ждут друг друга
+        remaining = [len(deps)]
+        settled = [False]
+        lock = threading.Lock()
+
+        def on_dep_done(dep: Future) -> None:
+            error = dep.exception()
+            with lock:
+                if settled[0]:
+                    return
+                remaining[0] -= 1
+                settled[0] = error is not None or remaining[0] == 0
+                if not settled[0]:
+                    return
+            future.set_running_or_notify_cancel()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                self.graph._submit(run)
+
+        if not deps:
+            future.set_running_or_notify_cancel()
+            self.graph._submit(run)
+        for dep in deps:
+            dep.add_done_callback(on_dep_done)
+        return future
@@ -0,0 +1,78 @@
+"""
+transport.py
+
+Подмена транспорта requests по префиксу URL.
+
+Большинство модулей ходят в OpenMRS напрямую через requests.get/post
+(каждый вызов — своя Session), поэтому подменять нужно не конкретную
+Session, а выбор адаптера во всех Session процесса.
+"""
+
+import http.client
+import io
+import threading
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+_routes: List[Tuple[str, BaseAdapter]] = []
+_lock = threading.Lock()
+_original_get_adapter = requests.Session.get_adapter
+
+
+def _get_adapter(self: requests.Session, url: str) -> BaseAdapter:
+    for prefix, adapter in _routes:
+        if url.startswith(prefix):
+            return adapter
+    return _original_get_adapter(self, url)
+
+
+def mount(prefix: str, adapter: BaseAdapter) -> None:
+    """
+    Все запросы на URL, начинающиеся с prefix, уходят в adapter
+    (последний смонтированный адаптер имеет приоритет).
+    """
+    with _lock:
+        _routes.insert(0, (prefix, adapter))
+        requests.Session.get_adapter = _get_adapter
+
+
+def unmount(adapter: BaseAdapter) -> None:
+    with _lock:
+        _routes[:] = [(p, a) for p, a in _routes if a is not adapter]
+        if not _routes:
+            requests.Session.get_adapter = _original_get_adapter
+
+
+def current_adapter(url: str) -> Optional[BaseAdapter]:
+    """
+    Адаптер, смонтированный для url, или None (тогда работает обычный HTTPAdapter).
+    """
+    with _lock:
+        for prefix, adapter in _routes:
+            if url.startswith(prefix):
+                return adapter
+    return None
+
+
+def build_response(request: requests.PreparedRequest, status: int, content: bytes,
+                   elapsed: timedelta, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """
+    requests.Response без сокета — для адаптеров, которые отвечают сами.
+    """
+    resp = requests.Response()
+    resp.status_code = status
+    resp.reason = http.client.responses.get(status, "")
+    resp.headers = CaseInsensitiveDict(headers or {"Content-Type": "application/json;charset=UTF-8"})
+    resp.headers["Content-Length"] = str(len(content))
+    resp._content = content
+    resp.raw = io.BytesIO(content)
+    resp.encoding = "utf-8"
+    resp.url = request.url
+    resp.request = request
+    resp.elapsed = elapsed
+    return resp
@@ -0,0 +1,307 @@
+"""
+user_bulk.py
+
+Массовые операции над пользователями OpenMRS: создание синтетических
+учётных записей для нагрузочных стендов и их retire/unretire/purge
+после нагрузочного прогона.
+
+Запросы выполняются параллельно (с ограничением concurrency),
+результат каждой записи сразу фиксируется в журнале (JSONL),
+поэтому повторный запуск продолжает с места остановки.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.concurrency import run_bounded, thread_client
+from src.openmrs_patient import OpenMRSError
+
+
+DONE_STATUSES = {"created", "exists"}
+
+
+# -----------------------------
+# spec
+# -----------------------------
+
+@dataclass
+class UserSpec:
+    username: str
+    roles: List[str]
+    password: str = "Password123"
+    system_id: Optional[str] = None
+    given_name: Optional[str] = None
+    family_name: str = "User"
+    gender: str = "M"
+    birthdate: str = "1997-09-02"
+
+    def to_payload(self) -> Dict:
+        return {
+            "username": self.username,
+            "password": self.password,
+            "systemId": self.system_id or self.username,
+            "person": {
+                "names": [{"givenName": self.given_name or self.username, "familyName": self.family_name}],
+                "gender": self.gender,
+                "birthdate": self.birthdate,
+            },
+            "roles": [{"uuid": role_uuid} for role_uuid in self.roles],
+        }
+
+
+def load_user_specs(path: str) -> Iterator[UserSpec]:
+    """
+    Читает спецификацию пользователей из JSONL (одна строка — один UserSpec).
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield UserSpec(**json.loads(line))
+
+
+def numbered_user_specs(prefix: str, start: int, role_uuids: List[str], count: Optional[int] = None) -> Iterator[UserSpec]:
+    """
+    user{start}, user{start+1}, ... — по одной роли на пользователя, роли по кругу.
+    """
+    total = len(role_uuids) if count is None else count
+    for i in range(total):
+        number = start + i
+        yield UserSpec(
+            username=f"{prefix}{number}",
+            roles=[role_uuids[i % len(role_uuids)]],
+            system_id=str(number),
+            given_name=f"Demo{number}",
+        )
+
+
+# -----------------------------
+# journal
+# -----------------------------
+
+class Journal:
+    """
+    Append-only журнал результатов (JSONL). Пишется из одного потока.
+    """
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self._file = None
+
+    def completed(self) -> Set[str]:
+        """
+        Ключи, завершённые в прошлых запусках (created/exists/...)
+        и не удалённые (purged) после этого.
+        Оборванная последняя строка (падение посреди записи) игнорируется.
+        """
+        done: Set[str] = set()
+        if not self.path or not os.path.exists(self.path):
+            return done
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("status") in DONE_STATUSES:
+                    done.add(entry["key"])
+                elif entry.get("status") == "purged":
+                    done.discard(entry["key"])
+        return done
+
+    def uuids(self) -> Dict[str, str]:
+        """
+        key -> uuid по записям журнала, в которых uuid известен.
+        Ключ, последняя запись которого — purged, не возвращается: uuid мёртв.
+        """
+        found: Dict[str, str] = {}
+        if not self.path or not os.path.exists(self.path):
+            return found
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("status") == "purged":
+                    found.pop(entry["key"], None)
+                elif entry.get("uuid"):
+                    found[entry["key"]] = entry["uuid"]
+        return found
+
+    def record(self, entry: Dict) -> None:
+        if not self.path:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            # если прошлый запуск оборвался посреди строки — начинаем с новой
+            if self._file.tell() and not _ends_with_newline(self.path):
+                self._file.write("\n")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+# -----------------------------
+# provisioning
+# -----------------------------
+
+@dataclass
+class BulkReport:
+    results: List[Dict] = field(default_factory=list)
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.results if r["status"] == status)
+
+    @property
+    def failed(self) -> List[Dict]:
+        return [r for r in self.results if r["status"] == "failed"]
+
+    def summary(self) -> str:
+        statuses = sorted({r["status"] for r in self.results})
+        return ", ".join(f"{s}: {self.count(s)}" for s in statuses) or "nothing to do"
+
+
+def _create_one(spec: UserSpec) -> Dict:
+    try:
+        created = thread_client().create_user(spec.to_payload())
+    except OpenMRSError as e:
+        if e.status_code == 409:
+            return {"key": spec.username, "status": "exists", "code": 409}
+        return {"key": spec.username, "status": "failed", "code": e.status_code, "error": e.body[:500]}
+
+    return {"key": spec.username, "status": "created", "uuid": created.get("uuid")}
+
+
+def provision_users(specs: Iterable[UserSpec], journal_path: Optional[str] = None, concurrency: int = 8) -> BulkReport:
+    """
+    Создаёт пользователей параллельно. 409 (уже существует) считается успехом.
+    Пользователи, завершённые в журнале прошлого запуска, пропускаются.
+    """
+    journal = Journal(journal_path)
+    done = journal.completed()
+    todo = (spec for spec in specs if spec.username not in done)
+
+    report = BulkReport()
+    try:
+        for spec, result in run_bounded(todo, _create_one, concurrency):
+            if isinstance(result, Exception):
+                result = {"key": spec.username, "status": "failed", "error": str(result)[:500]}
+            journal.record(result)
+            report.results.append(result)
+    finally:
+        journal.close()
+
+    return report
+
+
+# -----------------------------
+# retire / unretire / purge
+# -----------------------------
+
+USER_ACTIONS = ("retire", "unretire", "purge")
+
+
+def resolve_user_uuids(usernames: Iterable[str], mirror_path: Optional[str] = None, page_size: int = 100) -> Dict[str, str]:
+    """
+    username -> uuid для набора пользователей.
+
+    Сначала берём uuid из журнала провижининга (локальное зеркало),
+    остальных ищем одним постраничным проходом по /user, а не поиском ?q= на каждого.
+    Ненайденные в результат не попадают.
+    """
+    wanted = set(usernames)
+    resolved = {k: v for k, v in Journal(mirror_path).uuids().items() if k in wanted}
+
+    missing = wanted - resolved.keys()
+    if not missing:
+        return resolved
+
+    users = thread_client().iter_results(
+        "/user",
+        params={"v": "default", "includeAll": "true"},
+        page_size=page_size,
+    )
+    for user in users:
+        username = user.get("username")
+        if username in missing:
+            resolved[username] = user["uuid"]
+            missing.discard(username)
+            if not missing:
+                break
+
+    return resolved
+
+
+def _apply_action(action: str, reason: str) -> Callable[[Tuple[str, str]], Dict]:
+    def apply(item: Tuple[str, str]) -> Dict:
+        username, user_uuid = item
+        client = thread_client()
+        try:
+            if action == "retire":
+                client.retire_user(user_uuid, reason)
+            elif action == "unretire":
+                client.unretire_user(user_uuid)
+            else:
+                client.purge_user(user_uuid)
+        except OpenMRSError as e:
+            return {"key": username, "uuid": user_uuid, "status": "failed", "code": e.status_code, "error": e.body[:500]}
+        return {"key": username, "uuid": user_uuid, "status": f"{action}d"}
+
+    return apply
+
+
+def bulk_user_action(
+    usernames: Iterable[str],
+    action: str,
+    reason: str = "Bulk cleanup after load run",
+    dry_run: bool = False,
+    concurrency: int = 8,
+    mirror_path: Optional[str] = None,
+) -> BulkReport:
+    """
+    retire / unretire / purge для набора пользователей.
+    dry_run=True только резолвит uuid и показывает, что было бы сделано.
+    Результаты пишутся в mirror_path: после purge uuid из зеркала больше не берётся.
+    """
+    if action not in USER_ACTIONS:
+        raise ValueError(f"Unsupported user action: {action} (expected one of {USER_ACTIONS})")
+
+    usernames = list(dict.fromkeys(usernames))
+    resolved = resolve_user_uuids(usernames, mirror_path=mirror_path)
+
+    report = BulkReport()
+    for username in usernames:
+        if username not in resolved:
+            report.results.append({"key": username, "status": "not_found"})
+
+    todo = [(u, resolved[u]) for u in usernames if u in resolved]
+    if dry_run:
+        report.results.extend({"key": u, "uuid": uid, "status": "dry_run", "action": action} for u, uid in todo)
+        return report
+
+    journal = Journal(mirror_path)
+    try:
+        for (username, user_uuid), result in run_bounded(todo, _apply_action(action, reason), concurrency):
+            if isinstance(result, Exception):
+                result = {"key": username, "uuid": user_uuid, "status": "failed", "error": str(result)[:500]}
+            journal.record(result)
+            report.results.append(result)
+    finally:
+        journal.close()
+
+    return report
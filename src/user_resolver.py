@@ -0,0 +1,158 @@
+"""
+user_resolver.py
+
+Кэш username -> uuid пользователей OpenMRS.
+
+- ограниченный LRU (max_size записей);
+- TTL для найденных и отдельный TTL для ненайденных (negative caching),
+  чтобы имена вроде deleted_user_does_not_exist_999 не искались каждый раз;
+- инвалидация, когда OpenMRSClient создаёт / retire / unretire / purge пользователя.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from src.openmrs_patient import OpenMRSClient
+
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "Admin123"
+
+_MISSING = None
+
+
+class UserResolver:
+    """
+    Потокобезопасный LRU-кэш username -> uuid с TTL и negative caching.
+    """
+
+    def __init__(
+        self,
+        client: Optional[OpenMRSClient] = None,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # username -> (uuid | None, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        OpenMRSClient.add_user_listener(self.invalidate)
+
+    @property
+    def client(self) -> OpenMRSClient:
+        if self._client is None:
+            self._client = OpenMRSClient(ADMIN_USERNAME, ADMIN_PASSWORD)
+        return self._client
+
+    # -----------------------------
+    # lookups
+    # -----------------------------
+
+    def resolve(self, username: str) -> Optional[str]:
+        """
+        uuid пользователя или None, если такого пользователя нет.
+        """
+        found, user_uuid = self.cached(username)
+        if found:
+            return user_uuid
+
+        user_uuid = self._lookup(username)
+        if user_uuid is None:
+            self.remember_missing(username)
+        else:
+            self.remember(username, user_uuid)
+        return user_uuid
+
+    def cached(self, username: str) -> Tuple[bool, Optional[str]]:
+        """
+        (есть ли живая запись в кэше, uuid | None) без похода на сервер.
+        """
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return True, entry[0]
+
+    def _lookup(self, username: str) -> Optional[str]:
+        data = self.client.get_json("/user", params={"q": username, "v": "default"})
+        results = data.get("results", []) or []
+
+        # q= ищет не точно, поэтому сверяем username
+        for user in results:
+            if user.get("username") == username:
+                return user["uuid"]
+        return None
+
+    # -----------------------------
+    # updates
+    # -----------------------------
+
+    def remember(self, username: str, user_uuid: str) -> None:
+        self._put(username, user_uuid, self.ttl)
+
+    def remember_missing(self, username: str) -> None:
+        self._put(username, _MISSING, self.negative_ttl)
+
+    def _put(self, username: str, user_uuid: Optional[str], ttl: float) -> None:
+        with self._lock:
+            self._entries[username] = (user_uuid, self._clock() + ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None, user_uuid: Optional[str] = None) -> None:
+        """
+        Сбрасывает записи по username и/или uuid; без аргументов — весь кэш.
+        """
+        with self._lock:
+            if username is None and user_uuid is None:
+                self._entries.clear()
+                return
+
+            if username is not None:
+                self._entries.pop(username, None)
+
+            if user_uuid is not None:
+                stale = [name for name, (cached_uuid, _) in self._entries.items() if cached_uuid == user_uuid]
+                for name in stale:
+                    del self._entries[name]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_default: Optional[UserResolver] = None
+_default_lock = threading.Lock()
+
+
+def default_resolver() -> UserResolver:
+    """
+    Общий резолвер процесса (для тестов и скриптов из user/).
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = UserResolver()
+        return _default
+
+
+def resolve_user_uuid(username: str) -> Optional[str]:
+    return default_resolver().resolve(username)
@@ -0,0 +1,47 @@
+# tests/new_patient/test_create_patient_latency.py
+
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from request_modules.create_random_valid_person import generate_person_payload
+from request_modules.locations.get_random_valid_location import get_random_valid_location
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
+    generate_openmrs_id,
+    get_openmrs_id_identifier,
+)
+
+BASE_URL = "http://localhost/openmrs/ws/rest/v1"
+USERNAME = "admin"
+PASSWORD = "Admin123"
+
+SAMPLES = 20
+
+
+# ============================================================
+# latency SLO (src/latency_slo.py)
+# ============================================================
+
+@pytest.mark.latency_slo("POST /patient", p95=300, samples=SAMPLES)
+def test_create_patient_latency_slo():
+    # Сценарий: создаём SAMPLES пациентов подряд (person передаётся вложенно, один POST на пациента).
+    # Ожидаемый результат: все ответы 201, p95 POST /patient по этим замерам меньше 300 мс.
+    location_uuid = get_random_valid_location()["uuid"]
+    identifier_type_uuid, _ = get_openmrs_id_identifier()
+
+    for _ in range(SAMPLES):
+        response = requests.post(
+            f"{BASE_URL}/patient",
+            json={
+                "person": generate_person_payload(),
+                "identifiers": [{
+                    "identifier": generate_openmrs_id(payload_length=7),
+                    "identifierType": identifier_type_uuid,
+                    "location": location_uuid,
+                    "preferred": True,
+                }],
+            },
+            auth=HTTPBasicAuth(USERNAME, PASSWORD),
+            timeout=30,
+        )
+        assert response.status_code == 201, response.text[:2000]
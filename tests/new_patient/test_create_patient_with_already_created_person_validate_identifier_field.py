@@ -1,7 +1,7 @@
 import uuid
 import pytest
 
-from request_modules.create_random_valid_person import create_valid_person
+from request_modules.create_random_valid_person import build_valid_person
 from request_modules.create_valid_patient_with_person import create_in_valid_patient_with_person
 from request_modules.locations.get_random_valid_location import get_random_valid_location
 from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import get_openmrs_id_identifier
@@ -42,7 +42,7 @@ from src.openmrs_patient import Person
 )
 def test_create_patient_with_invalid_patient_identifier(invalid_patient_identifier):
     """
-    Сценарий (общий): создать пациента по API /patient с уже созданной Person,
+    Сценарий (общий): создать пациента по API /patient с person внутри запроса,
     но подставить НЕвалидный patient identifier.
 
     Ожидаемый результат (общий): OpenMRS НЕ создаёт пациента и возвращает HTTP 400,
@@ -55,8 +55,8 @@ def test_create_patient_with_invalid_patient_identifier(invalid_patient_identifi
     # Берём случайную валидную локацию (в OpenMRS identifier обычно привязан к location)
     location = get_random_valid_location()
 
-    # Создаём валидную Person заранее (сценарий: patient создаётся на базе уже созданной person)
-    person: Person = create_valid_person()
+    # Валидная Person собирается локально и уходит в POST /patient вложенной (без POST /person)
+    person: Person = build_valid_person()
 
     # Пытаемся создать пациента с НЕвалидным identifier
     response = create_in_valid_patient_with_person(
@@ -1,7 +1,7 @@
 import uuid
 import pytest
 
-from request_modules.create_random_valid_person import create_valid_person
+from request_modules.create_random_valid_person import build_valid_person
 from request_modules.create_valid_patient_with_person import create_in_valid_patient_with_person
 from request_modules.locations.get_random_valid_location import get_random_valid_location
 from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
@@ -17,7 +17,7 @@ from src.openmrs_patient import Person
 
 
 # ============================================================
-# Создание пациента с уже созданной Person
+# Создание пациента с person внутри запроса
 # и с НЕвалидными значениями location
 # ============================================================
 
@@ -64,8 +64,8 @@ def test_create_patient_with_person_and_invalid_location(location):
     # и валидное значение identifier
     identifier_type, patient_identifier = get_openmrs_id_identifier()
 
-    # Создаём валидную Person
-    person: Person = create_valid_person()
+    # Валидная Person собирается локально и уходит в POST /patient вложенной
+    person: Person = build_valid_person()
 
     # Пытаемся создать пациента с невалидной локацией
     response = create_in_valid_patient_with_person(
@@ -2,7 +2,7 @@ import uuid
 import pytest
 
 from checks.patient_checks import assert_valid_patient_response
-from request_modules.create_random_valid_person import create_valid_person
+from request_modules.create_random_valid_person import build_valid_person
 from request_modules.create_valid_patient_with_person import (
     create_valid_patient_with_person,
     create_in_valid_patient_with_person,
@@ -60,7 +60,7 @@ def test_create_patient_with_user_has_access_add_patient(username, password, pri
     """
     identifier_type, patient_identifier = get_openmrs_id_identifier()
     location = get_random_valid_location()
-    person: Person = create_valid_person()
+    person: Person = build_valid_person()
 
     patient = create_valid_patient_with_person(
         username=username,
@@ -75,7 +75,7 @@ def test_create_patient_with_user_has_access_add_patient(username, password, pri
     assert_valid_patient_response(patient)
 
     # Ожидаем, что пациента можно найти по identifier (GET /patient?q=identifier)
-    found_patient = find_patient_by_identifier(identifier=patient_identifier)
+    found_patient = find_patient_by_identifier(identifier=patient_identifier, search_server=True)
     assert patient == found_patient
 
 
@@ -106,7 +106,7 @@ def test_create_patient_with_user_has_no_access_add_patient(username, password,
     """
     identifier_type, patient_identifier = get_openmrs_id_identifier()
     location = get_random_valid_location()
-    person: Person = create_valid_person()
+    person: Person = build_valid_person()
 
     response = create_in_valid_patient_with_person(
         username=username,
@@ -157,7 +157,7 @@ def test_create_patient_with_disabled_user(username, password, privilege_level_u
     """
     identifier_type, patient_identifier = get_openmrs_id_identifier()
     location = get_random_valid_location()
-    person: Person = create_valid_person()
+    person: Person = build_valid_person()
 
     response = create_in_valid_patient_with_person(
         username=username,
@@ -1,7 +1,7 @@
 import uuid
 import pytest
 
-from request_modules.create_random_valid_person import create_valid_person
+from request_modules.create_random_valid_person import build_valid_person
 from request_modules.create_valid_patient_with_person import create_in_valid_patient_with_person
 from request_modules.locations.get_random_valid_location import get_random_valid_location
 from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import get_openmrs_id_identifier
@@ -36,7 +36,7 @@ from request_modules.patientidentifiertype.get_random_valid_patient_identifier_t
 def test_create_patient_with_invalid_identifier_type(invalid_identifier_type):
     """
     Общий сценарий:
-    Создать пациента по API /patient с уже созданной Person,
+    Создать пациента по API /patient с person внутри запроса,
     с валидным значением identifier (patient_identifier),
     но подставить НЕвалидный identifierType.
 
@@ -52,8 +52,8 @@ def test_create_patient_with_invalid_identifier_type(invalid_identifier_type):
     # Берём случайную валидную локацию (в OpenMRS identifier обычно привязан к location)
     location = get_random_valid_location()
 
-    # Создаём валидную Person заранее
-    person = create_valid_person()
+    # Валидная Person собирается локально и уходит в POST /patient вложенной
+    person = build_valid_person()
 
     # Пытаемся создать пациента с НЕвалидным identifierType
     response = create_in_valid_patient_with_person(
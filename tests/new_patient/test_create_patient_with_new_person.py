@@ -5,10 +5,14 @@ import requests
 from requests.auth import HTTPBasicAuth
 from faker import Faker
 
+from checks.patient_checks import assert_created_patient_response
+
 from request_modules.locations.get_random_valid_location import get_random_valid_location
 from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import (
+    generate_openmrs_id,
     get_openmrs_id_identifier,
 )
+from src.payload_mutation import remove, set_value
 
 fake = Faker("ru_RU")
 
@@ -72,6 +76,25 @@ def post_patient(payload: dict) -> requests.Response:
     )
 
 
+# ============================================================
+# fixtures
+# ============================================================
+
+@pytest.fixture(scope="module")
+def base_patient_payload() -> dict:
+    # Сценарий: один валидный payload на модуль (локация и тип идентификатора — один раз).
+    # Ожидаемый результат: база для вариантов src/payload_mutation.py; сама база не меняется.
+    return build_valid_patient_payload_dict()
+
+
+@pytest.fixture()
+def patient_payload(base_patient_payload) -> dict:
+    # Сценарий: база + свой идентификатор на тест (позитивные кейсы создают пациента,
+    # а повтор идентификатора дал бы 400 по другой причине).
+    # Ожидаемый результат: валидный payload, копия только пути identifiers.0.
+    return set_value("identifiers.0.identifier", generate_openmrs_id(payload_length=7)).apply(base_patient_payload)
+
+
 # ============================================================
 # Create new person validation
 # ============================================================
@@ -94,15 +117,13 @@ def post_patient(payload: dict) -> requests.Response:
 
     ],
 )
-def test_create_patient_with_invalid_person_root(person_value, description):
+def test_create_patient_with_invalid_person_root(patient_payload, person_value, description):
     # Сценарий: берём валидный payload и портим поле person одним из вариантов выше.
     # Ожидаемый результат: OpenMRS не создаёт пациента (ошибка валидации).
-    payload = build_valid_patient_payload_dict()
-
     if person_value == "__MISSING__":
-        payload.pop("person", None)
+        payload = remove("person").apply(patient_payload)
     else:
-        payload["person"] = person_value
+        payload = set_value("person", person_value).apply(patient_payload)
 
     response = post_patient(payload)
 
@@ -150,11 +171,10 @@ def test_create_patient_with_invalid_person_root(person_value, description):
         [123],
     ],
 )
-def test_create_patient_with_invalid_person_names(invalid_names):
+def test_create_patient_with_invalid_person_names(patient_payload, invalid_names):
     # Сценарий: создаём валидный payload и подставляем невалидный person.names.
     # Ожидаемый результат: OpenMRS отклоняет запрос → HTTP 400.
-    payload = build_valid_patient_payload_dict()
-    payload["person"]["names"] = invalid_names
+    payload = set_value("person.names", invalid_names).apply(patient_payload)
 
     response = post_patient(payload)
 
@@ -187,11 +207,10 @@ def test_create_patient_with_invalid_person_names(invalid_names):
         [{"givenName": "X", "familyName": ""}],
     ],
 )
-def test_create_patient_with_person_names_familyname_optional_positive(names_payload):
+def test_create_patient_with_person_names_familyname_optional_positive(patient_payload, names_payload):
     # Сценарий: подменяем person.names на “позитивный” кейс, где familyName не обязателен.
     # Ожидаемый результат: успешное создание пациента.
-    payload = build_valid_patient_payload_dict()
-    payload["person"]["names"] = names_payload
+    payload = set_value("person.names", names_payload).apply(patient_payload)
 
     response = post_patient(payload)
 
@@ -202,10 +221,7 @@ def test_create_patient_with_person_names_familyname_optional_positive(names_pay
 
     # Ожидаемый результат: в ответе есть базовая структура Patient.
     data = response.json()
-    assert isinstance(data, dict)
-    assert "uuid" in data and isinstance(data["uuid"], str)
-    assert data.get("voided") is False
-    assert isinstance(data.get("person"), dict)
+    assert_created_patient_response(data)
 
 
 # ============================================================
@@ -229,11 +245,10 @@ def test_create_patient_with_person_names_familyname_optional_positive(names_pay
         123,
     ],
 )
-def test_create_patient_with_invalid_gender(invalid_gender):
+def test_create_patient_with_invalid_gender(patient_payload, invalid_gender):
     # Сценарий: подставляем невалидный gender (пусто/неверный тип).
     # Ожидаемый результат: OpenMRS отклоняет запрос → HTTP 400.
-    payload = build_valid_patient_payload_dict()
-    payload["person"]["gender"] = invalid_gender
+    payload = set_value("person.gender", invalid_gender).apply(patient_payload)
 
     response = post_patient(payload)
 
@@ -281,11 +296,10 @@ def test_create_patient_with_invalid_gender(invalid_gender):
         "male",
     ],
 )
-def test_create_patient_with_custom_gender_positive(gender_value):
+def test_create_patient_with_custom_gender_positive(patient_payload, gender_value):
     # Сценарий: подставляем кастомный gender, который система неожиданно принимает.
     # Ожидаемый результат: успешное создание пациента.
-    payload = build_valid_patient_payload_dict()
-    payload["person"]["gender"] = gender_value
+    payload = set_value("person.gender", gender_value).apply(patient_payload)
 
     response = post_patient(payload)
 
@@ -296,10 +310,7 @@ def test_create_patient_with_custom_gender_positive(gender_value):
 
     # Ожидаемый результат: в ответе есть базовая структура Patient.
     data = response.json()
-    assert isinstance(data, dict)
-    assert "uuid" in data and isinstance(data["uuid"], str)
-    assert data.get("voided") is False
-    assert isinstance(data.get("person"), dict)
+    assert_created_patient_response(data)
 
     # Ожидаемый результат: если gender возвращается в этом представлении — он совпадает с отправленным.
     returned_gender = (data.get("person") or {}).get("gender")
@@ -336,11 +347,10 @@ def test_create_patient_with_custom_gender_positive(gender_value):
         12345,
     ],
 )
-def test_create_patient_with_invalid_birthdate(invalid_birthdate):
+def test_create_patient_with_invalid_birthdate(patient_payload, invalid_birthdate):
     # Сценарий: подставляем невалидный birthdate.
     # Ожидаемый результат: OpenMRS отклоняет запрос → HTTP 400.
-    payload = build_valid_patient_payload_dict()
-    payload["person"]["birthdate"] = invalid_birthdate
+    payload = set_value("person.birthdate", invalid_birthdate).apply(patient_payload)
 
     response = post_patient(payload)
 
@@ -358,12 +368,11 @@ def test_create_patient_with_invalid_birthdate(invalid_birthdate):
 # person.birthdate = null — POSITIVE
 # ============================================================
 
-def test_create_patient_with_null_birthdate_positive():
+def test_create_patient_with_null_birthdate_positive(patient_payload):
     # Сценарий: birthdate передаётся как null.
     # Ожидаемый результат: пациент создаётся успешно (HTTP 200/201),
     # так как в вашей системе birthdate допускается неизвестной (null).
-    payload = build_valid_patient_payload_dict()
-    payload["person"]["birthdate"] = None
+    payload = set_value("person.birthdate", None).apply(patient_payload)
 
     response = post_patient(payload)
 
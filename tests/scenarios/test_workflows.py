@@ -0,0 +1,32 @@
+# tests/scenarios/test_workflows.py
+
+import pytest
+
+from load.scenarios import WORKFLOWS_PATH
+from src.load import LoadStats, ScenarioContext, SharedCache
+from src.scenario_engine import load_scenarios
+
+WORKFLOWS = load_scenarios(WORKFLOWS_PATH)
+
+
+@pytest.fixture(scope="module")
+def shared_metadata() -> SharedCache:
+    # метаданные (локации, типы) — один раз на модуль, как под нагрузкой
+    return SharedCache()
+
+
+# ============================================================
+# load/workflows.json как функциональные тесты
+# ============================================================
+
+@pytest.mark.parametrize("name", sorted(WORKFLOWS))
+def test_workflow(name: str, shared_metadata: SharedCache):
+    # Сценарий: один запуск декларативного сценария (тот же, что в load/scenarios.jsonl).
+    # Ожидаемый результат: каждый шаг вернул ожидаемый статус, проверки assert шагов прошли.
+    stats = LoadStats()
+    ctx = ScenarioContext({"scenario": name}, stats, shared_metadata)
+
+    variables = WORKFLOWS[name](ctx)
+
+    assert all(row[2] == 0 for row in stats.rows()), list(stats.rows())
+    assert variables
@@ -0,0 +1,29 @@
+from src.bench import BenchResult, append_history, compare, iter_history, load_baseline, measure, save_baseline
+
+
+def test_measure_calibrates_loops():
+    # Сценарий: замер дешёвой функции с коротким min_time.
+    # Ожидаемый результат: повторов в серии больше одного, время на операцию положительное, median >= min.
+    result = measure("sum", lambda: sum(range(100)), min_time=0.01, repeat=3)
+
+    assert result.loops > 1 and result.repeat == 3
+    assert 0 < result.min_ns <= result.median_ns
+
+
+def test_history_baseline_and_regression_threshold(tmp_path):
+    # Сценарий: база из одного прогона, новый прогон: +5% (ok), +50% (regression), -50% (faster), новый бенчмарк.
+    # Ожидаемый результат: статусы по порогу 10%, история — прогон на строку.
+    base = [BenchResult("a", 100, 90, 10, 5), BenchResult("b", 100, 90, 10, 5), BenchResult("c", 100, 90, 10, 5)]
+    save_baseline(str(tmp_path / "baseline.json"), base)
+
+    current = [BenchResult("a", 105, 100, 10, 5), BenchResult("b", 150, 140, 10, 5),
+               BenchResult("c", 50, 45, 10, 5), BenchResult("d", 1, 1, 10, 5)]
+    append_history(str(tmp_path / "history.jsonl"), base)
+    append_history(str(tmp_path / "history.jsonl"), current)
+
+    compared = compare(current, load_baseline(str(tmp_path / "baseline.json")), threshold=0.10)
+
+    assert [(r.name, status) for r, _, status in compared] == [
+        ("a", "ok"), ("b", "regression"), ("c", "faster"), ("d", "new"),
+    ]
+    assert [len(run["results"]) for run in iter_history(str(tmp_path / "history.jsonl"))] == [3, 4]
@@ -0,0 +1,31 @@
+from checks.patient_checks import assert_valid_patient_response
+from request_modules.create_random_valid_person import build_valid_person
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import generate_openmrs_id
+from src.openmrs_patient import CreatedPatient, Identifier, OpenMRSClient, PatientPayload
+from src.openmrs_standin import OpenMRSStandIn
+
+
+def test_create_patient_with_person_single_request():
+    # Сценарий: пациент с вложенным person через OpenMRSClient.create_patient_with_person на стенде.
+    # Ожидаемый результат: ровно один HTTP-запрос, типизированный ответ с именами и идентификатором,
+    # raw проходит checks/patient_checks.py.
+    with OpenMRSStandIn() as standin:
+        client = OpenMRSClient("admin", "Admin123")
+        identifier_type = next(t for t in standin.identifier_types.values() if t["name"] == "OpenMRS ID")["uuid"]
+        location = next(iter(standin.locations))
+        person = build_valid_person()
+        before = standin.request_count
+
+        patient = client.create_patient_with_person(PatientPayload(
+            person=person,
+            identifiers=[Identifier(identifier=generate_openmrs_id(), identifierType=identifier_type,
+                                    location=location)],
+        ))
+
+        assert standin.request_count - before == 1
+
+    assert isinstance(patient, CreatedPatient)
+    assert patient.person.names[0].givenName == person.names[0].givenName
+    assert patient.person.gender == person.gender
+    assert [(i.identifierType, i.location) for i in patient.identifiers] == [(identifier_type, location)]
+    assert_valid_patient_response(patient.raw)
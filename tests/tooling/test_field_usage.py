@@ -0,0 +1,60 @@
+import dataclasses
+import json
+
+import requests
+
+from src.field_usage import FieldUsageProfiler, TrackedDict
+from src.openmrs_patient import OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn
+from user.get_active_users import extract_privileges, extract_roles
+
+
+def test_report_lists_fetched_but_unused_fields_of_active_users():
+    # Сценарий: активные пользователи с v=full, как в user/get_active_users.py, читаются
+    # только роли и привилегии ролей.
+    # Ожидаемый результат: в отчёте по GET /user v=full прочитанные поля — used с местом вызова,
+    # привилегии пользователя верхнего уровня и person — unused со своей долей байт.
+    client = OpenMRSClient("admin", "Admin123")
+    with OpenMRSStandIn(), FieldUsageProfiler() as profiler:
+        for user in client.iter_results("/user", params={"retired": "false", "v": "full"}):
+            extract_roles(user), extract_privileges(user)
+
+    (row,) = [r for r in profiler.report() if r["endpoint"] == "GET /user"]
+    used = {u["path"]: u for u in row["used"]}
+    unused = {u["path"]: u for u in row["unused"]}
+
+    assert row["representation"] == "full" and row["responses"] == 1
+    assert {"results", "results[].roles", "results[].roles[].privileges",
+            "results[].roles[].privileges[].display"} <= set(used)
+    assert list(used["results[].roles"]["sites"]) == list(row["sites"])
+    assert row["sites"] and all(site.startswith("tests/tooling/test_field_usage.py:") for site in row["sites"])
+    assert {"results[].privileges", "results[].person", "results[].auditInfo"} <= set(unused)
+    # вложенные поля неиспользованного объекта отдельно не перечисляются
+    assert "results[].person.uuid" not in unused
+    assert 0 < row["unused_bytes"] < row["bytes"]
+    assert "GET /user  v=full" in profiler.render()
+
+
+def test_tracked_dict_behaves_like_dict():
+    # Сценарий: ответ отдаётся TrackedDict, затем уходит в json.dumps, asdict-копию и ==.
+    # Ожидаемый результат: обычное поведение dict; после выхода Response.json снова исходный.
+    original = requests.Response.json
+    with OpenMRSStandIn(), FieldUsageProfiler() as profiler:
+        resp = requests.get(f"{OpenMRSClient.BASE_URL}/location", params={"v": "ref"},
+                            auth=("admin", "Admin123"))
+        data = resp.json()
+        location = data["results"][0]
+
+        assert isinstance(data, TrackedDict) and resp.json() is data
+        assert json.loads(json.dumps(location)) == location
+
+        @dataclasses.dataclass
+        class Holder:
+            location: dict
+
+        copied = dataclasses.asdict(Holder(location))["location"]
+        assert copied == location and copied["uuid"] == location["uuid"]
+
+    assert requests.Response.json is original
+    (row,) = profiler.report()
+    assert {u["path"] for u in row["used"]} >= {"results", "results[].uuid", "results[].display"}
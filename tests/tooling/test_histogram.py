@@ -0,0 +1,39 @@
+import math
+import random
+
+from src.histogram import HistogramSet, LatencyHistogram
+
+
+def test_percentiles_stay_within_one_percent_of_exact_values():
+    # Сценарий: 20000 задержек с длинным хвостом (0.1 мс .. 10 с).
+    # Ожидаемый результат: p50/p99/p99.9 из гистограммы отличаются от точных не более чем на 1%.
+    rnd = random.Random(7)
+    values = [math.exp(rnd.uniform(math.log(0.1), math.log(10_000))) for _ in range(20000)]
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+
+    exact = sorted(values)
+    for p, approx in zip((50, 99, 99.9), hist.percentiles((50, 99, 99.9))):
+        expected = exact[math.ceil(p / 100 * len(exact)) - 1]
+        assert abs(approx - expected) <= expected * 0.01 + 0.001
+    assert hist.count == 20000
+    assert hist.max == round(max(values), 3)
+
+
+def test_merge_and_json_round_trip():
+    # Сценарий: два набора (как из двух процессов) по эндпоинтам и статусам, слияние, JSON.
+    # Ожидаемый результат: слитый набор после from_dict даёт те же счётчики и перцентили.
+    a, b = HistogramSet(), HistogramSet()
+    for i in range(100):
+        a.record("POST /patient", 201, 10 + i)
+        b.record("POST /patient", 400, 5)
+        b.record("GET /location", 200, 1)
+
+    merged = HistogramSet.from_dict(a.merge(b).to_dict())
+
+    by_endpoint = dict(merged.by_endpoint())
+    assert by_endpoint["POST /patient"].count == 200
+    assert by_endpoint["GET /location"].count == 100
+    assert merged.get("POST /patient", 201).percentile(50) == a.get("POST /patient", 201).percentile(50)
+    assert len(merged) == 3
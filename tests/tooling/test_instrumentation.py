@@ -0,0 +1,84 @@
+import json
+
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.instrumentation import Instrumentation, JsonlSink, MetricsAggregator, PrometheusTextSink, Sink
+from src.openmrs_patient import OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn
+
+
+BASE_URL = OpenMRSClient.BASE_URL
+AUTH = HTTPBasicAuth("admin", "Admin123")
+
+
+def test_every_call_is_reported_to_all_sinks(tmp_path):
+    # Сценарий: GET списка, GET по uuid и неуспешный POST поверх стенда, три sink'а.
+    # Ожидаемый результат: события с шаблоном эндпоинта, статусом и байтами;
+    # агрегатор и Prometheus-файл считают вызовы по эндпоинтам.
+    events_path, prom_path = tmp_path / "calls.jsonl", tmp_path / "openmrs.prom"
+    metrics = MetricsAggregator()
+
+    with OpenMRSStandIn():
+        with Instrumentation([metrics, JsonlSink(str(events_path)), PrometheusTextSink(str(prom_path))]):
+            location = requests.get(f"{BASE_URL}/location", auth=AUTH).json()["results"][0]
+            requests.get(f"{BASE_URL}/location/{location['uuid']}", auth=AUTH)
+            requests.post(f"{BASE_URL}/visit", json={"patient": "missing"}, auth=AUTH)
+
+    events = [json.loads(line) for line in events_path.read_text(encoding="utf-8").splitlines()]
+    assert [(e["method"], e["endpoint"], e["status"]) for e in events] == [
+        ("GET", "/location", 200),
+        ("GET", "/location/{uuid}", 200),
+        ("POST", "/visit", 400),
+    ]
+    assert events[2]["bytes_out"] == len('{"patient": "missing"}')
+    assert all(e["bytes_in"] > 0 and e["total_ms"] >= e["ttfb_ms"] for e in events)
+
+    totals = metrics.snapshot()
+    assert totals["POST /visit"]["errors"] == 1
+    assert totals["GET /location"]["count"] == 1
+
+    prom = prom_path.read_text(encoding="utf-8")
+    assert 'openmrs_http_requests_total{method="GET",endpoint="/location/{uuid}",status="200"} 1' in prom
+
+
+def test_streamed_responses_are_not_buffered():
+    # Сценарий: GET с stream=True, тело читается кусками; второй такой ответ закрывается непрочитанным.
+    # Ожидаемый результат: до чтения события нет, после — bytes_in по прочитанному;
+    # закрытие без чтения тоже даёт событие.
+    events = []
+
+    class Collect(Sink):
+        def emit(self, event):
+            events.append(event)
+
+    with OpenMRSStandIn():
+        with Instrumentation([Collect()]):
+            resp = requests.get(f"{BASE_URL}/location", auth=AUTH, stream=True)
+            assert events == []
+            body = b"".join(resp.iter_content(chunk_size=64))
+            assert [e.bytes_in for e in events] == [len(body)] and body
+
+            with requests.get(f"{BASE_URL}/location", auth=AUTH, stream=True):
+                pass
+
+    assert len(events) == 2 and events[1].status == 200
+
+
+def test_base_exception_from_inner_adapter_is_not_masked():
+    # Сценарий: внутренний адаптер прерывается KeyboardInterrupt (не Exception).
+    # Ожидаемый результат: наружу выходит KeyboardInterrupt, а не UnboundLocalError из finally.
+    class Interrupted(requests.adapters.BaseAdapter):
+        def send(self, request, **kwargs):
+            raise KeyboardInterrupt
+
+        def close(self):
+            pass
+
+    metrics = MetricsAggregator()
+    with Instrumentation([metrics], inner=Interrupted()):
+        with pytest.raises(KeyboardInterrupt):
+            requests.get(f"{BASE_URL}/location", auth=AUTH)
+
+    assert metrics.snapshot()["GET /location"]["count"] == 1
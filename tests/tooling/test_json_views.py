@@ -0,0 +1,60 @@
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from request_modules.create_random_valid_person import person_from_json
+from src.json_views import FieldNotFetched, PatientView, PersonView
+from src.openmrs_patient import OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn
+
+PATIENT = {
+    "uuid": "p-1",
+    "display": "100-1 - Ann Lee",
+    "person": {
+        "uuid": "p-1",
+        "gender": "F",
+        "preferredName": {"givenName": "Ann", "familyName": "Lee"},
+        "names": [{"givenName": "Ann", "familyName": "Lee"}, {"givenName": "Anna", "familyName": "Lee"},
+                  {"givenName": "NoFamily"}],
+    },
+    "identifiers": [{"identifier": "100-1", "identifierType": {"uuid": "t-1"}, "location": "l-1"}],
+}
+
+
+def test_views_read_source_json_without_copies():
+    # Сценарий: вид пациента, вложенный person, список идентификаторов и листинг из двух ответов.
+    # Ожидаемый результат: значения берутся из исходных dict (те же объекты), ссылки -> uuid,
+    # нет поля — default, strict — FieldNotFetched.
+    patient = PatientView(PATIENT)
+
+    assert patient.raw is PATIENT and patient.person.raw is PATIENT["person"]
+    assert patient.person.names[1].givenName == "Anna" and len(patient.person.names) == 3
+    assert [(i.identifierType, i.location) for i in patient.identifiers] == [("t-1", "l-1")]
+    assert patient.person.birthdate == "" and patient.voided is None
+    assert [p.uuid for p in PatientView.list([PATIENT, {"uuid": "p-2"}])] == ["p-1", "p-2"]
+
+    with pytest.raises(FieldNotFetched, match="birthdate"):
+        PatientView(PATIENT, strict=True).person.birthdate
+
+
+def test_person_from_json_dedupes_names_and_strict_never_fetches():
+    # Сценарий: person с повтором preferredName в names; затем ответ v=ref без имён —
+    # обычный режим догружает v=full со стенда, strict падает без запросов.
+    # Ожидаемый результат: имена без повторов и без неполных; strict — ValueError, 0 запросов.
+    person = person_from_json(PATIENT["person"])
+    assert [(n.givenName, n.familyName) for n in person.names] == [("Ann", "Lee"), ("Anna", "Lee")]
+    assert PersonView(PATIENT["person"]).to_person() == person
+
+    with OpenMRSStandIn() as standin:
+        created = requests.post(f"{OpenMRSClient.BASE_URL}/person", auth=HTTPBasicAuth("admin", "Admin123"), json={
+            "names": [{"givenName": "Ivan", "familyName": "Petrov"}], "gender": "M", "birthdate": "1980-01-01",
+        }).json()
+        ref = {"uuid": created["uuid"], "display": created["display"]}
+        before = standin.request_count
+
+        with pytest.raises(ValueError):
+            person_from_json(ref, strict=True)
+        assert standin.request_count == before
+
+        assert person_from_json(ref).names[0].givenName == "Ivan"
+        assert standin.request_count == before + 1
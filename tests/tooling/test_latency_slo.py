@@ -0,0 +1,73 @@
+import pytest
+
+from src.latency_slo import LatencySLO
+
+pytest_plugins = ["pytester"]
+
+
+TEST_MODULE = """
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.openmrs_patient import OpenMRSClient
+
+URL = OpenMRSClient.BASE_URL + "/location"
+AUTH = HTTPBasicAuth("admin", "Admin123")
+
+
+def fetch(n):
+    for _ in range(n):
+        assert requests.get(URL, auth=AUTH).status_code == 200
+
+
+@pytest.mark.latency_slo("GET /location", p95=60000, samples=5)
+def test_within_slo():
+    fetch(5)
+
+
+@pytest.mark.latency_slo("GET /location", p50=0.0001, samples=5)
+def test_violated():
+    fetch(5)
+
+
+@pytest.mark.latency_slo("GET /location", p50=0.0001, samples=5, mode="warn")
+def test_violated_warn_only():
+    fetch(5)
+
+
+@pytest.mark.latency_slo("GET /location", p95=60000, samples=50)
+def test_too_few_samples():
+    fetch(2)
+"""
+
+
+def test_parse_cli_spec():
+    # Сценарий: разбор SLO из --latency-slo.
+    # Ожидаемый результат: метод в верхнем регистре, p99_9 -> 99.9, n по умолчанию 1; мусор — ValueError.
+    assert LatencySLO.parse("post /patient p95<300 n=20") == LatencySLO("POST /patient", 95, 300, 20)
+    assert LatencySLO.parse("GET /visit/{uuid} p99_9 < 500ms") == LatencySLO("GET /visit/{uuid}", 99.9, 500)
+    with pytest.raises(ValueError):
+        LatencySLO.parse("POST /patient 300")
+
+
+def test_latency_slo_marker_and_session_slo(pytester, request):
+    # Сценарий: тесты со стендом и SLO на GET /location: выполнимый, невыполнимый (fail и warn),
+    # с недостаточным числом замеров; плюс невыполнимый SLO на весь прогон.
+    # Ожидаемый результат: падает только test_violated, warn и мало замеров — предупреждения,
+    # сессия завершается с ошибкой из-за --latency-slo.
+    pytester.makeconftest(request.config.rootpath.joinpath("conftest.py").read_text(encoding="utf-8"))
+    pytester.makepyfile(test_slo=TEST_MODULE)
+    pytester.syspathinsert(request.config.rootpath)
+
+    result = pytester.runpytest("--openmrs=standin", "--latency-slo", "GET /location p99<0.0001 n=10",
+                                "-p", "no:cacheprovider")
+
+    result.assert_outcomes(passed=3, failed=1, warnings=2)
+    result.stdout.fnmatch_lines([
+        "*Latency SLO violated:*",
+        "*GET /location p50 < 0.0001 ms (n >= 5): p50 = *",
+        "*GET /location p95 < 60000 ms (n >= 50): only 2 samples*",
+        "*violated  GET /location p99 < 0.0001 ms (n >= 10): p99 = * ms over 17 samples*",
+    ])
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from load.scenarios import SCENARIOS
+from src.load import StepFailed, endpoint_template, run_load, run_open_loop
+from src.openmrs_standin import OpenMRSStandIn
+
+
+def test_endpoint_template_replaces_uuids():
+    # Сценарий: путь с uuid в середине и query.
+    # Ожидаемый результат: uuid заменён на {uuid}, query отброшен.
+    path = "/visit/3f1c2d4e-0000-4a6b-9c8d-1234567890ab/attribute?v=full"
+    assert endpoint_template(path) == "/visit/{uuid}/attribute"
+
+
+def test_run_load_reports_every_endpoint_of_the_scenario():
+    # Сценарий: 10 запусков patient_visit на стенде, 4 потока.
+    # Ожидаемый результат: по 10 вызовов POST /person, /patient, /visit, метаданные — один раз.
+    with OpenMRSStandIn():
+        stats = run_load(({"scenario": "patient_visit"} for _ in range(10)), SCENARIOS, concurrency=4)
+
+    counts = {row[0]: row[1] for row in stats.rows()}
+    assert counts["POST /person"] == counts["POST /patient"] == counts["POST /visit"] == 10
+    assert counts["GET /location"] == 1
+    assert stats.scenarios == {"patient_visit": {"ok": 10, "failed": 0}}
+
+
+@pytest.mark.parametrize("rate", [None, 200])
+def test_run_load_counts_scenario_exceptions_and_rejects_unknown_names(rate):
+    # Сценарий: сценарий падает на неожиданном статусе и на исключении в коде, в обоих режимах;
+    # затем файл с опечаткой в имени сценария.
+    # Ожидаемый результат: ошибки посчитаны по типам в stats.scenario_errors, прогон дошёл до конца;
+    # опечатка — ValueError до запуска сценариев.
+    def flaky(ctx):
+        if ctx.spec["n"] % 2:
+            ctx.call("GET", "/location/missing-uuid")
+        elif ctx.spec["n"] % 3 == 0:
+            raise KeyError("uuid")
+
+    registry = {"flaky": flaky}
+    with OpenMRSStandIn():
+        stats = run_load(({"scenario": "flaky", "n": n} for n in range(6)), registry, concurrency=2, rate=rate)
+
+        assert stats.scenarios == {"flaky": {"ok": 2, "failed": 4}}
+        assert stats.scenario_errors == {"flaky": {"StepFailed": 3, "KeyError": 1}}
+        assert "404" in stats.error_samples[("flaky", StepFailed.__name__)]
+
+        ran = []
+        with pytest.raises(ValueError, match="Unknown scenario: flakey"):
+            run_load([{"scenario": "flaky", "n": 0}, {"scenario": "flakey"}],
+                     {"flaky": lambda ctx: ran.append(1)}, rate=rate)
+        assert len(ran) <= 1
+
+
+def test_search_patient_uses_the_last_created_identifier():
+    # Сценарий: search_patient до первого create_patient, затем два create_patient и снова поиск.
+    # Ожидаемый результат: первый поиск — q=a без кэширования, последний — по второму identifier.
+    created, queries = [], []
+
+    def recording_create(ctx):
+        SCENARIOS["create_patient"](ctx)
+        created.append(ctx.shared.peek("last_identifier"))
+
+    def recording_search(ctx):
+        queries.append(ctx.shared.peek("last_identifier", "a"))
+        SCENARIOS["search_patient"](ctx)
+
+    registry = {**SCENARIOS, "create_patient": recording_create, "search_patient": recording_search}
+    specs = [{"scenario": "search_patient"}, {"scenario": "create_patient"},
+             {"scenario": "create_patient"}, {"scenario": "search_patient"}]
+    with OpenMRSStandIn():
+        stats = run_load(iter(specs), registry, concurrency=1)
+
+    assert len(set(created)) == 2
+    assert queries == ["a", created[1]]
+    assert stats.scenarios["search_patient"] == {"ok": 2, "failed": 0}
+
+
+def test_open_loop_counts_queueing_behind_a_stalled_server():
+    # Сценарий: сервер отвечает 20 мс, запросы запланированы каждые 5 мс, один рабочий поток.
+    # Ожидаемый результат: время обслуживания ~20 мс, а задержка от плана растёт с очередью.
+    with OpenMRSStandIn() as standin:
+        handle = standin.handle
+
+        def slow_handle(*args):
+            time.sleep(0.02)
+            return handle(*args)
+
+        standin.handle = slow_handle
+        result = run_open_loop((("GET", "/location", None) for _ in range(10)), rate=200, workers=1)
+
+    corrected = {row[0]: row for row in result.corrected.rows((50, 99))}["GET /location"]
+    service = {row[0]: row for row in result.service.rows((50, 99))}["GET /location"]
+    assert result.scheduled == 10
+    assert float(service[5]) < 60
+    assert float(corrected[5]) > 100
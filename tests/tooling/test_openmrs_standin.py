@@ -0,0 +1,48 @@
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.openmrs_patient import OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn, luhn_mod30_is_valid
+
+
+BASE_URL = OpenMRSClient.BASE_URL
+
+
+def test_standin_serves_requests_without_network():
+    # Сценарий: стенд установлен, обычный requests.get под админом и без кредов.
+    # Ожидаемый результат: ответы приходят от стенда, аноним получает 401, после uninstall маршрута нет.
+    with OpenMRSStandIn() as standin:
+        resp = requests.get(f"{BASE_URL}/location", auth=HTTPBasicAuth("admin", "Admin123"),
+                            params={"v": "custom:(uuid,name)"})
+        assert resp.status_code == 200
+        assert set(resp.json()["results"][0]) == {"uuid", "name"}
+
+        assert requests.get(f"{BASE_URL}/location").status_code == 401
+        assert standin.request_count == 2
+
+    assert standin._adapter is None
+
+
+def test_standin_rejects_identifier_with_bad_check_digit():
+    # Сценарий: пациент с OpenMRS ID, у которого неверный контрольный символ.
+    # Ожидаемый результат: 400, а с корректным identifier — 201 и display "OpenMRS ID = ...".
+    standin = OpenMRSStandIn()
+    auth = HTTPBasicAuth("admin", "Admin123")
+    id_type = next(t for t in standin.identifier_types.values() if t["name"] == "OpenMRS ID")
+    location = next(iter(standin.locations))
+
+    def payload(identifier):
+        return {
+            "person": {"names": [{"givenName": "Ivan", "familyName": "Petrov"}], "gender": "M"},
+            "identifiers": [{"identifier": identifier, "identifierType": id_type["uuid"], "location": location}],
+        }
+
+    assert luhn_mod30_is_valid("1000A8") and not luhn_mod30_is_valid("1000A9")
+
+    with standin:
+        bad = requests.post(f"{BASE_URL}/patient", json=payload("1000A9"), auth=auth)
+        good = requests.post(f"{BASE_URL}/patient", json=payload("1000A8"), auth=auth)
+
+    assert bad.status_code == 400
+    assert good.status_code == 201
+    assert good.json()["identifiers"][0]["display"] == "OpenMRS ID = 1000A8"
@@ -0,0 +1,51 @@
+import csv
+import json
+
+from request_modules.create_random_valid_person import get_required_identifier_type_uuid
+from request_modules.locations.get_random_valid_location import get_random_valid_location
+from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import generate_openmrs_id
+from src.patient_import import ImportDefaults, import_patients
+from src.openmrs_standin import OpenMRSStandIn
+from src.patient_index import PATIENT_INDEX
+
+COLUMNS = ["given_name", "family_name", "gender", "birthdate", "identifier", "city_village", "country"]
+
+
+def test_import_creates_valid_rows_and_reports_rejected_and_server_errors(tmp_path):
+    # Сценарий: CSV из 20 корректных строк, строки с неверным gender, датой, повтором identifier
+    # и identifier с неверной контрольной цифрой (отклоняет сервер); затем повторный запуск.
+    # Ожидаемый результат: 20 созданных, 3 rejected и 1 server в файле ошибок с номерами строк;
+    # повторный запуск ничего не создаёт — созданные пропускаются по журналу.
+    ids = [generate_openmrs_id() for _ in range(20)]
+    rows = [[f"Given{i}", "Import", "F", "1990-01-02", ids[i], "Kazan", "Russia"] for i in range(20)]
+    rows += [
+        ["Bad", "Gender", "X", "1990-01-02", generate_openmrs_id(), "", ""],
+        ["Bad", "Date", "M", "02.01.1990", generate_openmrs_id(), "", ""],
+        ["Dup", "Identifier", "M", "1990-01-02", ids[0], "", ""],
+        ["Bad", "Luhn", "M", "1990-01-02", "100000X", "", ""],
+    ]
+    source = tmp_path / "patients.csv"
+    with open(source, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+    errors, journal = tmp_path / "errors.jsonl", tmp_path / "journal.jsonl"
+    with OpenMRSStandIn() as standin:
+        defaults = ImportDefaults(get_required_identifier_type_uuid(), get_random_valid_location()["uuid"])
+        indexed = len(PATIENT_INDEX)
+        report = import_patients(str(source), defaults, error_path=str(errors), journal_path=str(journal),
+                                 concurrency=4)
+
+        assert (report.read, report.created, report.rejected, report.failed) == (24, 20, 3, 1)
+        assert len(PATIENT_INDEX) == indexed
+
+        failed = {e["family_name"]: e for e in map(json.loads, errors.read_text(encoding="utf-8").splitlines())}
+        assert {k: e["_stage"] for k, e in failed.items()} == {
+            "Gender": "rejected", "Date": "rejected", "Identifier": "rejected", "Luhn": "server"}
+        assert failed["Luhn"]["_code"] == 400 and failed["Gender"]["_line"] == 22
+
+        before = standin.request_count
+        again = import_patients(str(source), defaults, journal_path=str(journal))
+        assert (again.created, again.skipped, again.failed) == (0, 20, 1)
+        assert standin.request_count == before + 1
@@ -0,0 +1,69 @@
+import requests
+
+from request_modules.find_patient.find_patient import find_patient_by_identifier
+from src.openmrs_patient import OpenMRSClient
+from src.patient_index import PatientIndex
+
+
+def test_find_patient_answers_from_index_without_http(monkeypatch):
+    # Сценарий: пациент только что создан этим процессом.
+    # Ожидаемый результат: поиск по identifier не делает HTTP-запросов.
+    index = PatientIndex()
+    monkeypatch.setattr("request_modules.find_patient.find_patient.PATIENT_INDEX", index)
+    monkeypatch.setattr(requests, "get", lambda *a, **kw: (_ for _ in ()).throw(AssertionError("no HTTP")))
+
+    created = {"uuid": "p-1", "identifiers": [{"display": "OpenMRS ID = 1000AB"}]}
+    index.add(created, payload={"identifiers": [{"identifier": "1000AB"}]})
+
+    assert find_patient_by_identifier("1000AB") is created
+    assert index.get("1000AB").uuid == "p-1"
+
+
+def test_find_patient_searches_server_when_asked(monkeypatch):
+    # Сценарий: пациент есть в индексе, поиск с search_server=True.
+    # Ожидаемый результат: ответ берётся из GET /patient?q=identifier, а не из индекса.
+    index = PatientIndex()
+    monkeypatch.setattr("request_modules.find_patient.find_patient.PATIENT_INDEX", index)
+    index.add({"uuid": "p-1"}, payload={"identifiers": [{"identifier": "1000AB"}]})
+
+    calls = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"results": [{"uuid": "p-1", "display": "from server"}]}
+
+    monkeypatch.setattr(requests, "get", lambda url, **kw: calls.append(kw["params"]) or Response())
+
+    assert find_patient_by_identifier("1000AB", search_server=True) == {"uuid": "p-1", "display": "from server"}
+    assert calls == [{"q": "1000AB", "v": "default"}]
+
+
+def test_index_evicts_least_recently_used():
+    # Сценарий: индекс на 2 записи, три пациента; перед третьим читаем первого.
+    # Ожидаемый результат: вытеснен второй (давно не использованный), размер не больше max_size.
+    index = PatientIndex(max_size=2)
+    index.add({"uuid": "p-1"}, payload={"identifiers": [{"identifier": "A1"}]})
+    index.add({"uuid": "p-2"}, payload={"identifiers": [{"identifier": "B2"}]})
+    index.get("A1")
+    index.add({"uuid": "p-3"}, payload={"identifiers": [{"identifier": "C3"}]})
+
+    assert len(index) == 2
+    assert index.get("B2") is None and index.get("A1").uuid == "p-1" and index.get("C3").uuid == "p-3"
+
+
+def test_verify_reports_mismatches(monkeypatch):
+    # Сценарий: сервер находит одного пациента, второго нет.
+    # Ожидаемый результат: verify возвращает одно расхождение.
+    index = PatientIndex()
+    index.add({"uuid": "p-1", "identifiers": [{"identifier": "A1"}]})
+    index.add({"uuid": "p-2", "identifiers": [{"identifier": "B2"}]})
+
+    def fake_get_json(self, path, params=None, timeout=30):
+        return {"results": [{"uuid": "p-1"}]} if params["q"] == "A1" else {"results": []}
+
+    monkeypatch.setattr(OpenMRSClient, "get_json", fake_get_json)
+
+    assert index.verify(concurrency=2) == [{"identifier": "B2", "expected_uuid": "p-2", "found_uuid": None}]
@@ -0,0 +1,43 @@
+import copy
+
+from src.payload_mutation import cases, chain, invalid_values, oversize, remove, set_value, wrong_types
+
+BASE = {
+    "person": {"names": [{"givenName": "Ann", "familyName": "Lee"}], "gender": "F", "birthdate": "1990-01-01"},
+    "identifiers": [{"identifier": "100-1", "location": "loc", "preferred": True}],
+}
+
+
+def test_variant_copies_only_the_mutated_path():
+    # Сценарий: мутация person.names.0.givenName, затем удаление person.gender.
+    # Ожидаемый результат: база не изменилась; узлы вне пути — те же объекты (без копий),
+    # узлы на пути — новые.
+    snapshot = copy.deepcopy(BASE)
+
+    variant = set_value("person.names.0.givenName", "").apply(BASE)
+    removed = remove("person.gender").apply(BASE)
+
+    assert BASE == snapshot
+    assert variant["person"]["names"][0] == {"givenName": "", "familyName": "Lee"}
+    assert variant["identifiers"] is BASE["identifiers"]
+    assert variant["person"] is not BASE["person"] and variant["person"]["names"] is not BASE["person"]["names"]
+    assert "gender" not in removed["person"] and removed["person"]["names"] is BASE["person"]["names"]
+
+
+def test_generators_and_parametrize_ids():
+    # Сценарий: матрица для обязательной строки + oversize + цепочка из двух мутаций.
+    # Ожидаемый результат: нет поля / null / не-строки (пустая строка — не «неверный тип»),
+    # читаемые id для pytest, цепочка применяет обе мутации.
+    mutations = list(invalid_values("person.gender"))
+    values = [m.apply(BASE)["person"].get("gender", "<absent>") for m in mutations]
+    assert values == ["<absent>", None, 123, 1.5, True, {}, []]
+
+    assert [type(m.value) for m in wrong_types("person.names", keep=(list,))] == [int, float, bool, str, dict]
+
+    both = chain(oversize("person.names.0.familyName", 51), set_value("identifiers.0.preferred", False))
+    payload = both.apply(BASE)
+    assert len(payload["person"]["names"][0]["familyName"]) == 51 and payload["identifiers"][0]["preferred"] is False
+
+    ids = [p.id for p in cases(*mutations[:2], both)]
+    assert ids == ["person.gender:removed", "person.gender:null",
+                   "person.names.0.familyName:len51+identifiers.0.preferred=False"]
@@ -0,0 +1,46 @@
+pytest_plugins = ["pytester"]
+
+
+TEST_MODULE = """
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.openmrs_patient import OpenMRSClient
+
+URL = OpenMRSClient.BASE_URL + "/location"
+AUTH = HTTPBasicAuth("admin", "Admin123")
+
+
+@pytest.fixture()
+def location():
+    return requests.get(URL, auth=AUTH).json()["results"][0]
+
+
+@pytest.mark.http_budget(2)
+def test_within_budget(location):
+    requests.get(URL + "/" + location["uuid"], auth=AUTH)
+
+
+@pytest.mark.http_budget(2)
+def test_over_budget(location):
+    requests.get(URL, auth=AUTH)
+    requests.get(URL, auth=AUTH)
+"""
+
+
+def test_http_budget_marker_and_repeated_get_detection(pytester, request):
+    # Сценарий: два теста со стендом и бюджетом 2 вызова: в одном 2 вызова, в другом 3 (два одинаковых GET).
+    # Ожидаемый результат: первый проходит, второй падает по бюджету, повтор GET попадает в отчёт.
+    pytester.makeconftest(request.config.rootpath.joinpath("conftest.py").read_text(encoding="utf-8"))
+    pytester.makepyfile(test_budget=TEST_MODULE)
+    pytester.syspathinsert(request.config.rootpath)
+
+    result = pytester.runpytest("--openmrs=standin", "--http-calls", "-p", "no:cacheprovider")
+
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines([
+        "*HTTP budget exceeded: 3 calls > 2 (call: 2, location: 1)*",
+        "*3  test_budget.py::test_over_budget  (repeated GET: 2)*",
+        "*2 / 2    location*",
+    ])
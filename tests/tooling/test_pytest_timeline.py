@@ -0,0 +1,43 @@
+import json
+
+pytest_plugins = ["pytester"]
+
+
+TEST_MODULE = """
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.openmrs_patient import OpenMRSClient
+
+BASE = OpenMRSClient.BASE_URL
+AUTH = HTTPBasicAuth("admin", "Admin123")
+
+
+def test_person_then_locations():
+    person = requests.post(BASE + "/person", auth=AUTH, json={
+        "names": [{"givenName": "Ann", "familyName": "Lee"}], "gender": "F", "birthdate": "1990-01-01",
+    }).json()
+    requests.get(BASE + "/location", auth=AUTH)
+    requests.get(BASE + "/person/" + person["uuid"], auth=AUTH)
+"""
+
+
+def test_timeline_marks_critical_path_and_independent_calls(pytester, request):
+    # Сценарий: POST /person, независимый GET /location, затем GET /person/{uuid} созданного.
+    # Ожидаемый результат: GET /person зависит только от POST, GET /location от него не зависит,
+    # критический путь — POST /person -> GET /person/{uuid}; рядом с JSON лежит HTML.
+    pytester.makeconftest(request.config.rootpath.joinpath("conftest.py").read_text(encoding="utf-8"))
+    pytester.makepyfile(test_timeline=TEST_MODULE)
+    pytester.syspathinsert(request.config.rootpath)
+
+    result = pytester.runpytest("--openmrs=standin", "--http-timeline=timeline.json", "-p", "no:cacheprovider")
+    result.assert_outcomes(passed=1)
+
+    [timeline] = json.loads(pytester.path.joinpath("timeline.json").read_text(encoding="utf-8"))
+    calls = timeline["calls"]
+    assert [c["key"] for c in calls] == ["POST /person", "GET /location", "GET /person/{uuid}"]
+    assert calls[2]["deps"] == [0]
+    assert [c["parallel"] for c in calls] == [False, True, True]  # GET /person не ждёт GET /location
+    assert [c["critical"] for c in calls] == [True, False, True]
+    assert {s["name"] for s in timeline["spans"]} >= {"setup", "call", "teardown"}
+    assert "GET /location" in pytester.path.joinpath("timeline.html").read_text(encoding="utf-8")
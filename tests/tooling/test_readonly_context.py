@@ -0,0 +1,57 @@
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.instrumentation import Instrumentation
+from src.openmrs_patient import OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn
+from src.readonly_context import MutationGuard, ReadOnlyContext
+
+AUTH = HTTPBasicAuth("admin", "Admin123")
+
+
+def _post(path: str, payload: dict) -> int:
+    return requests.post(f"{OpenMRSClient.BASE_URL}{path}", json=payload, auth=AUTH).status_code
+
+
+def _person_context() -> dict:
+    person = requests.post(f"{OpenMRSClient.BASE_URL}/person", auth=AUTH, json={
+        "names": [{"givenName": "Ann", "familyName": "Lee"}], "gender": "F", "birthdate": "1990-01-01",
+    }).json()
+    return {"person_uuid": person["uuid"], "tags": ["a"]}
+
+
+def test_rejected_writes_reuse_the_context_and_accepted_write_discards_it():
+    # Сценарий: три теста шлют отклонённый POST /visit с uuid персоны (400), четвёртый —
+    # принятый POST /user на эту персону (201).
+    # Ожидаемый результат: build один раз на первые три; после принятой записи контекст
+    # выброшен (предупреждение теста), пятый тест получает новый.
+    guard = MutationGuard()
+    with OpenMRSStandIn(), Instrumentation([guard]):
+        shared = ReadOnlyContext(_person_context, guard=guard, watch=("person_uuid",))
+
+        for _ in range(3):
+            with shared.use() as ctx:
+                assert _post("/visit", {"patient": ctx["person_uuid"]}) == 400
+        assert shared.builds == 1 and shared.mutations == []
+
+        with shared.use() as ctx:
+            first = ctx["person_uuid"]
+            assert _post("/user", {"username": "ro_ctx", "password": "Password123",
+                                   "person": first, "roles": []}) == 201
+        with shared.use() as ctx:
+            assert ctx["person_uuid"] != first
+
+    assert shared.builds == 2
+    assert shared.mutations == [f"POST /user -> 201 references {first}"]
+
+
+def test_context_is_read_only_for_the_test():
+    # Сценарий: тест пытается дописать в общий контекст и во вложенный список.
+    # Ожидаемый результат: TypeError / AttributeError сразу, без сети.
+    shared = ReadOnlyContext(lambda: {"patient_uuid": "p", "tags": ["a"]})
+    with shared.use() as ctx:
+        with pytest.raises(TypeError):
+            ctx["patient_uuid"] = "other"
+        with pytest.raises(AttributeError):
+            ctx["tags"].append("b")
@@ -0,0 +1,65 @@
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from src.openmrs_patient import OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn
+from src.recorder import Recorder, ReplayAdapter, ReplayMiss
+
+
+BASE_URL = OpenMRSClient.BASE_URL
+AUTH = HTTPBasicAuth("admin", "Admin123")
+
+
+def test_replay_serves_recorded_responses_in_order(tmp_path):
+    # Сценарий: запись поверх стенда (GET, POST, повторный GET), затем replay без стенда.
+    # Ожидаемый результат: ответы совпадают с записанными, повторы отдаются по порядку,
+    # порядок ключей в JSON-теле на поиск не влияет.
+    path = tmp_path / "requests.jsonl"
+    role = {"name": "Recorder Role", "description": "x"}
+
+    with OpenMRSStandIn():
+        with Recorder(str(path)) as recorder:
+            before = requests.get(f"{BASE_URL}/role", params={"v": "ref", "q": "Recorder"}, auth=AUTH).json()
+            created = requests.post(f"{BASE_URL}/role", json=role, auth=AUTH)
+            after = requests.get(f"{BASE_URL}/role", params={"q": "Recorder", "v": "ref"}, auth=AUTH).json()
+
+    assert recorder.recorded == 3
+
+    with ReplayAdapter(str(path)) as replay:
+        assert requests.get(f"{BASE_URL}/role", params={"q": "Recorder", "v": "ref"}, auth=AUTH).json() == before
+        replayed = requests.post(f"{BASE_URL}/role", json={"description": "x", "name": "Recorder Role"}, auth=AUTH)
+        assert requests.get(f"{BASE_URL}/role", params={"v": "ref", "q": "Recorder"}, auth=AUTH).json() == after
+
+        assert replayed.status_code == created.status_code == 201
+        assert replayed.json() == created.json()
+
+        with pytest.raises(ReplayMiss):
+            requests.get(f"{BASE_URL}/location", auth=AUTH)
+
+    assert len(replay.replayer) == 3
+    assert replay.misses == 1
+    # после with запись закрыта: mmap и файл отпущены
+    assert replay.replayer._file.closed and replay.replayer._data.closed
+
+
+def test_replay_keys_responses_by_user(tmp_path):
+    # Сценарий: admin и пользователь без привилегий шлют одинаковый GET /user, запись;
+    # replay в обратном порядке.
+    # Ожидаемый результат: каждый получает свой ответ (200 / 403), а не чужой по порядку записи.
+    path = tmp_path / "requests.jsonl"
+    low = HTTPBasicAuth("user215", "Password123")
+
+    with OpenMRSStandIn():
+        with Recorder(str(path)):
+            admin_status = requests.get(f"{BASE_URL}/user", auth=AUTH).status_code
+            low_status = requests.get(f"{BASE_URL}/user", auth=low).status_code
+
+    assert admin_status != low_status
+
+    with ReplayAdapter(str(path)):
+        assert requests.get(f"{BASE_URL}/user", auth=low).status_code == low_status
+        assert requests.get(f"{BASE_URL}/user", auth=AUTH).status_code == admin_status
+
+        with pytest.raises(ReplayMiss):
+            requests.get(f"{BASE_URL}/user", auth=HTTPBasicAuth("someone", "x"))
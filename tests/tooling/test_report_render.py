@@ -0,0 +1,87 @@
+import io
+import json
+from itertools import count
+
+import pytest
+
+from src.openmrs_patient import OpenMRSClient
+from src.report_render import render_rows
+
+
+HEADERS = ["Username", "UUID"]
+
+
+def test_render_csv_and_jsonl():
+    # Сценарий: выводим две строки в csv и jsonl.
+    # Ожидаемый результат: заголовок + строки в csv, по объекту на строку в jsonl.
+    rows = [["admin", "u-1"], ["doctor", "u-2"]]
+
+    out = io.StringIO()
+    assert render_rows(HEADERS, rows, fmt="csv", out=out) == 2
+    assert out.getvalue().splitlines() == ["Username,UUID", "admin,u-1", "doctor,u-2"]
+
+    out = io.StringIO()
+    assert render_rows(HEADERS, rows, fmt="jsonl", out=out) == 2
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"Username": "admin", "UUID": "u-1"},
+        {"Username": "doctor", "UUID": "u-2"},
+    ]
+
+
+def test_render_table_widths_from_sample():
+    # Сценарий: ширины считаются по первой строке, третья строка длиннее.
+    # Ожидаемый результат: длинная ячейка обрезается, колонки не "разъезжаются".
+    rows = [["abc", "1"], ["ab", "2"], ["abcdefghijk", "3"]]
+    out = io.StringIO()
+
+    assert render_rows(HEADERS, rows, fmt="table", out=out, sample_size=1) == 3
+
+    lines = out.getvalue().splitlines()
+    assert len({len(line) for line in lines}) == 1
+    assert lines[-1].startswith("abcdefg…")
+
+
+def test_render_table_is_streaming():
+    # Сценарий: бесконечный поток строк, который падает на шестой строке.
+    # Ожидаемый результат: первые строки выведены до того, как рендер запросил следующие,
+    # т.е. поток не вычитывается целиком перед выводом.
+    out = io.StringIO()
+
+    def endless():
+        for i in count():
+            if i == 3:
+                # выборка (2 строки) уже выведена, ещё до чтения третьей
+                assert "user0" in out.getvalue() and "user1" in out.getvalue()
+            if i == 5:
+                raise RuntimeError("stream is endless")
+            yield [f"user{i}", str(i)]
+
+    with pytest.raises(RuntimeError, match="endless"):
+        render_rows(HEADERS, endless(), fmt="table", out=out, sample_size=2)
+
+    assert [line.split()[0] for line in out.getvalue().splitlines()[2:]] == [f"user{i}" for i in range(5)]
+
+
+def test_render_unknown_format():
+    with pytest.raises(ValueError):
+        render_rows(HEADERS, [], fmt="xml")
+
+
+def test_iter_results_follows_next_links(monkeypatch):
+    # Сценарий: сервер отдаёт 2 страницы, у последней нет ссылки next.
+    # Ожидаемый результат: пагинатор отдаёт все элементы и делает ровно 2 запроса.
+    pages = {
+        0: {"results": [{"uuid": "a"}, {"uuid": "b"}], "links": [{"rel": "next"}]},
+        2: {"results": [{"uuid": "c"}]},
+    }
+    calls = []
+
+    def fake_get_json(path, params=None, timeout=30):
+        calls.append(dict(params))
+        return pages[params["startIndex"]]
+
+    client = OpenMRSClient("admin", "Admin123")
+    monkeypatch.setattr(client, "get_json", fake_get_json)
+
+    assert [u["uuid"] for u in client.iter_results("/user", page_size=2)] == ["a", "b", "c"]
+    assert [c["startIndex"] for c in calls] == [0, 2]
@@ -0,0 +1,49 @@
+from checks.patient_checks import validate_patient
+from checks.schema import Obj, SameAs, Str, compile_schema, merge_fields, representation
+from checks.user_checks import validate_user
+from checks.visit_checks import validate_visit
+from src.openmrs_patient import PATIENT_REPRESENTATION, OpenMRSClient
+from src.openmrs_standin import OpenMRSStandIn, parse_custom_representation
+
+
+def _covers(fields: dict, needed: dict) -> bool:
+    return all(
+        name in fields and (fields[name] is None or sub is not None and _covers(fields[name], sub))
+        for name, sub in needed.items()
+    )
+
+
+def test_representation_derived_from_schema_fields():
+    # Сценарий: v= выводится из схемы визита, с полями теста и без; SameAs ссылается на корень.
+    # Ожидаемый результат: только проверяемые поля; поле «целиком» поглощает подполя.
+    assert validate_visit.representation() == (
+        "custom:(uuid,voided,patient:(uuid),visitType:(uuid),startDatetime,location:(uuid))"
+    )
+    assert validate_visit.representation("encounters.uuid", "patient").endswith(
+        "location:(uuid),encounters:(uuid))"
+    )
+    assert "patient," in validate_visit.representation("patient")
+    assert compile_schema(Obj({"person": Obj({"uuid": SameAs("uuid")})}), "p").fields == {
+        "person": {"uuid": None}, "uuid": None,
+    }
+    assert merge_fields({"a": {"b": None}}, {"a": {"c": None}, "d": None}) == {"a": {"b": None, "c": None}, "d": None}
+    assert representation(validate_visit, compile_schema(Obj({"display": Str()}), "x")).endswith(",display)")
+
+
+def test_hand_written_patient_representation_covers_patient_checks():
+    # Сценарий: PATIENT_REPRESENTATION (ответ POST /patient) собран вручную под Person и checks/.
+    # Ожидаемый результат: в нём есть всё, что читает validate_patient.
+    assert _covers(parse_custom_representation(PATIENT_REPRESENTATION), validate_patient.fields)
+
+
+def test_get_checked_returns_only_checked_fields_and_passes():
+    # Сценарий: пользователи стенда через get_checked с v= из validate_user.
+    # Ожидаемый результат: в ответе ровно поля схемы, и он проходит проверку.
+    client = OpenMRSClient("admin", "Admin123")
+    with OpenMRSStandIn():
+        users = client.get_checked("/user", validate_user)["results"]
+        one = client.get_checked(f"/user/{users[0]['uuid']}", validate_user, "username")
+
+    assert users and all(set(u) == set(validate_user.fields) for u in users)
+    validate_user.validate_many(users).assert_ok()
+    assert set(one) == set(validate_user.fields) | {"username"}
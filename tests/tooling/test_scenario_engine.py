@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from src.load import LoadStats, ScenarioContext, SharedCache, StepFailed
+from src.openmrs_standin import OpenMRSStandIn
+from src.scenario_engine import Scenario, ScenarioAssertionFailed
+
+
+def _scenario(steps, **extra) -> Scenario:
+    return Scenario.from_dict({"name": "t", "steps": steps, **extra})
+
+
+def test_variables_flow_between_steps_and_metadata_is_loaded_once():
+    # Сценарий: 3 запуска "создать пользователя -> прочитать его" с общим SharedCache;
+    # роль берётся из метаданных, username из let, uuid — из ответа первого шага.
+    # Ожидаемый результат: GET /role один на все запуски, GET по сохранённому uuid,
+    # "${...}" целиком сохраняет тип (список ролей), частичная подстановка — строка.
+    scenario = _scenario(
+        metadata={"role": {"path": "/role", "where": {"name": "Doctor"}}},
+        let={"username": "${gen.username}"},
+        steps=[
+            {"method": "POST", "path": "/user", "expect": 201, "save": {"user": ""},
+             "json": {"username": "${username}", "password": "Password123",
+                      "person": "${gen.person}", "roles": ["${meta.role}"]}},
+            {"method": "GET", "path": "/user/${user.uuid}", "params": {"v": "full"},
+             "assert": {"display": "${username}", "roles.0.uuid": "${meta.role}"}},
+        ],
+    )
+    shared = SharedCache()
+    with OpenMRSStandIn():
+        stats = LoadStats()
+        results = [scenario(ScenarioContext({}, stats, shared)) for _ in range(3)]
+
+    counts = {row[0]: row[1] for row in stats.rows()}
+    assert counts == {"GET /role": 1, "POST /user": 3, "GET /user/{uuid}": 3}
+    assert len({r["username"] for r in results}) == 3
+    assert results[0]["user"]["username"] == results[0]["username"]
+
+
+def test_shared_cache_loads_keys_concurrently_and_once():
+    # Сценарий: медленная загрузка ключа "slow" и, пока она идёт, загрузка "fast" из другого
+    # потока и повторный get("slow"); loader "nested" сам зовёт get; первый loader "flaky" падает.
+    # Ожидаемый результат: "fast" не ждёт "slow", каждый loader вызван один раз,
+    # вложенный get не зависает, ошибка не кэшируется.
+    shared = SharedCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        release.wait(5)
+        return 1
+
+    results = {}
+    threads = [threading.Thread(target=lambda: results.setdefault("a", shared.get("slow", slow))),
+               threading.Thread(target=lambda: results.setdefault("b", shared.get("slow", slow)))]
+    threads[0].start()
+    started.wait(5)
+    threads[1].start()
+
+    assert shared.get("fast", lambda: 2) == 2
+    assert shared.get("nested", lambda: shared.get("fast", lambda: 3) + 10) == 12
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == {"a": 1, "b": 1} and calls == ["slow"]
+
+    with pytest.raises(ZeroDivisionError):
+        shared.get("flaky", lambda: 1 / 0)
+    assert shared.get("flaky", lambda: "ok") == "ok"
+
+
+def test_unexpected_status_and_failed_assert_stop_the_scenario():
+    # Сценарий: шаг ждёт 201, а стенд отвечает 400; в другом сценарии не сходится assert.
+    # Ожидаемый результат: StepFailed и ScenarioAssertionFailed, следующие шаги не выполняются.
+    bad_status = _scenario([
+        {"method": "POST", "path": "/user", "json": {}, "expect": 201},
+        {"method": "GET", "path": "/user"},
+    ])
+    bad_assert = _scenario([
+        {"method": "GET", "path": "/location", "params": {"v": "ref"}, "assert": {"results.0.display": "Mars"}},
+    ])
+    with OpenMRSStandIn():
+        stats = LoadStats()
+        with pytest.raises(StepFailed):
+            bad_status(ScenarioContext({}, stats, SharedCache()))
+        with pytest.raises(ScenarioAssertionFailed, match="results.0.display"):
+            bad_assert(ScenarioContext({}, stats, SharedCache()))
+
+    assert [row[0] for row in stats.rows()] == ["GET /location", "POST /user"]
+
+
+def test_format_errors_are_reported_at_load_time():
+    # Сценарий: переменная до save, неизвестные meta / gen.
+    # Ожидаемый результат: ValueError при разборе сценария.
+    with pytest.raises(ValueError, match="'visit' is used before"):
+        _scenario([{"method": "GET", "path": "/visit/${visit}"}])
+    with pytest.raises(ValueError, match="unknown metadata"):
+        _scenario([{"method": "GET", "path": "/location/${meta.location}"}])
+    with pytest.raises(ValueError, match="unknown generator"):
+        _scenario([{"method": "POST", "path": "/person", "json": "${gen.patient}"}])
@@ -0,0 +1,70 @@
+import pytest
+import requests
+from requests.auth import HTTPBasicAuth
+
+from checks.schema import Contains, Is, ListOf, Obj, Opt, Param, RefOrUuid, Str, compile_schema
+from checks.user_checks import validate_user
+from src.openmrs_standin import OpenMRSStandIn
+
+BASE_URL = "http://localhost/openmrs/ws/rest/v1"
+
+SCHEMA = Obj({
+    "uuid": Str(nonempty=True),
+    "voided": Opt(Is(False)),
+    "patient": RefOrUuid("patient_uuid"),
+    "tags": ListOf(Obj({"display": Str(blank=False)})),
+    "identifiers": ListOf(where=Contains("display", "OpenMRS ID"), min_matches=1),
+})
+
+VALID = {"uuid": "v-1", "patient": {"uuid": "p-1"}, "tags": [{"display": "a"}],
+         "identifiers": [{"display": "Old ID = 1"}, {"display": "OpenMRS ID = 100-1"}]}
+
+
+def test_all_errors_reported_with_paths():
+    # Сценарий: ответ с несколькими ошибками сразу, в том числе внутри списка.
+    # Ожидаемый результат: все ошибки одним списком, путь с индексом элемента, «missing» для нет поля.
+    validate = compile_schema(SCHEMA, "visit")
+    bad = {"voided": True, "patient": "p-2", "tags": [{"display": "x"}, {"display": "  "}],
+           "identifiers": [{"display": "Old ID = 1"}]}
+
+    errors = validate(bad, patient_uuid="p-1")
+
+    assert validate(VALID, patient_uuid="p-1") == []
+    assert errors[0] == "$.uuid: missing"
+    assert errors[1] == "$.voided: expected False, got True"
+    assert errors[2] == "$.patient: expected reference to patient_uuid, got 'p-2'"
+    assert "$.tags[1].display: blank string, got '  '" in errors
+    assert errors[-1] == "$.identifiers: expected at least 1 item(s) with 'OpenMRS ID' in display"
+    with pytest.raises(AssertionError, match=r"Invalid visit response:\n\$\.uuid: missing"):
+        validate.assert_valid(bad, patient_uuid="p-1")
+
+
+def test_validate_many_shared_and_per_item_params():
+    # Сценарий: пакет из трёх ответов, patient_uuid — на каждый элемент, code — общий.
+    # Ожидаемый результат: в отчёте индексы всех плохих ответов; без параметра или с разными
+    # ключами параметров у элементов — TypeError с индексом элемента.
+    validate = compile_schema(Obj({"patient": RefOrUuid("patient_uuid"), "code": Param("code")}), "item")
+    values = [{"patient": "a", "code": 1}, {"patient": "x", "code": 1}, {"patient": {"uuid": "c"}, "code": 2}]
+
+    report = validate.validate_many(values, per_item=[{"patient_uuid": u} for u in "abc"], code=1)
+
+    assert report.total == 3 and not report.ok
+    assert [index for index, _ in report.failures] == [1, 2]
+    assert "$.code: expected code, got 2" in report.summary()
+    with pytest.raises(TypeError, match="code"):
+        validate.validate_many(values, per_item=[{"patient_uuid": u} for u in "abc"])
+    with pytest.raises(TypeError, match=r"per_item\[2\] has params code, patient_uuid"):
+        validate.validate_many(values, per_item=[{"patient_uuid": "a"}, {"patient_uuid": "x"},
+                                                 {"patient_uuid": "c", "code": 2}], code=1)
+
+
+def test_standin_users_pass_user_schema_in_one_batch():
+    # Сценарий: весь список /user?v=default стенда проверяется одним вызовом.
+    # Ожидаемый результат: ошибок нет.
+    with OpenMRSStandIn():
+        users = requests.get(f"{BASE_URL}/user", params={"v": "default"},
+                             auth=HTTPBasicAuth("admin", "Admin123")).json()["results"]
+
+    assert users
+
+    validate_user.validate_many(users).assert_ok()
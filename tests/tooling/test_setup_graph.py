@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from src.setup_graph import SetupGraph
+
+
+def test_independent_steps_run_concurrently_and_are_memoized():
+    # Сценарий: a и b (по 0.2 с) независимы, c зависит от обоих; a — session-шаг.
+    # Ожидаемый результат: время ~ критический путь (< суммы), каждый шаг выполнен один раз на область,
+    # a общий для двух function-областей.
+    graph = SetupGraph()
+    calls = []
+    lock = threading.Lock()
+
+    def track(name, value):
+        with lock:
+            calls.append(name)
+        time.sleep(0.2)
+        return value
+
+    graph.add("a", lambda: track("a", 1), scope="session")
+    graph.add("b", lambda: track("b", 2))
+
+    @graph.step()
+    def c(a, b):
+        return a + b
+
+    scope = graph.scope()
+    started = time.perf_counter()
+    assert scope.resolve("c", "a") == {"c": 3, "a": 1}
+    assert time.perf_counter() - started < 0.35
+    assert scope.get("c") == 3
+
+    assert graph.scope().get("c") == 3
+    assert sorted(calls) == ["a", "b", "b"]
+
+
+def test_failure_propagates_and_cycles_are_rejected():
+    # Сценарий: шаг падает — зависимый шаг получает то же исключение; граф с циклом не запускается.
+    # Ожидаемый результат: ValueError от шага у зависимого, ValueError с описанием цикла.
+    graph = SetupGraph()
+
+    @graph.step()
+    def broken():
+        raise ValueError("boom")
+
+    @graph.step()
+    def dependent(broken):
+        return broken
+
+    with pytest.raises(ValueError, match="boom"):
+        graph.scope().get("dependent")
+
+    graph.add("x", lambda y: y, needs=("y",))
+    graph.add("y", lambda x: x, needs=("x",))
+    with pytest.raises(ValueError, match="cycle"):
+        graph.scope().get("x")
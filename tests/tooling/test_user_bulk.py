@@ -0,0 +1,109 @@
+import json
+import threading
+
+from src.openmrs_patient import OpenMRSClient, OpenMRSError
+from src.user_bulk import bulk_user_action, numbered_user_specs, provision_users
+
+
+ROLES = ["role-a", "role-b"]
+
+
+def test_provision_users_treats_409_as_success_and_resumes(tmp_path, monkeypatch):
+    # Сценарий: user2 уже существует (409), user3 падает с 500 в первом запуске.
+    # Ожидаемый результат: повторный запуск шлёт POST только для user3.
+    journal = tmp_path / "journal.jsonl"
+    posted = []
+    lock = threading.Lock()
+    broken = {"user3"}
+
+    def fake_create_user(self, payload):
+        with lock:
+            posted.append(payload["username"])
+        if payload["username"] == "user2":
+            raise OpenMRSError(409, "already exists")
+        if payload["username"] in broken:
+            raise OpenMRSError(500, "boom")
+        return {"uuid": f"uuid-{payload['username']}"}
+
+    monkeypatch.setattr(OpenMRSClient, "create_user", fake_create_user)
+
+    specs = list(numbered_user_specs("user", 0, ROLES, count=4))
+    report = provision_users(specs, journal_path=str(journal), concurrency=3)
+
+    assert report.count("created") == 2
+    assert report.count("exists") == 1
+    assert [f["key"] for f in report.failed] == ["user3"]
+    assert len(journal.read_text().splitlines()) == 4
+
+    # повторный запуск: сервер починили
+    broken.clear()
+    posted.clear()
+    report = provision_users(specs, journal_path=str(journal), concurrency=3)
+
+    assert posted == ["user3"]
+    assert report.summary() == "created: 1"
+
+
+def test_numbered_user_specs_round_robin_roles():
+    specs = list(numbered_user_specs("user", 200, ROLES, count=3))
+
+    assert [s.username for s in specs] == ["user200", "user201", "user202"]
+    assert [s.to_payload()["roles"] for s in specs] == [
+        [{"uuid": "role-a"}],
+        [{"uuid": "role-b"}],
+        [{"uuid": "role-a"}],
+    ]
+    assert json.dumps(specs[0].to_payload())
+
+
+def test_bulk_retire_resolves_usernames_in_one_pass(tmp_path, monkeypatch):
+    # Сценарий: user1 есть в журнале провижининга, user2 — только на сервере, ghost — нигде.
+    # Ожидаемый результат: один проход по /user, retire для двух uuid, ghost -> not_found.
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(json.dumps({"key": "user1", "status": "created", "uuid": "uuid-1"}) + "\n")
+
+    listed = []
+    retired = []
+
+    def fake_iter_results(self, path, params=None, page_size=100):
+        listed.append(path)
+        yield {"username": "admin", "uuid": "uuid-admin"}
+        yield {"username": "user2", "uuid": "uuid-2"}
+        yield {"username": "user3", "uuid": "uuid-3"}
+
+    def fake_retire_user(self, user_uuid, reason):
+        retired.append(user_uuid)
+
+    monkeypatch.setattr(OpenMRSClient, "iter_results", fake_iter_results)
+    monkeypatch.setattr(OpenMRSClient, "retire_user", fake_retire_user)
+
+    dry = bulk_user_action(["user1", "user2", "ghost"], "retire", dry_run=True, mirror_path=str(journal))
+    assert dry.summary() == "dry_run: 2, not_found: 1"
+    assert retired == []
+
+    report = bulk_user_action(["user1", "user2", "ghost"], "retire", mirror_path=str(journal))
+    assert sorted(retired) == ["uuid-1", "uuid-2"]
+    assert report.summary() == "not_found: 1, retired: 2"
+    assert listed == ["/user", "/user"]
+
+
+def test_purged_users_are_resolved_again_instead_of_using_the_mirror(tmp_path, monkeypatch):
+    # Сценарий: user1 создан (журнал), затем purge через bulk_user_action с тем же зеркалом;
+    # на сервере user1 создан заново с новым uuid, retire.
+    # Ожидаемый результат: purge записан в зеркало, retire идёт по новому uuid из /user, а не в 404.
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(json.dumps({"key": "user1", "status": "created", "uuid": "uuid-old"}) + "\n")
+    purged, retired = [], []
+
+    def fake_iter_results(self, path, params=None, page_size=100):
+        yield {"username": "user1", "uuid": "uuid-new"}
+
+    monkeypatch.setattr(OpenMRSClient, "iter_results", fake_iter_results)
+    monkeypatch.setattr(OpenMRSClient, "purge_user", lambda self, user_uuid: purged.append(user_uuid))
+    monkeypatch.setattr(OpenMRSClient, "retire_user", lambda self, user_uuid, reason: retired.append(user_uuid))
+
+    assert bulk_user_action(["user1"], "purge", mirror_path=str(journal)).summary() == "purged: 1"
+    report = bulk_user_action(["user1"], "retire", mirror_path=str(journal))
+
+    assert purged == ["uuid-old"] and retired == ["uuid-new"]
+    assert report.summary() == "retired: 1"
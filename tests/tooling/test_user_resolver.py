@@ -0,0 +1,81 @@
+from src.openmrs_patient import OpenMRSClient
+from src.user_resolver import UserResolver
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_resolver(monkeypatch, users, **kwargs):
+    calls = []
+
+    def fake_get_json(self, path, params=None, timeout=30):
+        calls.append(params["q"])
+        return {"results": [u for u in users if params["q"] in u["username"]]}
+
+    monkeypatch.setattr(OpenMRSClient, "get_json", fake_get_json)
+    clock = FakeClock()
+    resolver = UserResolver(client=OpenMRSClient("admin", "Admin123"), clock=clock, **kwargs)
+    return resolver, calls, clock
+
+
+def test_resolver_caches_hits_and_misses(monkeypatch):
+    # Сценарий: повторно резолвим существующее и несуществующее имя.
+    # Ожидаемый результат: на сервер уходит по одному запросу на имя; q= сверяется точно.
+    users = [{"username": "user124", "uuid": "u-124"}, {"username": "user1245", "uuid": "u-1245"}]
+    resolver, calls, clock = make_resolver(monkeypatch, users, ttl=10, negative_ttl=5)
+
+    for _ in range(50):
+        assert resolver.resolve("user124") == "u-124"
+        assert resolver.resolve("deleted_user_does_not_exist_999") is None
+    assert calls == ["user124", "deleted_user_does_not_exist_999"]
+
+    # negative TTL короче положительного
+    clock.now = 6
+    resolver.resolve("user124")
+    resolver.resolve("deleted_user_does_not_exist_999")
+    assert calls[2:] == ["deleted_user_does_not_exist_999"]
+
+
+def test_resolver_lru_bound(monkeypatch):
+    users = [{"username": f"user{i}", "uuid": f"u-{i}"} for i in range(5)]
+    resolver, calls, _ = make_resolver(monkeypatch, users, max_size=2)
+
+    resolver.resolve("user0")
+    resolver.resolve("user1")
+    resolver.resolve("user0")
+    resolver.resolve("user2")  # вытесняет user1
+
+    assert resolver.stats()["size"] == 2
+    assert resolver.cached("user0") == (True, "u-0")
+    assert resolver.cached("user1") == (False, None)
+
+
+def test_resolver_invalidated_by_client_mutations(monkeypatch):
+    # Сценарий: имя закэшировано как несуществующее, затем клиент создаёт пользователя.
+    # Ожидаемый результат: негативная запись сброшена; purge сбрасывает запись по uuid.
+    users = []
+    resolver, calls, _ = make_resolver(monkeypatch, users)
+
+    assert resolver.resolve("user300") is None
+
+    class Resp:
+        status_code = 201
+        text = ""
+
+        def json(self):
+            return {"uuid": "u-300"}
+
+    client = OpenMRSClient("admin", "Admin123")
+    monkeypatch.setattr(client.session, "post", lambda *a, **kw: Resp())
+    client.create_user({"username": "user300"})
+    assert resolver.cached("user300") == (False, None)
+
+    resolver.remember("user300", "u-300")
+    monkeypatch.setattr(OpenMRSClient, "_delete", lambda self, path, params=None: None)
+    client.purge_user("u-300")
+    assert resolver.cached("user300") == (False, None)
@@ -12,12 +12,12 @@ from requests.auth import HTTPBasicAuth
 
 from checks.visit_checks import assert_valid_visit_response
 
-from request_modules.create_random_valid_person import create_valid_person
-from request_modules.create_valid_patient_with_person import create_valid_patient_with_person
+from request_modules.create_random_valid_person import build_valid_person
+from request_modules.create_valid_patient_with_person import create_patient_one_request
 from request_modules.locations.get_random_valid_location import get_random_valid_location
 from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import get_openmrs_id_identifier
 from request_modules.visittype.get_random_valid_visit_type import get_random_valid_visit_type
-from request_modules.visit.create_visit import create_visit, fetch_visit_full
+from request_modules.visit.create_visit import create_visit, fetch_visit
 
 
 # -------------------------
@@ -59,11 +59,11 @@ def patient_context() -> dict:
     Создаём пациента под админом (чтобы затем проверять права на /visit
     отдельно от прав на создание пациента).
     """
-    person = create_valid_person()
+    person = build_valid_person()
     location_uuid = get_random_valid_location()["uuid"]
     identifier_type_uuid, identifier_value = get_openmrs_id_identifier()
 
-    patient_json = create_valid_patient_with_person(
+    patient = create_patient_one_request(
         username=ADMIN_USERNAME,
         password=ADMIN_PASSWORD,
         person=person,
@@ -73,7 +73,7 @@ def patient_context() -> dict:
     )
 
     return {
-        "patient_uuid": patient_json["uuid"],
+        "patient_uuid": patient.uuid,
         "location_uuid": location_uuid,
     }
 
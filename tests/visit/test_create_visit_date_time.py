@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Mapping
 from datetime import datetime, timezone, timedelta
 
 import pytest
@@ -12,12 +13,13 @@ from requests.auth import HTTPBasicAuth
 
 from checks.visit_checks import assert_valid_visit_response
 
-from request_modules.create_random_valid_person import create_valid_person
-from request_modules.create_valid_patient_with_person import create_valid_patient_with_person
+from request_modules.create_random_valid_person import build_valid_person
+from request_modules.create_valid_patient_with_person import create_patient_one_request
 from request_modules.locations.get_random_valid_location import get_random_valid_location
 from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import get_openmrs_id_identifier
 from request_modules.visittype.get_random_valid_visit_type import get_random_valid_visit_type
-from request_modules.visit.create_visit import create_visit, fetch_visit_full
+from request_modules.visit.create_visit import create_visit, fetch_visit
+from request_modules.visit.visit_setup import shared_patient, shared_patient_context  # noqa: F401
 
 
 # -------------------------
@@ -59,11 +61,11 @@ def patient_context() -> dict:
     Создаём пациента под админом (чтобы затем проверять права на /visit
     отдельно от прав на создание пациента).
     """
-    person = create_valid_person()
+    person = build_valid_person()
     location_uuid = get_random_valid_location()["uuid"]
     identifier_type_uuid, identifier_value = get_openmrs_id_identifier()
 
-    patient_json = create_valid_patient_with_person(
+    patient = create_patient_one_request(
         username=ADMIN_USERNAME,
         password=ADMIN_PASSWORD,
         person=person,
@@ -73,7 +75,7 @@ def patient_context() -> dict:
     )
 
     return {
-        "patient_uuid": patient_json["uuid"],
+        "patient_uuid": patient.uuid,
         "location_uuid": location_uuid,
     }
 
@@ -115,7 +117,7 @@ def test_create_visit_in_the_past_success(patient_context: dict, visit_type_uuid
         location_uuid=location_uuid,
     )
 
-    full = fetch_visit_full(username=ADMIN_USERNAME, password=ADMIN_PASSWORD, visit_uuid=visit["uuid"])
+    full = fetch_visit(username=ADMIN_USERNAME, password=ADMIN_PASSWORD, visit_uuid=visit["uuid"])
     assert_valid_visit_response(
         full,
         patient_uuid=patient_uuid,
@@ -152,7 +154,7 @@ def test_create_visit_in_far_future(patient_context: dict, visit_type_uuid: str)
             location_uuid=location_uuid,
         )
 
-        full = fetch_visit_full(username=ADMIN_USERNAME, password=ADMIN_PASSWORD, visit_uuid=visit["uuid"])
+        full = fetch_visit(username=ADMIN_USERNAME, password=ADMIN_PASSWORD, visit_uuid=visit["uuid"])
         assert_valid_visit_response(
             full,
             patient_uuid=patient_uuid,
@@ -206,9 +208,9 @@ def test_create_visit_stop_before_start_rejected(patient_context: dict, visit_ty
         "not-a-date",
     ],
 )
-def test_create_visit_invalid_start_datetime(patient_context: dict, visit_type_uuid: str, bad_start):
-    patient_uuid = patient_context["patient_uuid"]
-    location_uuid = patient_context["location_uuid"]
+def test_create_visit_invalid_start_datetime(shared_patient_context: Mapping, visit_type_uuid: str, bad_start):
+    patient_uuid = shared_patient_context["patient_uuid"]
+    location_uuid = shared_patient_context["location_uuid"]
 
     payload = {
         "patient": patient_uuid,
@@ -238,9 +240,9 @@ def test_create_visit_invalid_start_datetime(patient_context: dict, visit_type_u
         123,
     ],
 )
-def test_create_visit_invalid_stop_datetime_format(patient_context: dict, visit_type_uuid: str, bad_stop):
-    patient_uuid = patient_context["patient_uuid"]
-    location_uuid = patient_context["location_uuid"]
+def test_create_visit_invalid_stop_datetime_format(shared_patient_context: Mapping, visit_type_uuid: str, bad_stop):
+    patient_uuid = shared_patient_context["patient_uuid"]
+    location_uuid = shared_patient_context["location_uuid"]
 
     payload = {
         "patient": patient_uuid,
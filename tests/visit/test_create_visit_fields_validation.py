@@ -2,17 +2,15 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Mapping
 from datetime import datetime, timezone
 
 import pytest
 import requests
 from requests.auth import HTTPBasicAuth
 
-from request_modules.create_random_valid_person import create_valid_person
-from request_modules.create_valid_patient_with_person import create_valid_patient_with_person
-from request_modules.locations.get_random_valid_location import get_random_valid_location
-from request_modules.patientidentifiertype.get_random_valid_patient_identifier_type import get_openmrs_id_identifier
-from request_modules.visittype.get_random_valid_visit_type import get_random_valid_visit_type
+from checks.visit_checks import validate_visit
+from request_modules.visit.visit_setup import shared_patient, shared_patient_context, visit_setup  # noqa: F401
 
 
 # -------------------------
@@ -89,12 +87,12 @@ def post_visit_raw(*, username: str, password: str, payload: dict) -> requests.R
     )
 
 
-def fetch_visit_full(visit_uuid: str) -> dict:
+def fetch_visit(visit_uuid: str) -> dict:
     resp = get_json(
         f"/visit/{visit_uuid}",
         username=ADMIN_USERNAME,
         password=ADMIN_PASSWORD,
-        params={"v": "full"},
+        params={"v": validate_visit.representation()},
     )
     resp.raise_for_status()
     return resp.json()
@@ -126,29 +124,13 @@ def create_visit_raw(
 # fixtures
 # -------------------------
 @pytest.fixture()
-def patient_context() -> dict:
-    person = create_valid_person()
-    location_uuid = get_random_valid_location()["uuid"]
-    identifier_type_uuid, identifier_value = get_openmrs_id_identifier()
-
-    patient_json = create_valid_patient_with_person(
-        username=ADMIN_USERNAME,
-        password=ADMIN_PASSWORD,
-        person=person,
-        location=location_uuid,
-        identifier_type=identifier_type_uuid,
-        patient_identifier=identifier_value,
-    )
-
-    return {
-        "patient_uuid": patient_json["uuid"],
-        "location_uuid": location_uuid,
-    }
+def patient_context(visit_setup) -> dict:
+    return visit_setup.get("patient_context")
 
 
 @pytest.fixture()
-def visit_type_uuid() -> str:
-    return get_random_valid_visit_type()["uuid"]
+def visit_type_uuid(visit_setup) -> str:
+    return visit_setup.get("visit_type_uuid")
 
 
 # -------------------------
@@ -160,12 +142,12 @@ def visit_type_uuid() -> str:
     "bad_patient",
     [None, "", "not-a-uuid", str(uuid.uuid4())],
 )
-def test_create_visit_invalid_patient_field(patient_context: dict, visit_type_uuid: str, bad_patient):
+def test_create_visit_invalid_patient_field(shared_patient_context: Mapping, visit_type_uuid: str, bad_patient):
     payload = {
         "patient": bad_patient,
         "visitType": visit_type_uuid,
         "startDatetime": iso_utc(datetime.now(timezone.utc)),
-        "location": patient_context["location_uuid"],
+        "location": shared_patient_context["location_uuid"],
     }
 
     resp = post_visit_raw(username=ADMIN_USERNAME, password=ADMIN_PASSWORD, payload=payload)
@@ -178,12 +160,12 @@ def test_create_visit_invalid_patient_field(patient_context: dict, visit_type_uu
     "bad_visit_type",
     [None, "", "not-a-uuid", str(uuid.uuid4())],
 )
-def test_create_visit_invalid_visit_type_field(patient_context: dict, bad_visit_type):
+def test_create_visit_invalid_visit_type_field(shared_patient_context: Mapping, bad_visit_type):
     payload = {
-        "patient": patient_context["patient_uuid"],
+        "patient": shared_patient_context["patient_uuid"],
         "visitType": bad_visit_type,
         "startDatetime": iso_utc(datetime.now(timezone.utc)),
-        "location": patient_context["location_uuid"],
+        "location": shared_patient_context["location_uuid"],
     }
 
     resp = post_visit_raw(username=ADMIN_USERNAME, password=ADMIN_PASSWORD, payload=payload)
@@ -196,9 +178,9 @@ def test_create_visit_invalid_visit_type_field(patient_context: dict, bad_visit_
     "bad_location",
     [None, "", "abc", str(uuid.uuid4())],
 )
-def test_create_visit_invalid_location(patient_context: dict, visit_type_uuid: str, bad_location):
+def test_create_visit_invalid_location(shared_patient_context: Mapping, visit_type_uuid: str, bad_location):
     payload = {
-        "patient": patient_context["patient_uuid"],
+        "patient": shared_patient_context["patient_uuid"],
         "visitType": visit_type_uuid,
         "startDatetime": iso_utc(datetime.now(timezone.utc)),
         "location": bad_location,
@@ -221,11 +203,11 @@ def test_create_visit_with_indication_success(patient_context: dict, visit_type_
 
 # TC-129 https://app.testiny.io/p/1/testcases/tcf/50/tc/129/
 @pytest.mark.parametrize("bad_indication", [123, {"a": 1}, ["x"], True])
-def test_create_visit_invalid_indication_type(patient_context: dict, visit_type_uuid: str, bad_indication):
+def test_create_visit_invalid_indication_type(shared_patient_context: Mapping, visit_type_uuid: str, bad_indication):
     resp = create_visit_raw(
-        patient_uuid=patient_context["patient_uuid"],
+        patient_uuid=shared_patient_context["patient_uuid"],
         visit_type_uuid=visit_type_uuid,
-        location_uuid=patient_context["location_uuid"],
+        location_uuid=shared_patient_context["location_uuid"],
         indication=bad_indication,
     )
     assert resp.status_code in (400)
@@ -246,11 +228,11 @@ def test_create_visit_without_encounters_success(patient_context: dict, visit_ty
     "bad_encounters",
     ["not-an-array", {"uuid": "x"}, [None], ["not-a-uuid"], [str(uuid.uuid4())]],
 )
-def test_create_visit_invalid_encounters_field(patient_context: dict, visit_type_uuid: str, bad_encounters):
+def test_create_visit_invalid_encounters_field(shared_patient_context: Mapping, visit_type_uuid: str, bad_encounters):
     resp = create_visit_raw(
-        patient_uuid=patient_context["patient_uuid"],
+        patient_uuid=shared_patient_context["patient_uuid"],
         visit_type_uuid=visit_type_uuid,
-        location_uuid=patient_context["location_uuid"],
+        location_uuid=shared_patient_context["location_uuid"],
         encounters=bad_encounters,
     )
     assert_500_is_xfail(resp)
@@ -1,8 +1,4 @@
-import requests
-from requests.auth import HTTPBasicAuth
-
-BASE_URL = "http://localhost/openmrs/ws/rest/v1"
-auth = HTTPBasicAuth("admin", "Admin123")
+from src.user_bulk import numbered_user_specs, provision_users
 
 ROLE_UUIDS = [
     "246f8412-01fb-4e55-86d7-6441cd1b81a5",
@@ -38,40 +34,16 @@ ROLE_UUIDS = [
 
 START_USER = 200  # user100
 
+CONCURRENCY = 8
+JOURNAL_PATH = "create_all_users_with_all_roles.journal.jsonl"
 
-def create_user(user_number: int, role_uuid: str):
-    payload = {
-        "username": f"user{user_number}",
-        "password": "Password123",
-        "systemId": str(user_number),
-        "person": {
-            "names": [{"givenName": f"Demo{user_number}", "familyName": "User"}],
-            "gender": "M",
-            "birthdate": "1997-09-02",
-        },
-        # ✅ РОВНО ОДНА РОЛЬ на пользователя
-        "roles": [{"uuid": role_uuid}],
-    }
-
-    r = requests.post(
-        f"{BASE_URL}/user",
-        json=payload,
-        headers={"Accept": "application/json", "Content-Type": "application/json"},
-        auth=auth,
-        timeout=30,
-    )
-
-    print(f"user{user_number} (role {role_uuid}) -> status {r.status_code}")
-    if r.status_code == 409:
-        print("User already exists, skipping.\n")
-        return
 
-    print(r.text)
-    r.raise_for_status()
-    print()
+if __name__ == "__main__":
+    # ✅ РОВНО ОДНА РОЛЬ на пользователя; повторный запуск продолжает по журналу
+    specs = numbered_user_specs("user", START_USER, ROLE_UUIDS)
+    report = provision_users(specs, journal_path=JOURNAL_PATH, concurrency=CONCURRENCY)
 
+    for failed in report.failed:
+        print(f"❌ {failed['key']} -> {failed.get('code', '-')}: {failed.get('error', '')[:200]}")
 
-if __name__ == "__main__":
-    for i, role_uuid in enumerate(ROLE_UUIDS):
-        user_number = START_USER + i
-        create_user(user_number, role_uuid)
+    print(f"\nГотово: {report.summary()}")
@@ -1,6 +1,9 @@
 import requests
 from requests.auth import HTTPBasicAuth
 
+from src.user_bulk import bulk_user_action
+from src.user_resolver import default_resolver
+
 BASE_URL = "http://localhost/openmrs/ws/rest/v1"
 auth = HTTPBasicAuth("admin", "Admin123")
 
@@ -11,21 +14,8 @@ HEADERS = {
 
 
 def get_user_uuid(username: str) -> str | None:
-    """Получить UUID пользователя по username"""
-    r = requests.get(
-        f"{BASE_URL}/user",
-        params={"q": username},
-        headers=HEADERS,
-        auth=auth,
-        timeout=30,
-    )
-    r.raise_for_status()
-
-    results = r.json().get("results", [])
-    if not results:
-        return None
-
-    return results[0]["uuid"]
+    """Получить UUID пользователя по username (через общий кэш, в т.ч. для несуществующих)"""
+    return default_resolver().resolve(username)
 
 
 def delete_user(username: str):
@@ -42,6 +32,8 @@ def delete_user(username: str):
         timeout=30,
     )
 
+    default_resolver().invalidate(username=username, user_uuid=user_uuid)
+
     if r.status_code in (200, 204):
         print(f"✅ User '{username}' deleted")
     else:
@@ -49,5 +41,21 @@ def delete_user(username: str):
         print(r.text)
 
 
+def delete_users(usernames: list[str], dry_run: bool = False):
+    """Удалить (purge) сразу много пользователей: один проход по /user вместо поиска на каждого"""
+    report = bulk_user_action(usernames, "purge", dry_run=dry_run)
+
+    for result in report.results:
+        if result["status"] == "failed":
+            print(f"⚠️ Failed to delete '{result['key']}': {result.get('code', '-')}")
+            print(result.get("error", ""))
+        elif result["status"] == "not_found":
+            print(f"❌ User '{result['key']}' not found")
+        else:
+            print(f"✅ User '{result['key']}' {result['status']}")
+
+    return report
+
+
 if __name__ == "__main__":
     delete_user("user11")
@@ -1,10 +1,15 @@
 import requests
 from requests.auth import HTTPBasicAuth
 
+from src.openmrs_patient import OpenMRSClient
+from src.report_render import render_rows
+
 BASE_URL = "http://localhost/openmrs/ws/rest/v1"
 USERNAME = "admin"
 PASSWORD = "Admin123"
 
+OUTPUT_FORMAT = "table"  # table | csv | jsonl
+
 
 def get_active_users():
     url = f"{BASE_URL}/user"
@@ -31,6 +36,18 @@ def get_active_users():
     return r.json().get("results", [])
 
 
+def iter_active_users(page_size=100):
+    """
+    Все активные пользователи, постранично (без ограничения в 100 записей).
+    """
+    client = OpenMRSClient(USERNAME, PASSWORD)
+    return client.iter_results(
+        "/user",
+        params={"retired": "false", "v": "full"},
+        page_size=page_size,
+    )
+
+
 def extract_roles(user):
     roles = user.get("roles", [])
     return ", ".join(
@@ -50,41 +67,29 @@ def extract_privileges(user):
     return ", ".join(sorted(privileges)) or "-"
 
 
-def print_table(users):
+def print_table(users, fmt=OUTPUT_FORMAT):
     headers = ["Username", "Person", "Roles", "Privileges", "UUID", "Retired"]
-    rows = []
-
-    for user in users:
-        person = user.get("person") or {}
-        rows.append([
-            user.get("username", "-"),
-            person.get("display", "-"),
-            extract_roles(user),
-            extract_privileges(user),
-            user.get("uuid", "-"),
-            str(user.get("retired", "-")),
-        ])
-
-    col_widths = [
-        max(len(str(row[i])) for row in ([headers] + rows))
-        for i in range(len(headers))
-    ]
-
-    def format_row(row):
-        return " | ".join(
-            str(cell).ljust(col_widths[i]) for i, cell in enumerate(row)
-        )
 
-    separator = "-+-".join("-" * w for w in col_widths)
+    def rows():
+        for user in users:
+            person = user.get("person") or {}
+            yield [
+                user.get("username", "-"),
+                person.get("display", "-"),
+                extract_roles(user),
+                extract_privileges(user),
+                user.get("uuid", "-"),
+                str(user.get("retired", "-")),
+            ]
 
-    print(f"\nАктивные пользователи: {len(rows)}\n")
-    print(format_row(headers))
-    print(separator)
+    if fmt != "table":
+        render_rows(headers, rows(), fmt=fmt)
+        return
 
-    for row in rows:
-        print(format_row(row))
+    print("\nАктивные пользователи:\n")
+    count = render_rows(headers, rows(), fmt=fmt)
+    print(f"\nИтого: {count}")
 
 
 if __name__ == "__main__":
-    users = get_active_users()
-    print_table(users)
+    print_table(iter_active_users())
@@ -1,12 +1,16 @@
 import requests
 from requests.auth import HTTPBasicAuth
 
+from src.openmrs_patient import OpenMRSClient
+from src.report_render import render_rows
+
 #TODO: не работает - во
 BASE_URL = "http://localhost/openmrs/ws/rest/v1"
 USERNAME = "admin"
 PASSWORD = "Admin123"
 
 TARGET_PRIVILEGE = "Add Patients"
+OUTPUT_FORMAT = "table"  # table | csv | jsonl
 
 
 def get_retired_users(limit=100):
@@ -34,6 +38,15 @@ def get_retired_users(limit=100):
     return r.json().get("results", [])
 
 
+def iter_retired_users(page_size=100):
+    client = OpenMRSClient(USERNAME, PASSWORD)
+    return client.iter_results(
+        "/user",
+        params={"retired": "true", "v": "full"},
+        page_size=page_size,
+    )
+
+
 def privilege_name(priv: dict) -> str:
     return priv.get("display") or priv.get("name") or ""
 
@@ -63,48 +76,39 @@ def roles_granting_privilege(user: dict, target_priv: str) -> str:
     return ", ".join(granting) or "-"
 
 
-def print_table(users):
+def print_table(users, fmt=OUTPUT_FORMAT):
     headers = ["Username", "Person", "Roles", "Granting roles", "User UUID", "Retired"]
-    rows = []
-
-    for user in users:
-        if not has_privilege(user, TARGET_PRIVILEGE):
-            continue
-
-        person = user.get("person") or {}
-        roles = ", ".join(role_name(r) for r in user.get("roles", [])) or "-"
-
-        rows.append([
-            user.get("username", "-"),
-            person.get("display", "-"),
-            roles,
-            roles_granting_privilege(user, TARGET_PRIVILEGE),
-            user.get("uuid", "-"),      # ← ЯВНО user UUID
-            str(user.get("retired", "-")),
-        ])
-
-    if not rows:
-        print(f"\nRetired пользователей с привилегией '{TARGET_PRIVILEGE}' не найдено.\n")
-        return
-
-    col_widths = [
-        max(len(str(row[i])) for row in ([headers] + rows))
-        for i in range(len(headers))
-    ]
 
-    def format_row(row):
-        return " | ".join(str(cell).ljust(col_widths[i]) for i, cell in enumerate(row))
+    def rows():
+        for user in users:
+            if not has_privilege(user, TARGET_PRIVILEGE):
+                continue
+
+            person = user.get("person") or {}
+            roles = ", ".join(role_name(r) for r in user.get("roles", [])) or "-"
+
+            yield [
+                user.get("username", "-"),
+                person.get("display", "-"),
+                roles,
+                roles_granting_privilege(user, TARGET_PRIVILEGE),
+                user.get("uuid", "-"),      # ← ЯВНО user UUID
+                str(user.get("retired", "-")),
+            ]
+
+    if fmt != "table":
+        render_rows(headers, rows(), fmt=fmt)
+        return
 
-    separator = "-+-".join("-" * w for w in col_widths)
+    print(f"\nRetired пользователи С привилегией '{TARGET_PRIVILEGE}':\n")
 
-    print(f"\nRetired пользователи С привилегией '{TARGET_PRIVILEGE}': {len(rows)}\n")
-    print(format_row(headers))
-    print(separator)
+    count = render_rows(headers, rows(), fmt=fmt)
+    if not count:
+        print(f"Retired пользователей с привилегией '{TARGET_PRIVILEGE}' не найдено.\n")
+        return
 
-    for row in rows:
-        print(format_row(row))
+    print(f"\nИтого: {count}")
 
 
 if __name__ == "__main__":
-    users = get_retired_users(limit=100)
-    print_table(users)
+    print_table(iter_retired_users())
@@ -2,6 +2,8 @@ import json
 import requests
 from requests.auth import HTTPBasicAuth
 
+from src.user_resolver import default_resolver
+
 BASE_URL = "http://localhost/openmrs/ws/rest/v1"
 API_USERNAME = "admin"
 API_PASSWORD = "Admin123"
@@ -15,6 +17,13 @@ def get_user_by_username(username: str) -> dict:
     GET /user/{username}?v=full
     Возвращает полный объект пользователя.
     """
+    resolver = default_resolver()
+
+    # уже знаем, что такого пользователя нет — не ходим на сервер
+    known, cached_uuid = resolver.cached(username)
+    if known and cached_uuid is None:
+        raise ValueError(f"Пользователь '{username}' не найден")
+
     url = f"{BASE_URL}/user/{username}"
     params = {"v": "full"}
 
@@ -27,6 +36,7 @@ def get_user_by_username(username: str) -> dict:
     )
 
     if r.status_code == 404:
+        resolver.remember_missing(username)
         raise ValueError(f"Пользователь '{username}' не найден")
 
     if not r.ok:
@@ -35,7 +45,9 @@ def get_user_by_username(username: str) -> dict:
         print("BODY:", (r.text or "")[:4000])
         r.raise_for_status()
 
-    return r.json()
+    user = r.json()
+    resolver.remember(username, user["uuid"])
+    return user
 
 
 if __name__ == "__main__":
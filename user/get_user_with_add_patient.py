@@ -1,12 +1,16 @@
 import requests
 from requests.auth import HTTPBasicAuth
 
+from src.openmrs_patient import OpenMRSClient
+from src.report_render import render_rows
+
 BASE_URL = "http://localhost/openmrs/ws/rest/v1"
 USERNAME = "admin"
 PASSWORD = "Admin123"
 
 TARGET_PRIVILEGE = "Add Patients"
 SHOW_ALL_PRIVILEGES = False
+OUTPUT_FORMAT = "table"  # table | csv | jsonl
 
 
 def get_json(url, *, params=None, timeout=10):
@@ -31,6 +35,15 @@ def get_active_users(limit=100):
     return get_json(url, params=params).get("results", [])
 
 
+def iter_active_users(page_size=100):
+    client = OpenMRSClient(USERNAME, PASSWORD)
+    return client.iter_results(
+        "/user",
+        params={"retired": "false", "v": "full"},
+        page_size=page_size,
+    )
+
+
 def get_current_session_location_display() -> str:
     """
     Возвращает локацию ТЕКУЩЕЙ сессии (то, что выбирают при логине в RefApp),
@@ -86,45 +99,44 @@ def filter_users_with_privilege(users: list[dict], target_priv: str) -> list[dic
     return [u for u in users if has_privilege(u, target_priv)]
 
 
-def print_table(users: list[dict], target_priv: str, session_location: str):
+def iter_users_with_privilege(users, target_priv: str):
+    return (u for u in users if has_privilege(u, target_priv))
+
+
+def print_table(users, target_priv: str, session_location: str, fmt: str = OUTPUT_FORMAT):
     if SHOW_ALL_PRIVILEGES:
         headers = ["Username", "Person", "Roles", "Granting roles", "Privileges", "User UUID"]
     else:
         headers = ["Username", "Person", "Roles", "Granting roles", "Priv count", "User UUID"]
 
-    rows = []
-    for user in users:
-        person = user.get("person") or {}
-        privs = sorted(extract_privileges_set(user))
-        granting = roles_granting_privilege(user, target_priv)
-
-        rows.append([
-            user.get("username", "-"),
-            person.get("display", "-"),
-            extract_roles(user),
-            granting,
-            ", ".join(privs) if SHOW_ALL_PRIVILEGES else str(len(privs)),
-            user.get("uuid", "-"),
-        ])
+    def rows():
+        for user in users:
+            person = user.get("person") or {}
+            privs = sorted(extract_privileges_set(user))
+            granting = roles_granting_privilege(user, target_priv)
+
+            yield [
+                user.get("username", "-"),
+                person.get("display", "-"),
+                extract_roles(user),
+                granting,
+                ", ".join(privs) if SHOW_ALL_PRIVILEGES else str(len(privs)),
+                user.get("uuid", "-"),
+            ]
+
+    if fmt != "table":
+        render_rows(headers, rows(), fmt=fmt)
+        return
 
     print(f"\nSession Location (для текущих кредов): {session_location}\n")
+    print(f"Пользователи с привилегией '{target_priv}':\n")
 
-    if not rows:
+    count = render_rows(headers, rows(), fmt=fmt)
+    if not count:
         print(f"Пользователей с привилегией '{target_priv}' не найдено.\n")
         return
 
-    col_widths = [max(len(str(row[i])) for row in ([headers] + rows)) for i in range(len(headers))]
-
-    def format_row(row):
-        return " | ".join(str(cell).ljust(col_widths[i]) for i, cell in enumerate(row))
-
-    separator = "-+-".join("-" * w for w in col_widths)
-
-    print(f"Пользователи с привилегией '{target_priv}': {len(rows)}\n")
-    print(format_row(headers))
-    print(separator)
-    for row in rows:
-        print(format_row(row))
+    print(f"\nИтого: {count}")
 
 
 if __name__ == "__main__":
@@ -135,6 +147,5 @@ if __name__ == "__main__":
         # если appui не установлен или запрещён доступ — просто покажем "-"
         session_loc = "-"
 
-    users = get_active_users(limit=100)
-    filtered = filter_users_with_privilege(users, TARGET_PRIVILEGE)
+    filtered = iter_users_with_privilege(iter_active_users(), TARGET_PRIVILEGE)
     print_table(filtered, TARGET_PRIVILEGE, session_loc)
@@ -1,31 +1,16 @@
-import requests
+from src.user_bulk import bulk_user_action
 
-BASE_URL = "http://localhost/openmrs/ws/rest/v1"
-AUTH = ("admin", "Admin123")
-
-USERNAME_TO_RETIRE = "user224"
-user_uuid = '288cd575-1134-46d5-aa1b-2e11d79ca13f'
+USERNAMES_TO_RETIRE = ["user224"]
 REASON = "No longer active"
+DRY_RUN = False
 #user224  | Demo224 User | Privilege Level: Full | Privilege Level: Full | 288cd575-1134-46d5-aa1b-2e11d79ca13f | False
 
-# найти uuid по username
-r = requests.get(f"{BASE_URL}/user", auth=AUTH, params={"q": USERNAME_TO_RETIRE})
-r.raise_for_status()
-results = r.json().get("results", [])
-if not results:
-    raise RuntimeError(f"User '{USERNAME_TO_RETIRE}' not found")
-user_uuid = results[0]["uuid"]
-
-print("uuid:", user_uuid)
+# uuid ищутся одним постраничным проходом по /user, retire через DELETE + reason
+report = bulk_user_action(USERNAMES_TO_RETIRE, "retire", reason=REASON, dry_run=DRY_RUN)
 
-# retire через DELETE + reason
-r = requests.delete(
-    f"{BASE_URL}/user/{user_uuid}",
-    auth=AUTH,
-    params={"reason": REASON},
-    headers={"Accept": "application/json"},
-)
+for result in report.results:
+    print(f"{result['key']:<20} {result.get('uuid', '-'):<38} {result['status']} {result.get('error', '')[:200]}")
 
-print("status:", r.status_code)
-print(r.text)
-r.raise_for_status()
\ No newline at end of file
+print("\nstatus:", report.summary())
+if report.failed:
+    raise RuntimeError(f"Не удалось retire: {[r['key'] for r in report.failed]}")